@@ -12,6 +12,7 @@ from textual.binding import Binding
 
 from .config_manager import ConfigManager
 from .utils.logger import init_logging, get_app_logger
+from .utils.async_runtime import shutdown_runtime
 from .modules.sudo_manager import SudoManager
 
 
@@ -118,13 +119,14 @@ class InitializerApp(App):
     ]
     
     def __init__(self, config_manager: ConfigManager, preset: str = None,
-                 headless: bool = False, debug: bool = False):
+                 headless: bool = False, debug: bool = False, resume: bool = False):
         super().__init__()
 
         self.config_manager = config_manager
         self.preset = preset
         self.headless = headless
         self.debug_mode = debug
+        self.resume = resume
         self.console = Console()
 
         # Initialize logging system first
@@ -207,7 +209,13 @@ class InitializerApp(App):
 
         # Push the main screen
         from .ui.screens.main_menu import MainMenuScreen
-        self.push_screen(MainMenuScreen(self.config_manager))
+        main_menu = MainMenuScreen(self.config_manager)
+        self.push_screen(main_menu)
+
+        if self.resume:
+            # 继续上次被中断（终端断开、崩溃）的安装会话
+            from .ui.screens.main_menu_components.modal_manager import ModalManager
+            main_menu.call_after_refresh(ModalManager.resume_install_session, main_menu)
         
     async def action_settings(self) -> None:
         """Show settings screen."""
@@ -287,4 +295,6 @@ class InitializerApp(App):
         
     def on_unmount(self) -> None:
         """Called when app is unmounted - ensure comprehensive cleanup."""
+        # 取消仍在后台事件循环中运行的检测任务
+        shutdown_runtime()
         cleanup_terminal_state()
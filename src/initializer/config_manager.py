@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Dict, Any
 from dataclasses import dataclass
 
+from .utils.config_cache import ConfigSnapshotCache
 from .utils.logger import get_utils_logger
 
 
@@ -32,12 +33,38 @@ class ModuleConfig:
 class ConfigManager:
     """Manages application configuration from YAML files."""
     
-    def __init__(self, config_dir: Path = Path("config")):
+    def __init__(self, config_dir: Path = Path("config"), rebuild_cache: bool = False):
         self.config_dir = config_dir
         self._config_cache = {}
         self.logger = get_utils_logger("config_manager")
+        # 已编译的配置快照（libyaml 解析结果，按源文件 mtime/哈希校验）
+        self.snapshot_cache = ConfigSnapshotCache(Path(config_dir))
+        if rebuild_cache:
+            self.rebuild_cache()
         self.logger.info(f"配置管理器初始化完成: config_dir={config_dir}")
-        
+
+    def rebuild_cache(self) -> None:
+        """Discard every configuration snapshot and recompile them from the YAML sources."""
+        removed = self.snapshot_cache.clear()
+        compiled, failed = self.snapshot_cache.compile_all()
+        self._config_cache.clear()
+        self.logger.info(f"配置快照已重建: 删除 {removed} 个, 编译 {compiled} 个, 失败 {failed} 个")
+
+    def load_yaml(self, path: Path) -> Any:
+        """Load a YAML file through the compiled snapshot cache.
+
+        Args:
+            path: Path to the YAML file
+
+        Returns:
+            Parsed data (a fresh copy on every call)
+
+        Raises:
+            yaml.YAMLError: If the file is not valid YAML
+            IOError: If the file cannot be read
+        """
+        return self.snapshot_cache.load(path)
+
     def load_config(self, config_name: str) -> Dict[str, Any]:
         """Load configuration from YAML file."""
         if config_name in self._config_cache:
@@ -52,8 +79,7 @@ class ConfigManager:
             raise FileNotFoundError(f"Config file not found: {config_path}")
 
         try:
-            with open(config_path, 'r', encoding='utf-8') as file:
-                config = yaml.safe_load(file)
+            config = self.load_yaml(config_path)
 
             if config is None:
                 self.logger.warning(f"配置文件为空: {config_name}")
@@ -147,8 +173,7 @@ class ConfigManager:
             raise FileNotFoundError(f"Preset not found: {preset_name}")
 
         try:
-            with open(preset_path, 'r', encoding='utf-8') as file:
-                preset_config = yaml.safe_load(file)
+            preset_config = self.load_yaml(preset_path)
 
             self.logger.debug(f"预设配置加载成功: {preset_name}")
             return preset_config
@@ -0,0 +1,268 @@
+"""Non-interactive preset runner behind ``initializer apply``.
+
+Applies a preset with plain streaming output and meaningful exit codes so
+it can run from cloud-init, CI jobs or scripts. This module must not import
+Textual (directly or through the UI package) to keep startup fast.
+"""
+
+import asyncio
+import getpass
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from typing import Optional, TextIO
+
+from .config_manager import ConfigManager
+from .modules.app_installer import AppInstaller
+from .modules.preset_plan import PresetPlan, PresetPlanner, PresetStep
+from .modules.privileged_helper import helper_command
+from .modules.sudo_manager import SudoManager
+from .modules.vim_manager import VimManager
+from .modules.zsh_manager import ZshManager
+from .utils.logger import get_logger
+from .utils.stream_reader import iter_stream_batches, strip_ansi
+
+
+# Exit codes of "initializer apply"
+EXIT_OK = 0
+EXIT_STEP_FAILED = 1
+EXIT_PRESET_ERROR = 2
+EXIT_NO_PRIVILEGES = 3
+EXIT_INTERRUPTED = 130
+
+# Keep package manager prompts (debconf, tzdata) from waiting for input
+NONINTERACTIVE_ENV = {"DEBIAN_FRONTEND": "noninteractive"}
+
+# sudo at the start of a command (env_reset drops NONINTERACTIVE_ENV from its environment)
+SUDO_PATTERN = re.compile(r"(^|[;&|(])(\s*)sudo\s+")
+
+
+class HeadlessRunner:
+    """Resolve a preset into a plan and run it without a terminal UI.
+
+    Steps run in order and the run stops at the first failing step.
+    Package commands go through the same AppInstaller commands as the TUI;
+    privileged commands run directly as root, through sudo when it does not
+    need a password, or through the session's privileged helper once the
+    password (from stdin or a prompt) has been verified.
+    """
+
+    def __init__(self, config_manager: ConfigManager, dry_run: bool = False,
+                 sudo_password: Optional[str] = None, out: Optional[TextIO] = None):
+        """Initialize the runner.
+
+        Args:
+            config_manager: Configuration manager
+            dry_run: Only print the plan
+            sudo_password: Sudo password (prompted for on a terminal if needed and not given)
+            out: Output stream (defaults to stdout)
+        """
+        self.config_manager = config_manager
+        self.dry_run = dry_run
+        self.sudo_password = sudo_password
+        self.out = out or sys.stdout
+        self.logger = get_logger("initializer.headless")
+        self.sudo_manager = SudoManager()
+        self.is_root = False
+        self.app_installer: Optional[AppInstaller] = None
+
+    def run(self, preset_name: str) -> int:
+        """Apply a preset.
+
+        Args:
+            preset_name: Preset file name in config/presets (without .yaml)
+
+        Returns:
+            Process exit code
+        """
+        try:
+            preset = self.config_manager.load_preset(preset_name)
+        except FileNotFoundError:
+            self._error(f"preset '{preset_name}' not found in {self.config_manager.config_dir / 'presets'}")
+            return EXIT_PRESET_ERROR
+        except Exception as e:
+            self._error(f"cannot load preset '{preset_name}': {e}")
+            return EXIT_PRESET_ERROR
+        if not isinstance(preset, dict):
+            self._error(f"preset '{preset_name}' is empty or not a mapping")
+            return EXIT_PRESET_ERROR
+
+        try:
+            self.app_installer = AppInstaller(self.config_manager, self.sudo_manager)
+            planner = PresetPlanner(self.app_installer, self.config_manager.load_config("modules"))
+            plan = planner.plan(preset_name, preset)
+        except Exception as e:
+            self.logger.error(f"Failed to resolve preset {preset_name}: {e}", exc_info=True)
+            self._error(f"cannot resolve preset '{preset_name}': {e}")
+            return EXIT_PRESET_ERROR
+
+        self._print_plan(plan)
+        if self.dry_run or not plan.steps:
+            if not plan.steps:
+                self._write("Nothing to do.\n")
+            return EXIT_OK
+
+        try:
+            if plan.requires_privileges and not self._acquire_privileges():
+                return EXIT_NO_PRIVILEGES
+            return asyncio.run(self._run_steps(plan, planner.ohmyzsh_install_url))
+        except KeyboardInterrupt:
+            self._write("\nInterrupted.\n")
+            return EXIT_INTERRUPTED
+        finally:
+            self.sudo_manager.clear_password()
+
+    def _print_plan(self, plan: PresetPlan) -> None:
+        """Print the resolved plan."""
+        lines = [f"Preset: {plan.title} ({plan.preset})",
+                 f"Package manager: {self.app_installer.package_manager or 'none detected'}"]
+        if plan.steps:
+            lines.append("Plan:")
+            for number, step in enumerate(plan.steps, 1):
+                lines.append(f"  {number}. {step.title}")
+                if step.command:
+                    lines.append(f"     $ {step.command}")
+        if plan.notes:
+            lines.append("Skipped:")
+            lines.extend(f"  - {note}" for note in plan.notes)
+        self._write("\n".join(lines) + "\n")
+
+    def _acquire_privileges(self) -> bool:
+        """Make sure privileged steps can run without a terminal prompt."""
+        self.is_root = self.sudo_manager.is_root_user()
+        if self.is_root:
+            return True
+        if shutil.which("sudo") is None:
+            self._error("this preset needs root privileges and sudo is not installed")
+            return False
+
+        # Passwordless sudo (NOPASSWD rule or a cached timestamp)
+        result = subprocess.run(["sudo", "-n", "true"], stdin=subprocess.DEVNULL,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if result.returncode == 0:
+            return True
+
+        password = self.sudo_password
+        if password is None and sys.stdin.isatty():
+            password = getpass.getpass("[sudo] password: ")
+        if not password:
+            self._error("sudo needs a password; run as root, allow passwordless sudo "
+                        "or pass --sudo-password-stdin")
+            return False
+
+        success, message = self.sudo_manager.verify_sudo_access(password)
+        if not success:
+            self._error(f"sudo authentication failed: {message}")
+        return success
+
+    async def _run_steps(self, plan: PresetPlan, ohmyzsh_install_url: str) -> int:
+        """Run the plan's steps in order, stopping at the first failure."""
+        total = len(plan.steps)
+        started = time.monotonic()
+        for number, step in enumerate(plan.steps, 1):
+            self._write(f"[{number}/{total}] {step.title}\n")
+            step_started = time.monotonic()
+            success, error = await self._run_step(step, ohmyzsh_install_url)
+            elapsed = time.monotonic() - step_started
+            if not success:
+                self._write(f"[{number}/{total}] FAILED after {elapsed:.1f}s: {error}\n")
+                self._write(f"Preset {plan.preset} failed at step {number} of {total}.\n")
+                return EXIT_STEP_FAILED
+            self._write(f"[{number}/{total}] done in {elapsed:.1f}s\n")
+
+        self._write(f"Preset {plan.preset} applied: {total} steps in {time.monotonic() - started:.1f}s.\n")
+        return EXIT_OK
+
+    async def _run_step(self, step: PresetStep, ohmyzsh_install_url: str) -> tuple:
+        """Run one step.
+
+        Returns:
+            (success, error message)
+        """
+        if step.kind == "ohmyzsh":
+            if (await ZshManager.detect_ohmyzsh()).installed:
+                self._write_output("Oh-my-zsh is already installed")
+                return True, ""
+            result = await ZshManager().install_ohmyzsh(ohmyzsh_install_url, self._write_output)
+            return result["success"], result.get("error", "")
+        if step.kind == "neovim":
+            result = await VimManager.install_neovim(self.app_installer.package_manager, self._write_manager_output)
+            return result["success"], result.get("message", "")
+        if step.kind == "lazyvim":
+            result = await VimManager.install_lazyvim(self._write_manager_output)
+            return result["success"], result.get("message", "")
+
+        self._write(f"$ {step.command}\n")
+        returncode = await self._run_command(step.command)
+        if returncode != 0:
+            return False, f"exit code {returncode}"
+
+        if step.kind == "apt_update":
+            self.app_installer.mark_apt_update_executed()
+        for app in step.applications:
+            # Ad-hoc preset packages are not in the catalog and have no status to save
+            if self.app_installer.catalog.get(app.name) is app:
+                self.app_installer.save_installation_status(app.name, True)
+        return True, ""
+
+    async def _run_command(self, command: str) -> int:
+        """Run a shell command, streaming its output.
+
+        Returns:
+            Exit code
+        """
+        process = await self._spawn(command)
+        try:
+            async for batch in iter_stream_batches(process.stdout):
+                self._write("".join(f"    {strip_ansi(line.text)}\n" for line in batch))
+            return await process.wait()
+        except asyncio.CancelledError:
+            # Helper commands run in their own session and do not get the terminal's SIGINT
+            process.terminate()
+            await process.wait()
+            raise
+
+    async def _spawn(self, command: str):
+        """Start a command locally or through the privileged helper."""
+        if self.sudo_manager.is_sudo_required(command):
+            if self.is_root:
+                command = self.sudo_manager._remove_sudo_from_command(command)
+            else:
+                helper = self.sudo_manager.get_helper()
+                helper_cmd = helper_command(command) if helper is not None else None
+                if helper_cmd is not None:
+                    return await helper.spawn(helper_cmd, env=NONINTERACTIVE_ENV)
+                # sudo resets the environment; set the variables on its command line
+                assignments = " ".join(f"{name}={value}" for name, value in NONINTERACTIVE_ENV.items())
+                command = SUDO_PATTERN.sub(lambda match: f"{match.group(1)}{match.group(2)}sudo {assignments} ",
+                                           command)
+
+        return await asyncio.create_subprocess_shell(
+            command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            env=dict(os.environ, **NONINTERACTIVE_ENV),
+        )
+
+    def _write_output(self, message: str) -> None:
+        """Print a line of manager output."""
+        self._write(f"    {message}\n")
+
+    def _write_manager_output(self, level: str, message: str) -> None:
+        """Print a (level, message) progress report of the Vim manager."""
+        prefix = "" if level in ("info", "debug") else f"{level.upper()}: "
+        self._write(f"    {prefix}{message}\n")
+
+    def _error(self, message: str) -> None:
+        """Print an error to stderr."""
+        sys.stderr.write(f"error: {message}\n")
+        sys.stderr.flush()
+
+    def _write(self, text: str) -> None:
+        """Write to the output and flush, so piped output (CI logs) stays live."""
+        self.out.write(text)
+        self.out.flush()
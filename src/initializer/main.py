@@ -12,7 +12,6 @@ from pathlib import Path
 import click
 from rich.console import Console
 
-from .app import InitializerApp, cleanup_terminal_state
 from .config_manager import ConfigManager
 
 
@@ -21,29 +20,39 @@ console = Console()
 
 def signal_handler(signum, frame):
     """Handle signals and ensure proper cleanup."""
+    from .app import cleanup_terminal_state
+
     cleanup_terminal_state()
     sys.exit(0)
 
 
-# Register signal handlers
-signal.signal(signal.SIGINT, signal_handler)
-signal.signal(signal.SIGTERM, signal_handler)
-
-# Register atexit handler for additional safety
-atexit.register(cleanup_terminal_state)
-
-
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option('--preset', '-p', help='Use a configuration preset')
 @click.option('--config-dir', '-c', default='config', help='Configuration directory path')
 @click.option('--headless', is_flag=True, help='Run in headless mode (no animations)')
 @click.option('--debug', is_flag=True, help='Enable debug mode')
-def main(preset: str, config_dir: str, headless: bool, debug: bool):
+@click.option('--rebuild-cache', is_flag=True, help='Recompile cached configuration snapshots')
+@click.option('--resume', is_flag=True, help='Resume the last interrupted install session')
+@click.pass_context
+def main(ctx: click.Context, preset: str, config_dir: str, headless: bool, debug: bool, rebuild_cache: bool,
+         resume: bool):
     """Launch the Linux System Initializer TUI application."""
-    
+    if ctx.invoked_subcommand is not None:
+        return
+
+    # Textual is only imported for the TUI; "apply" must start without it
+    from .app import InitializerApp, cleanup_terminal_state
+
+    # Register signal handlers
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    # Register atexit handler for additional safety
+    atexit.register(cleanup_terminal_state)
+
     try:
         # Initialize configuration manager
-        config_manager = ConfigManager(Path(config_dir))
+        config_manager = ConfigManager(Path(config_dir), rebuild_cache=rebuild_cache)
         
         # Load application configuration
         app_config = config_manager.get_app_config()
@@ -55,7 +64,7 @@ def main(preset: str, config_dir: str, headless: bool, debug: bool):
                 console.print(f"[dim]Using preset: {preset}[/dim]")
         
         # Create and run the application
-        app = InitializerApp(config_manager, preset=preset, headless=headless, debug=debug)
+        app = InitializerApp(config_manager, preset=preset, headless=headless, debug=debug, resume=resume)
         app.run()
         
         # Always cleanup on normal exit
@@ -73,5 +82,46 @@ def main(preset: str, config_dir: str, headless: bool, debug: bool):
         sys.exit(1)
 
 
+@main.command()
+@click.option('--preset', '-p', required=True, help='Preset to apply (name of a file in config/presets)')
+@click.option('--config-dir', '-c', default=None, help='Configuration directory path')
+@click.option('--dry-run', is_flag=True, help='Print the resolved plan without running it')
+@click.option('--sudo-password-stdin', is_flag=True, help='Read the sudo password from the first line of stdin')
+@click.option('--debug', is_flag=True, help='Show debug logging on stderr')
+@click.pass_context
+def apply(ctx: click.Context, preset: str, config_dir: str, dry_run: bool, sudo_password_stdin: bool, debug: bool):
+    """Apply a preset without the TUI (for cloud-init, CI and scripts).
+
+    Exit codes: 0 success, 1 a step failed, 2 preset or configuration error,
+    3 root privileges unavailable, 130 interrupted.
+    """
+    from .headless import EXIT_INTERRUPTED, EXIT_PRESET_ERROR, HeadlessRunner
+    from .utils.logger import init_logging
+
+    # Ctrl+C and SIGTERM (e.g. a CI job timeout) cancel the run; SIGINT may be
+    # inherited as ignored (background jobs), which would also disable asyncio's handling
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGTERM, lambda signum, frame: signal.raise_signal(signal.SIGINT))
+
+    config_dir = config_dir or ctx.parent.params['config_dir']
+    try:
+        config_manager = ConfigManager(Path(config_dir))
+        # Logs go to stderr so stdout carries only the run's output
+        init_logging(config_manager.config_dir, debug, Console(stderr=True),
+                     console_level='DEBUG' if debug else 'WARNING')
+    except KeyboardInterrupt:
+        sys.exit(EXIT_INTERRUPTED)
+    except Exception as e:
+        click.echo(f"error: cannot load configuration from {config_dir}: {e}", err=True)
+        sys.exit(EXIT_PRESET_ERROR)
+
+    sudo_password = None
+    if sudo_password_stdin:
+        sudo_password = sys.stdin.readline().rstrip("\n")
+
+    runner = HeadlessRunner(config_manager, dry_run=dry_run, sudo_password=sudo_password)
+    sys.exit(runner.run(preset))
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
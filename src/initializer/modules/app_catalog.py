@@ -0,0 +1,83 @@
+"""Compiled application catalog with constant-time lookups."""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+from .software_models import Application, ApplicationSuite
+
+
+# Homebrew catalogs store the install kind in the "type" field
+BREW_INSTALL_TYPES = ("formula", "cask", "both")
+
+
+@dataclass
+class AppCatalog:
+    """Application catalog compiled once per configuration load.
+
+    Holds the software items in configuration order together with the
+    lookup tables the installer, the renderer and the status checkers
+    need, so none of them has to re-read the YAML or scan every suite.
+    """
+    package_manager: Optional[str]
+    software_items: List[Union[ApplicationSuite, Application]] = field(default_factory=list)
+    package_manager_options: Dict[str, Any] = field(default_factory=dict)
+    brew_types: Dict[str, str] = field(default_factory=dict)
+
+    applications: List[Application] = field(init=False, default_factory=list)
+    by_name: Dict[str, Application] = field(init=False, default_factory=dict)
+    by_package: Dict[str, List[Application]] = field(init=False, default_factory=dict)
+    by_executable: Dict[str, List[Application]] = field(init=False, default_factory=dict)
+    suite_by_component: Dict[str, ApplicationSuite] = field(init=False, default_factory=dict)
+
+    def __post_init__(self) -> None:
+        for item in self.software_items:
+            if isinstance(item, ApplicationSuite):
+                for component in item.components:
+                    self.suite_by_component[component.name] = item
+                    self._add_application(component)
+            else:
+                self._add_application(item)
+
+    def _add_application(self, app: Application) -> None:
+        """Index an application by name and by each of its packages."""
+        self.applications.append(app)
+        self.by_name.setdefault(app.name, app)
+        packages = app.get_package_list()
+        for package in packages:
+            self.by_package.setdefault(package, []).append(app)
+        # Applications without explicit executables are detected by package name
+        for executable in dict.fromkeys(app.executables or packages):
+            self.by_executable.setdefault(executable, []).append(app)
+
+    def get(self, name: str) -> Optional[Application]:
+        """Get an application (standalone or component) by name."""
+        return self.by_name.get(name)
+
+    def applications_for_packages(self, packages) -> List[Application]:
+        """Get the applications that use any of the given packages, without duplicates."""
+        return self._collect(self.by_package, packages)
+
+    def applications_for_executables(self, executables) -> List[Application]:
+        """Get the applications providing any of the given executable names, without duplicates."""
+        return self._collect(self.by_executable, executables)
+
+    @staticmethod
+    def _collect(index: Dict[str, List[Application]], keys) -> List[Application]:
+        found: Dict[int, Application] = {}
+        for key in keys:
+            for app in index.get(key, ()):
+                found.setdefault(id(app), app)
+        return list(found.values())
+
+    def suite_of(self, app_name: str) -> Optional[ApplicationSuite]:
+        """Get the suite an application belongs to, if it is a component."""
+        return self.suite_by_component.get(app_name)
+
+    def is_last_component(self, app: Application) -> bool:
+        """Check whether an application is the last component of its suite."""
+        suite = self.suite_by_component.get(app.name)
+        return suite is not None and bool(suite.components) and suite.components[-1] is app
+
+    def get_brew_type(self, app_name: str) -> str:
+        """Get the Homebrew install kind ('formula', 'cask' or 'both') of an application."""
+        return self.brew_types.get(app_name, "formula")
@@ -1,20 +1,47 @@
 """Application installer module for managing predefined applications."""
 
+import queue
+import shlex
 import subprocess
 import shutil
-import asyncio
-import concurrent.futures
-from typing import List, Dict, Optional, Tuple, Any, Union, Callable
+from typing import List, Dict, Iterable, Optional, Tuple, Any, Union, Callable
 from ..utils.log_manager import InstallationLogManager, LogLevel
+from ..utils.log_writer import BufferedLogWriter
 from ..utils.logger import get_module_logger
+from ..utils.async_runtime import get_runtime
+from ..utils.state_dir import get_state_dir
 from .batch_package_checker import BatchPackageChecker
 from .two_layer_checker import TwoLayerPackageChecker
+from .package_db_readers import create_package_db_reader
+from .package_status_watcher import PackageStatusWatcher, WatchEvent
+from .app_catalog import AppCatalog, BREW_INSTALL_TYPES
+from .apt_update_policy import AptUpdateDecision, AptUpdatePolicy
 from .software_models import Application, ApplicationSuite
 from .sudo_manager import SudoManager
 
 
 class AppInstaller:
     """Manages installation and configuration of predefined applications."""
+
+    # Package manager specific catalog files
+    CATALOG_FILES = {
+        "apt": "applications_apt.yaml",
+        "apt-get": "applications_apt.yaml",
+        "brew": "applications_homebrew.yaml",
+        "yum": "applications_yum.yaml",
+        "dnf": "applications_dnf.yaml",
+        "pacman": "applications_pacman.yaml",
+        "zypper": "applications_zypper.yaml",
+        "apk": "applications_apk.yaml"
+    }
+
+    # Used when the catalog file cannot be parsed
+    DEFAULT_PACKAGE_MANAGER_CONFIG = {
+        "auto_yes": True,
+        "install_recommends": False,
+        "install_suggests": False,
+        "batch_supported": False  # 默认禁用批量安装
+    }
     
     def __init__(self, config_manager, sudo_manager: Optional[SudoManager] = None):
         """Initialize the application installer.
@@ -36,20 +63,40 @@ class AppInstaller:
         # 先检测包管理器
         self.package_manager = self._detect_package_manager()
 
+        # 跨次运行保留的状态（状态缓存、apt update 记录、安装日志）不依赖当前工作目录
+        self.state_dir = get_state_dir()
+
+        # 加载软件项（套件和独立应用），配置文件每次加载只解析一次
+        self.catalog: AppCatalog = self._build_catalog()
+        self.software_items: List[Union[ApplicationSuite, Application]] = self.catalog.software_items
+
         # Initialize two-layer package checker for efficient status checking
-        self.two_layer_checker = TwoLayerPackageChecker(self.package_manager or "unknown")
+        # 并发检查上限（0 或未配置表示根据 CPU 数自动调整）
+        max_concurrency = self.app_config.get('status_check', {}).get('max_concurrency') or None
+        self.two_layer_checker = TwoLayerPackageChecker(self.package_manager or "unknown", max_concurrency,
+                                                        self.state_dir, self.catalog)
 
         # Keep batch checker for backward compatibility and fallback
-        self.batch_checker = BatchPackageChecker(self.package_manager or "unknown")
+        self.batch_checker = BatchPackageChecker(self.package_manager or "unknown", max_concurrency, self.catalog)
 
-        # 加载软件项（套件和独立应用）
-        self.software_items: List[Union[ApplicationSuite, Application]] = self._load_software_items()
+        # Local package database reader for subprocess-free status checks
+        # (dpkg status, Homebrew Cellar, pacman local db, apk installed db)
+        self.package_db_reader = create_package_db_reader(self.package_manager or "unknown")
 
         # 兼容性：提供applications属性访问所有应用（展开套件组件）
         self.applications = self._get_all_applications_flat()
 
-        # Session级别的apt update状态管理
-        self._apt_update_executed = False  # 标记当前session是否已执行过apt update
+        # apt update新鲜度策略：包列表足够新时跳过apt-get update（跨会话生效）
+        apt_update_config = self.app_config.get('apt_update', {})
+        self.apt_update_policy = AptUpdatePolicy(apt_update_config.get('max_age_minutes', 60), self.state_dir)
+        self.apt_update_decision: Optional[AptUpdateDecision] = None  # 最近一次检查的结果
+        # Built apt-get commands report APT::Status-Fd records (enabled by the install progress screen)
+        self.apt_status_fd = False
+
+        # Live status watcher (started by the UI while the app list is shown)
+        self.status_watcher: Optional[PackageStatusWatcher] = None
+        self._status_change_callback: Optional[Callable[[Dict[str, bool]], None]] = None
+        self._watch_package_snapshot: Optional[Dict[str, bool]] = None
     
     def _load_applications(self) -> List[Application]:
         """Load applications from package manager specific configuration file."""
@@ -76,12 +123,10 @@ class AppInstaller:
 
         # 加载包管理器特定的配置文件
         try:
-            import yaml
             config_path = self.config_manager.config_dir / config_file
 
             if config_path.exists():
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config_data = yaml.safe_load(f)
+                config_data = self.config_manager.load_yaml(config_path) or {}
 
                 app_list = config_data.get("applications", [])
 
@@ -127,9 +172,59 @@ class AppInstaller:
 
         return applications
 
-    def _load_software_items(self) -> List[Union[ApplicationSuite, Application]]:
+    def _build_catalog(self) -> AppCatalog:
+        """Parse the package manager catalog once and compile its lookup tables.
+
+        Returns:
+            Compiled AppCatalog
+        """
+        try:
+            config_data = self._read_catalog_data()
+            pm_options = self._extract_package_manager_config(config_data)
+        except Exception as e:
+            config_file = self.CATALOG_FILES.get(self.package_manager)
+            self.logger.error(f"Failed to load software items from {config_file}: {str(e)}")
+            config_data = None
+            pm_options = dict(self.DEFAULT_PACKAGE_MANAGER_CONFIG)
+
+        brew_types = {}
+        if self.package_manager == "brew" and config_data:
+            for app_data in config_data.get("applications", []) or []:
+                if app_data.get("type") in BREW_INSTALL_TYPES:
+                    brew_types[app_data.get("name", "")] = app_data["type"]
+
+        return AppCatalog(
+            package_manager=self.package_manager,
+            software_items=self._load_software_items(config_data),
+            package_manager_options=pm_options,
+            brew_types=brew_types,
+        )
+
+    def _read_catalog_data(self) -> Optional[dict]:
+        """Parse the package manager specific catalog file.
+
+        Returns:
+            Parsed configuration, or None if there is no catalog file for this package manager
+
+        Raises:
+            Exception: If the file exists but cannot be parsed
+        """
+        config_file = self.CATALOG_FILES.get(self.package_manager)
+        if not config_file:
+            return None
+
+        config_path = self.config_manager.config_dir / config_file
+        if not config_path.exists():
+            return None
+
+        return self.config_manager.load_yaml(config_path) or {}
+
+    def _load_software_items(self, config_data: Optional[dict] = None) -> List[Union[ApplicationSuite, Application]]:
         """Load software items from unified configuration format.
 
+        Args:
+            config_data: Parsed package manager catalog (None if unavailable)
+
         Returns:
             List of software items (mix of ApplicationSuite and Application objects) in config order
         """
@@ -146,16 +241,10 @@ class AppInstaller:
             return self._load_applications_as_standalone()
 
         try:
-            import yaml
-            config_path = self.config_manager.config_dir / config_file
-
-            if not config_path.exists():
+            if config_data is None:
                 self.logger.warning(f"Config file {config_file} not found, using legacy format")
                 return self._load_applications_as_standalone()
 
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config_data = yaml.safe_load(f)
-
             # 读取统一的 applications 列表
             applications_list = config_data.get("applications", [])
 
@@ -175,8 +264,8 @@ class AppInstaller:
                     suite = self._create_suite_from_config(app_data)
                     software_items.append(suite)
                     suite_count += 1
-                elif app_type == "standalone":
-                    # 创建独立应用
+                elif app_type == "standalone" or app_type in BREW_INSTALL_TYPES:
+                    # 创建独立应用（Homebrew 配置中 type 表示 formula/cask）
                     app = self._create_application_from_config(app_data, app_type="standalone")
                     software_items.append(app)
                     standalone_count += 1
@@ -241,6 +330,7 @@ class AppInstaller:
             post_install=app_data.get("post_install", ""),
             tags=app_data.get("tags", []),
             install_recommends=install_recommends,
+            depends_on=app_data.get("depends_on") or [],
             type=app_type
         )
 
@@ -264,17 +354,8 @@ class AppInstaller:
         Returns:
             Flat list of all applications (components + standalone)
         """
-        all_applications = []
-
-        for item in self.software_items:
-            if isinstance(item, ApplicationSuite):
-                # 添加套件的所有组件
-                all_applications.extend(item.components)
-            else:
-                # 添加独立应用
-                all_applications.append(item)
-
-        return all_applications
+        # 套件组件与独立应用已在编译目录时按配置顺序展开
+        return list(self.catalog.applications)
 
     def _get_package_name_for_manager(self, app_data: dict) -> str:
         """Get package name based on package manager type.
@@ -513,6 +594,13 @@ class AppInstaller:
         if not self.package_manager:
             return False
 
+        # 优先直接读取本地包数据库（无需启动子进程）
+        if self.package_db_reader is not None:
+            try:
+                return self.package_db_reader.is_installed(package)
+            except OSError as e:
+                self.logger.debug(f"Package database unavailable, falling back to package manager command: {e}")
+
         # 处理 Homebrew 特殊情况
         if self.package_manager == "brew":
             check_commands = [
@@ -626,7 +714,7 @@ class AppInstaller:
 
         # 构建 APT 命令参数
         if self.package_manager in ["apt", "apt-get"]:
-            cmd_parts = ["sudo apt-get install"]
+            cmd_parts = [f"sudo {self._apt_get()} install"]
 
             # 添加自动确认参数
             if auto_yes:
@@ -683,7 +771,7 @@ class AppInstaller:
 
         # 构建 APT 批量安装命令（中文注释：遵循与单个安装相同的选项逻辑）
         if self.package_manager in ["apt", "apt-get"]:
-            cmd_parts = ["sudo apt-get install"]
+            cmd_parts = [f"sudo {self._apt_get()} install"]
 
             # 添加自动确认参数
             if auto_yes:
@@ -720,37 +808,121 @@ class AppInstaller:
 
         return ""
 
+    def get_prefetch_command(self, packages: List[str], archive_dir: Optional[str] = None,
+                             state_dir: Optional[str] = None) -> Optional[str]:
+        """Get a download-only command for packages that are about to be installed.
+
+        Args:
+            packages: Package names to download
+            archive_dir: Private APT archive directory the packages are downloaded into
+            state_dir: Private APT state directory (see PackagePrefetcher.prepare_apt_state)
+
+        Returns:
+            Command string, or None if the package manager has no download-only mode
+        """
+        if not packages or not self.package_manager:
+            return None
+
+        packages_str = " ".join(packages)
+        if self.package_manager in ["apt", "apt-get"]:
+            if not archive_dir or not state_dir:
+                return None
+
+            config = self._get_package_manager_config()
+            cmd_parts = ["apt-get install --download-only -q -y"]
+            if not config.get("install_recommends", False):
+                cmd_parts.append("--no-install-recommends")
+            if not config.get("install_suggests", False):
+                cmd_parts.append("--no-install-suggests")
+
+            # 只下载不安装：使用私有的 dpkg 状态、包列表和缓存副本，apt 的锁都落在私有目录中，
+            # 可与正在运行的 apt-get install 并行而不关闭加锁
+            state = state_dir.rstrip('/')
+            cmd_parts.extend([
+                f"-o Dir::State::status={shlex.quote(state + '/dpkg/status')}",
+                f"-o Dir::State::Lists={shlex.quote(state + '/lists/')}",
+                f"-o Dir::Cache={shlex.quote(state + '/cache/')}",
+                f"-o Dir::Cache::archives={shlex.quote(archive_dir.rstrip('/') + '/')}",
+                packages_str,
+            ])
+            return " ".join(cmd_parts)
+
+        prefetch_commands = {
+            "brew": f"brew fetch {packages_str}",
+            "yum": f"sudo yum install --downloadonly -y {packages_str}",
+            "dnf": f"sudo dnf install --downloadonly -y {packages_str}",
+            "pacman": f"sudo pacman -Sw --noconfirm {packages_str}",
+            "zypper": f"sudo zypper --non-interactive install --download-only {packages_str}",
+        }
+
+        return prefetch_commands.get(self.package_manager)
+
+    def get_batch_uninstall_command(self, packages: List[str]) -> str:
+        """Get one removal command for several packages.
+
+        Args:
+            packages: Package names to remove
+
+        Returns:
+            Removal command string, or an empty string if there is nothing to remove
+        """
+        if not packages or not self.package_manager:
+            return ""
+
+        return self._build_uninstall_command(" ".join(packages)) or ""
+
     def needs_apt_update(self) -> bool:
         """检查是否需要执行apt update。
 
+        The decision (with its reason) is kept in apt_update_decision.
+
         Returns:
-            True如果需要执行apt update，False如果已执行过或不需要
+            True如果包列表过期或源已变更，False如果包列表足够新或不是apt系统
         """
         if self.package_manager not in ["apt", "apt-get"]:
+            self.apt_update_decision = None
             return False
 
-        return not self._apt_update_executed
+        self.apt_update_decision = self.apt_update_policy.check()
+        self.logger.info(
+            f"APT update {'needed' if self.apt_update_decision.needed else 'skipped'}: {self.apt_update_decision.reason}"
+        )
+        return self.apt_update_decision.needed
 
     def get_apt_update_command(self) -> Optional[str]:
         """获取apt update命令。
 
         Returns:
-            apt update命令字符串，如果不需要则返回None
+            apt update命令字符串，非apt系统返回None
         """
-        if not self.needs_apt_update():
+        if self.package_manager not in ["apt", "apt-get"]:
             return None
 
-        return "sudo apt-get update"
+        return f"sudo {self._apt_get()} update"
+
+    def set_apt_status_fd(self, enabled: bool) -> None:
+        """Make built apt-get commands print machine-readable progress.
+
+        APT::Status-Fd=1 puts apt's dlstatus/pmstatus records on stdout next
+        to the normal output; an extra descriptor would not survive sudo,
+        which closes inherited descriptors.
+
+        Args:
+            enabled: Add "-o APT::Status-Fd=1" to apt-get commands built from now on
+        """
+        self.apt_status_fd = enabled
+
+    def _apt_get(self) -> str:
+        """Get the apt-get invocation used in built commands."""
+        return "apt-get -o APT::Status-Fd=1" if self.apt_status_fd else "apt-get"
 
     def mark_apt_update_executed(self) -> None:
-        """标记apt update已执行，避免重复执行。"""
-        self._apt_update_executed = True
-        self.logger.info("APT update marked as executed for current session")
+        """记录apt update已成功执行，包列表在max_age内视为最新。"""
+        self.apt_update_policy.mark_updated()
 
     def reset_apt_update_status(self) -> None:
-        """重置apt update状态，允许在新session中重新执行。"""
-        self._apt_update_executed = False
-        self.logger.info("APT update status reset for new session")
+        """使包列表失效，下次安装前重新执行apt update。"""
+        self.apt_update_policy.invalidate("reset requested")
 
     def _get_package_manager_config(self) -> Dict[str, Any]:
         """Get package manager specific configuration parameters.
@@ -758,56 +930,37 @@ class AppInstaller:
         Returns:
             Dictionary containing package manager configuration settings
         """
-        try:
-            # Try to load package manager specific config first
-            config_file_map = {
-                "apt": "applications_apt.yaml",
-                "apt-get": "applications_apt.yaml",
-                "brew": "applications_homebrew.yaml",
-                "yum": "applications_yum.yaml",
-                "dnf": "applications_dnf.yaml",
-                "pacman": "applications_pacman.yaml",
-                "zypper": "applications_zypper.yaml",
-                "apk": "applications_apk.yaml"
-            }
+        return self.catalog.package_manager_options
 
-            config_file = config_file_map.get(self.package_manager)
-            if config_file:
-                config_path = self.config_manager.config_dir / config_file
-                if config_path.exists():
-                    import yaml
-                    with open(config_path, 'r', encoding='utf-8') as f:
-                        config_data = yaml.safe_load(f)
+    def _extract_package_manager_config(self, config_data: Optional[dict]) -> Dict[str, Any]:
+        """Extract package manager options from a parsed catalog file.
 
-                    # 优先读取新格式 package_manager_config.{pm}（中文注释：支持统一的配置结构）
-                    pm_config_root = config_data.get('package_manager_config', {})
+        Args:
+            config_data: Parsed package manager catalog (None if there is no file)
 
-                    # 标准化包管理器名称（中文注释：apt-get 统一使用 apt 配置）
-                    pm_key = 'apt' if self.package_manager == 'apt-get' else self.package_manager
+        Returns:
+            Dictionary containing package manager configuration settings
+        """
+        if config_data is None:
+            # Fallback to general app_install config
+            return self.app_config.get('apt_config', {})
 
-                    if pm_config_root and pm_key in pm_config_root:
-                        return pm_config_root[pm_key]
+        # 优先读取新格式 package_manager_config.{pm}（中文注释：支持统一的配置结构）
+        pm_config_root = config_data.get('package_manager_config', {})
 
-                    # 回退到旧格式 {pm}_config（中文注释：向后兼容现有配置文件）
-                    legacy_key = f'{pm_key}_config'
-                    if legacy_key in config_data:
-                        return config_data[legacy_key]
+        # 标准化包管理器名称（中文注释：apt-get 统一使用 apt 配置）
+        pm_key = 'apt' if self.package_manager == 'apt-get' else self.package_manager
 
-                    # 都不存在时返回空字典，由后续默认配置处理（中文注释：避免配置缺失）
-                    return {}
+        if pm_config_root and pm_key in pm_config_root:
+            return pm_config_root[pm_key]
 
-            # Fallback to general app_install config
-            return self.app_config.get('apt_config', {})
+        # 回退到旧格式 {pm}_config（中文注释：向后兼容现有配置文件）
+        legacy_key = f'{pm_key}_config'
+        if legacy_key in config_data:
+            return config_data[legacy_key]
 
-        except Exception as e:
-            self.logger.warning(f"Failed to load package manager config: {str(e)}")
-            # Return sensible defaults（中文注释：提供安全的默认配置）
-            return {
-                "auto_yes": True,
-                "install_recommends": False,
-                "install_suggests": False,
-                "batch_supported": False  # 默认禁用批量安装
-            }
+        # 都不存在时返回空字典，由后续默认配置处理（中文注释：避免配置缺失）
+        return {}
 
     def _get_apt_config(self) -> Dict[str, Any]:
         """Get APT-specific configuration parameters (legacy method).
@@ -830,24 +983,8 @@ class AppInstaller:
         if self.package_manager != "brew":
             return "formula"
 
-        try:
-            import yaml
-            config_path = self.config_manager.config_dir / "applications_homebrew.yaml"
-
-            if config_path.exists():
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config_data = yaml.safe_load(f)
-
-                app_list = config_data.get("applications", [])
-
-                for app_data in app_list:
-                    if app_data.get("name") == app_name:
-                        return app_data.get("type", "formula")
-
-        except Exception as e:
-            self.logger.debug(f"Failed to get app type from config: {str(e)}")
+        return self.catalog.get_brew_type(app_name)
 
-        return "formula"  # 默认返回 formula
     def get_uninstall_command(self, app: Application) -> Optional[str]:
         """Get the uninstallation command for an application.
 
@@ -860,22 +997,27 @@ class AppInstaller:
         if not self.package_manager:
             return None
 
-        packages = app.package
+        return self._build_uninstall_command(app.package)
 
-        # 处理 Homebrew 特殊情况
+    def _build_uninstall_command(self, packages: str) -> Optional[str]:
+        """Build the removal command of the current package manager.
+
+        Args:
+            packages: Space separated package names
+
+        Returns:
+            Removal command string, or None for an unsupported package manager
+        """
+        # 对于 Homebrew，formula 和 cask 都用 brew uninstall
         if self.package_manager == "brew":
-            # 对于 Homebrew，卸载命令统一使用 brew uninstall
-            # 不论是 formula 还是 cask 都用相同的命令
             return f"brew uninstall {packages}"
 
-        # 获取配置参数 (所有包管理器都需要)
+        # 其他包管理器，根据 auto_yes 配置添加确认参数
         config = self._get_package_manager_config()
         auto_yes = config.get("auto_yes", True)
-
-        # 其他包管理器，根据 auto_yes 配置添加确认参数
         uninstall_commands = {
-            "apt": f"sudo apt-get remove {'-y' if auto_yes else ''} {packages}",
-            "apt-get": f"sudo apt-get remove {'-y' if auto_yes else ''} {packages}",
+            "apt": f"sudo {self._apt_get()} remove {'-y' if auto_yes else ''} {packages}",
+            "apt-get": f"sudo {self._apt_get()} remove {'-y' if auto_yes else ''} {packages}",
             "yum": f"sudo yum remove {'-y' if auto_yes else ''} {packages}",
             "dnf": f"sudo dnf remove {'-y' if auto_yes else ''} {packages}",
             "pacman": f"sudo pacman -R {'--noconfirm' if auto_yes else ''} {packages}",
@@ -905,42 +1047,11 @@ class AppInstaller:
         self.logger.info("Starting two-layer status refresh for all software items")
 
         try:
-            # Use asyncio to run the two-layer check
-            import asyncio
-            import concurrent.futures
-
-            # Check if we're already in an async context
-            try:
-                current_loop = asyncio.get_running_loop()
-                # We're in an async context, use thread to run the async function
-                self.logger.debug("Running in async context, using ThreadPoolExecutor")
-
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    # Create a new event loop in the thread
-                    def run_check():
-                        # Create new event loop for this thread
-                        new_loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(new_loop)
-                        try:
-                            return new_loop.run_until_complete(
-                                self.two_layer_checker.check_software_items(self.software_items)
-                            )
-                        finally:
-                            new_loop.close()
-
-                    status_results = executor.submit(run_check).result()
-
-            except RuntimeError:
-                # No event loop running, we can create one
-                self.logger.debug("No event loop running, creating new one")
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    status_results = loop.run_until_complete(
-                        self.two_layer_checker.check_software_items(self.software_items)
-                    )
-                finally:
-                    loop.close()
+            # Run the two-layer check on the shared background loop
+            status_results = get_runtime().run_sync(
+                self.two_layer_checker.check_software_items(self.software_items),
+                name="refresh_all_status",
+            )
 
             # Update self.applications for backward compatibility
             # The software items are already updated by check_software_items
@@ -969,41 +1080,10 @@ class AppInstaller:
     def _fallback_batch_refresh(self) -> None:
         """Fallback method using batch checking only."""
         try:
-            import asyncio
-            import concurrent.futures
-
-            # Check if we're already in an async context
-            try:
-                current_loop = asyncio.get_running_loop()
-                # We're in an async context, use thread to run the async function
-                self.logger.debug("Fallback: Running in async context, using ThreadPoolExecutor")
-
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    # Create a new event loop in the thread
-                    def run_batch_check():
-                        # Create new event loop for this thread
-                        new_loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(new_loop)
-                        try:
-                            return new_loop.run_until_complete(
-                                self.batch_checker.batch_check_applications(self.applications)
-                            )
-                        finally:
-                            new_loop.close()
-
-                    status_results = executor.submit(run_batch_check).result()
-
-            except RuntimeError:
-                # No event loop running, we can create one
-                self.logger.debug("Fallback: No event loop running, creating new one")
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    status_results = loop.run_until_complete(
-                        self.batch_checker.batch_check_applications(self.applications)
-                    )
-                finally:
-                    loop.close()
+            status_results = get_runtime().run_sync(
+                self.batch_checker.batch_check_applications(self.applications),
+                name="fallback_batch_refresh",
+            )
 
             # Update application status
             for app in self.applications:
@@ -1034,6 +1114,214 @@ class AppInstaller:
         """
         self.refresh_all_status()
         return self.software_items
+
+    def stream_all_status(self, on_results: Callable[[Dict[str, bool]], None]) -> None:
+        """Refresh all software items, reporting applications as soon as they are resolved.
+
+        The check runs on the shared background loop while the calling
+        (worker) thread blocks; on_results is invoked on the calling thread
+        with every batch of results that arrived since the previous call,
+        so a slow consumer automatically receives larger batches.
+
+        Args:
+            on_results: Callback receiving {app_name: installed}
+        """
+        self.logger.info("Starting streaming status refresh for all software items")
+        results_queue: "queue.Queue" = queue.Queue()
+        finished = object()
+        reported = set()
+
+        async def produce() -> None:
+            async for app, installed in self.two_layer_checker.iter_check_software_items(self.software_items):
+                results_queue.put((app.name, installed))
+
+        future = get_runtime().submit(produce(), name="stream_all_status")
+        # 完成、失败或被取消（包括在开始执行前被取消）时都会放入结束标记
+        future.add_done_callback(lambda _: results_queue.put(finished))
+        done = False
+        while not done:
+            batch = {}
+            item = results_queue.get()
+            while True:
+                if item is finished:
+                    done = True
+                    break
+                batch[item[0]] = item[1]
+                try:
+                    item = results_queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                reported.update(batch)
+                on_results(batch)
+
+        if future.cancelled():
+            self.logger.info("Streaming status refresh cancelled")
+            return
+
+        try:
+            future.result()
+        except Exception as e:
+            self.logger.error(f"Streaming status refresh failed: {str(e)}")
+            self.logger.info("Falling back to batch-only status checks")
+            self.applications = self._get_all_applications_flat()
+            self._fallback_batch_refresh()
+            remaining = {app.name: app.installed for app in self.applications if app.name not in reported}
+            if remaining:
+                on_results(remaining)
+
+        self.applications = self._get_all_applications_flat()
+        installed_apps = sum(1 for app in self.applications if app.installed)
+        self.logger.info(f"Streaming status refresh completed: {installed_apps}/{len(self.applications)} applications installed")
+
+    def refresh_application_status(self, app_names: Iterable[str], packages: Iterable[str] = ()) -> Dict[str, bool]:
+        """Re-check only the applications touched by an install/uninstall session.
+
+        Applications are selected by name, plus any other catalog entry
+        sharing one of the touched packages.
+
+        Args:
+            app_names: Names of the applications that were installed or uninstalled
+            packages: Package names the session operated on
+
+        Returns:
+            Dictionary mapping the re-checked application names to installation status
+        """
+        targets = self.catalog.applications_for_packages(packages)
+        seen = {id(app) for app in targets}
+        for name in app_names:
+            app = self.catalog.get(name)
+            if app is not None and id(app) not in seen:
+                seen.add(id(app))
+                targets.append(app)
+        if not targets:
+            return {}
+
+        try:
+            return get_runtime().run_sync(
+                self.two_layer_checker.refresh_applications(targets), name="refresh_application_status"
+            )
+        except Exception as e:
+            self.logger.error(f"Targeted status refresh failed: {str(e)}")
+            results = {}
+            for app in targets:
+                app.installed = self.check_application_status(app)
+                results[app.name] = app.installed
+            return results
+
+    def start_status_watcher(self, on_status_change: Callable[[Dict[str, bool]], None]) -> bool:
+        """Start watching the package database and PATH for status changes.
+
+        Only applications affected by a change are re-checked, and the
+        callback receives just the applications whose status flipped.
+        The callback runs on the watcher thread.
+
+        Args:
+            on_status_change: Callback receiving {app_name: installed}
+
+        Returns:
+            True if the watcher is running, False otherwise
+        """
+        watcher_config = self.app_config.get('status_watcher', {})
+        if not watcher_config.get('enabled', True):
+            self.logger.info("Package status watcher disabled by configuration")
+            return False
+
+        self._status_change_callback = on_status_change
+        if self.status_watcher is not None and self.status_watcher.is_running:
+            return True
+
+        self._watch_package_snapshot = self._snapshot_native_package_status()
+        self.status_watcher = PackageStatusWatcher(
+            self.two_layer_checker.status_cache.get_database_paths(),
+            self._handle_status_watch_event,
+            watch_path_dirs=watcher_config.get('watch_path', True),
+            debounce_seconds=float(watcher_config.get('debounce_seconds', 1.0)),
+            poll_interval_seconds=float(watcher_config.get('poll_interval_seconds', 2.0)),
+        )
+        return self.status_watcher.start()
+
+    def stop_status_watcher(self) -> None:
+        """Stop the package status watcher if it is running."""
+        if self.status_watcher is not None:
+            self.status_watcher.stop()
+            self.status_watcher = None
+        self._status_change_callback = None
+
+    def _handle_status_watch_event(self, event: WatchEvent) -> None:
+        """Re-check applications affected by a filesystem change (watcher thread)."""
+        affected_apps = self._resolve_watch_affected_applications(event)
+        if not affected_apps:
+            return
+
+        self.logger.debug(f"Re-checking {len(affected_apps)} applications after package status change")
+        results = get_runtime().run_sync(
+            self.two_layer_checker.check_applications(affected_apps), name="status_watch_recheck"
+        )
+
+        changes = {
+            app.name: results[app.name]
+            for app in affected_apps
+            if app.name in results and results[app.name] != app.installed
+        }
+        if not changes:
+            return
+
+        self.logger.info(f"Detected external status change for: {', '.join(sorted(changes))}")
+        callback = self._status_change_callback
+        if callback:
+            callback(changes)
+
+    def _resolve_watch_affected_applications(self, event: WatchEvent) -> List[Application]:
+        """Map a watch event to the applications that need re-checking."""
+        if event.full_rescan:
+            self._watch_package_snapshot = self._snapshot_native_package_status()
+            return list(self.applications)
+
+        changed_packages: Optional[set] = set()
+        if event.database_changed:
+            snapshot = self._snapshot_native_package_status()
+            previous = self._watch_package_snapshot
+            self._watch_package_snapshot = snapshot
+            if snapshot is None or previous is None:
+                # 无法对比数据库内容时，重新检查全部应用
+                changed_packages = None
+            else:
+                changed_packages = {
+                    package for package in set(snapshot) | set(previous)
+                    if snapshot.get(package) != previous.get(package)
+                }
+
+        if changed_packages is None:
+            return list(self.applications)
+
+        affected = self.catalog.applications_for_packages(changed_packages)
+        seen = {id(app) for app in affected}
+        for app in self.catalog.applications_for_executables(event.executables):
+            if id(app) not in seen:
+                affected.append(app)
+        return affected
+
+    def _snapshot_native_package_status(self) -> Optional[Dict[str, bool]]:
+        """Read catalog packages' status straight from the local database.
+
+        Returns:
+            Dictionary mapping package names to installed flags, or None if
+            no in-process reader exists for the current package manager
+        """
+        reader = self.package_db_reader
+        if reader is None:
+            return None
+
+        try:
+            snapshot = {}
+            for app in self.applications:
+                for package in app.get_package_list():
+                    snapshot[package] = reader.is_installed(package)
+            return snapshot
+        except OSError as e:
+            self.logger.debug(f"Failed to snapshot package database: {e}")
+            return None
     
     def execute_command(self, command: str) -> Tuple[bool, str]:
         """Execute a shell command.
@@ -1362,6 +1650,14 @@ class AppInstaller:
         """
         self.log_manager.set_ui_callback(callback)
 
+    def set_log_writer(self, log_writer: Optional[BufferedLogWriter]) -> None:
+        """Set the writer receiving the logging session's records.
+
+        Args:
+            log_writer: Session log file writer, or None to stop file logging
+        """
+        self.log_manager.set_log_writer(log_writer)
+
     def end_logging_session(self) -> None:
         """End the current logging session."""
         self.logger.info("Ending installation logging session")
@@ -1426,29 +1722,15 @@ class AppInstaller:
         try:
             self.logger.debug(f"Saving installation status for {app_name}: {installed}")
 
-            # Find the application and update its status
-            updated = False
-            for app in self.applications:
-                if app.name == app_name:
-                    app.installed = installed
-                    updated = True
-                    self.logger.debug(f"Updated application {app_name} status to {installed}")
-                    break
-
-            # Also update in software_items if it's in a suite
-            for item in self.software_items:
-                if isinstance(item, ApplicationSuite):
-                    for component in item.components:
-                        if component.name == app_name:
-                            component.installed = installed
-                            updated = True
-                            self.logger.debug(f"Updated suite component {app_name} status to {installed}")
-                            break
-
-            if not updated:
+            # Suite components and standalone applications share one catalog index
+            app = self.catalog.get(app_name)
+            if app is None:
                 self.logger.warning(f"Application {app_name} not found in current configuration")
                 return False
 
+            app.installed = installed
+            self.logger.debug(f"Updated application {app_name} status to {installed}")
+
             # Log the status change as an installation event
             action = "install" if installed else "uninstall"
             status = "completed" if installed else "removed"
@@ -0,0 +1,178 @@
+"""Freshness policy deciding whether apt's package lists need an update."""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from ..utils.logger import get_module_logger
+from ..utils.state_dir import get_state_dir
+from .package_db_readers import stat_fingerprint
+
+
+@dataclass
+class AptUpdateDecision:
+    """Outcome of a freshness check.
+
+    Attributes:
+        needed: True if apt-get update should run
+        reason: Human readable explanation (logged in the session log)
+        age_seconds: Age of the package lists, if they exist
+    """
+    needed: bool
+    reason: str
+    age_seconds: Optional[float] = None
+
+
+def _format_age(seconds: float) -> str:
+    """Format an age in seconds as minutes or hours."""
+    minutes = seconds / 60
+    if minutes < 120:
+        return f"{int(minutes)} min"
+    return f"{minutes / 60:.1f} h"
+
+
+class AptUpdatePolicy:
+    """Skip apt-get update when the package lists are recent enough.
+
+    The lists are fresh when the newest file in /var/lib/apt/lists (the
+    InRelease/Release and Packages files written by apt-get update) is
+    younger than max_age, the sources have not changed since then, and no
+    mirror switch invalidated them. apt sets downloaded files' mtimes to the
+    server's Last-Modified time, so a successful update run by this tool is
+    also recorded in a small state file; the newer of the two counts.
+    """
+
+    STATE_VERSION = 1
+    LISTS_DIR = Path("/var/lib/apt/lists")
+    SOURCES_PATHS = [Path("/etc/apt/sources.list"), Path("/etc/apt/sources.list.d")]
+    # Files in the lists directory that are not package lists
+    IGNORED_LIST_ENTRIES = {"lock", "partial", "auxfiles"}
+
+    def __init__(self, max_age_minutes: float = 60, state_dir: Optional[Path] = None):
+        """Initialize the policy.
+
+        Args:
+            max_age_minutes: Maximum age of the package lists before an update is needed (0 always updates)
+            state_dir: Directory for the state file (defaults to the user's state directory)
+        """
+        self.max_age = max(0.0, float(max_age_minutes)) * 60
+        self.logger = get_module_logger("apt_update_policy")
+        self.state_dir = Path(state_dir) if state_dir else get_state_dir()
+        self.state_file = self.state_dir / "apt_update.json"
+
+    def check(self) -> AptUpdateDecision:
+        """Decide whether the package lists need an update.
+
+        Returns:
+            AptUpdateDecision with the reason for the decision
+        """
+        state = self._load_state()
+        lists_mtime = self._newest_list_mtime()
+        if lists_mtime is None:
+            return AptUpdateDecision(True, "no package lists found")
+
+        refreshed = max(lists_mtime, state.get("last_update") or 0)
+        age = max(0.0, time.time() - refreshed)
+
+        invalidated = state.get("invalidated")
+        if invalidated and invalidated >= refreshed:
+            return AptUpdateDecision(True, f"package sources changed ({state.get('invalidated_reason') or 'invalidated'})", age)
+
+        sources = self._sources_fingerprint()
+        if state.get("sources") is not None and state["sources"] != sources:
+            return AptUpdateDecision(True, "package sources changed since the last update", age)
+        sources_mtime = max((entry[1] / 1e9 for entry in sources), default=0)
+        if sources_mtime > refreshed:
+            return AptUpdateDecision(True, "package sources are newer than the package lists", age)
+
+        if self.max_age == 0:
+            return AptUpdateDecision(True, "freshness check disabled (max age 0)", age)
+        if age > self.max_age:
+            return AptUpdateDecision(
+                True, f"package lists are {_format_age(age)} old (max {_format_age(self.max_age)})", age
+            )
+        return AptUpdateDecision(
+            False, f"package lists refreshed {_format_age(age)} ago (max age {_format_age(self.max_age)})", age
+        )
+
+    def mark_updated(self) -> None:
+        """Record a successful apt-get update together with the current sources."""
+        self._store_state({
+            "last_update": time.time(),
+            "sources": self._sources_fingerprint(),
+        })
+        self.logger.info("APT package lists marked as updated")
+
+    def invalidate(self, reason: str = "") -> None:
+        """Force the next check to request an update (e.g. after a mirror switch).
+
+        Args:
+            reason: Why the lists became stale (shown in the decision)
+        """
+        state = self._load_state()
+        state.update({"invalidated": time.time(), "invalidated_reason": reason})
+        self._store_state(state)
+        self.logger.info(f"APT package lists invalidated: {reason or 'no reason given'}")
+
+    def _newest_list_mtime(self) -> Optional[float]:
+        """Get the newest modification time among the package list files."""
+        newest = None
+        try:
+            with os.scandir(self.LISTS_DIR) as entries:
+                for entry in entries:
+                    if entry.name in self.IGNORED_LIST_ENTRIES or not entry.is_file():
+                        continue
+                    mtime = entry.stat().st_mtime
+                    if newest is None or mtime > newest:
+                        newest = mtime
+        except OSError as e:
+            self.logger.debug(f"Cannot read {self.LISTS_DIR}: {e}")
+        return newest
+
+    def _sources_fingerprint(self) -> List[List]:
+        """Fingerprint sources.list and the files in sources.list.d."""
+        paths = []
+        for path in self.SOURCES_PATHS:
+            if path.is_dir():
+                try:
+                    paths.extend(sorted(child for child in path.iterdir()
+                                        if child.suffix in (".list", ".sources")))
+                except OSError:
+                    pass
+            paths.append(path)
+
+        fingerprint = []
+        for path in paths:
+            stat = stat_fingerprint(path)
+            if stat is not None:
+                fingerprint.append([str(path), *stat])
+        return fingerprint
+
+    def _load_state(self) -> dict:
+        """Read the state file (empty if missing or unreadable)."""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Failed to read apt update state: {e}")
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self.STATE_VERSION:
+            return {}
+        return data
+
+    def _store_state(self, state: dict) -> None:
+        """Write the state file atomically."""
+        state = dict(state, version=self.STATE_VERSION)
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.state_file.with_suffix(".tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_file, self.state_file)
+        except OSError as e:
+            self.logger.warning(f"Failed to write apt update state: {e}")
@@ -3,24 +3,37 @@
 import subprocess
 import asyncio
 import time
-from typing import List, Dict, Tuple
+from typing import AsyncIterator, List, Dict, Tuple, Optional
 from ..utils.logger import get_module_logger
+from .app_catalog import AppCatalog
 from .software_models import Application
+from .package_db_readers import create_package_db_reader
+from .concurrency_limiter import AdaptiveConcurrencyLimiter
 
 
 class BatchPackageChecker:
     """Efficient batch package status checker using native package manager commands."""
 
-    def __init__(self, package_manager_type: str):
+    def __init__(self, package_manager_type: str, max_concurrency: Optional[int] = None,
+                 catalog: Optional[AppCatalog] = None):
         """Initialize the batch package checker.
 
         Args:
             package_manager_type: Type of package manager (apt, brew, yum, etc.)
+            max_concurrency: Upper bound for concurrent individual checks (None = auto)
+            catalog: Compiled application catalog (provides the Homebrew install kinds)
         """
         self.pm_type = package_manager_type
+        self.catalog = catalog
         self.logger = get_module_logger("batch_package_checker")
         self.batch_timeout = 30  # 30 seconds timeout for batch operations
 
+        # In-process local database reader (dpkg, Homebrew, pacman, apk; no subprocesses)
+        self.db_reader = create_package_db_reader(package_manager_type)
+
+        # Bounded, latency-adaptive concurrency for per-package subprocess checks
+        self.limiter = AdaptiveConcurrencyLimiter(max_concurrency)
+
         # Package manager specific configurations
         self.pm_configs = {
             "apt": {
@@ -51,11 +64,11 @@ class BatchPackageChecker:
                 "check_cmd": ["pacman", "-Qq"]
             },
             "zypper": {
-                "batch_supported": False,  # Use individual checks
-                "check_cmd": ["rpm", "-q"]
+                "batch_supported": True,
+                "check_cmd": ["rpm", "-qa", "--queryformat", "%{NAME}\\n"]
             },
             "apk": {
-                "batch_supported": False,  # Use individual checks
+                "batch_supported": True,
                 "check_cmd": ["apk", "info", "-e"]
             }
         }
@@ -98,6 +111,39 @@ class BatchPackageChecker:
             self.logger.info("Falling back to individual checks due to batch failure")
             return await self._concurrent_individual_checks(applications)
 
+    async def iter_check_applications(self, applications: List[Application]) -> AsyncIterator[Tuple[Application, bool]]:
+        """Yield (application, installed) as soon as each application is resolved.
+
+        Batch-capable package managers answer every application with a single
+        query, so their results arrive together; individual checks stream each
+        application as soon as the last of its packages has been checked.
+
+        Args:
+            applications: List of applications to check
+
+        Yields:
+            Tuples of (application, installation status)
+        """
+        if not applications:
+            return
+
+        if self._supports_batch_check():
+            results = await self.batch_check_applications(applications)
+            for app in applications:
+                yield app, results.get(app.name, False)
+            return
+
+        resolved = set()
+        try:
+            async for app, installed in self._iter_individual_checks(applications):
+                resolved.add(app.name)
+                yield app, installed
+        except Exception as e:
+            self.logger.error(f"Streaming individual checks failed: {str(e)}")
+            for app in applications:
+                if app.name not in resolved:
+                    yield app, False
+
     def _supports_batch_check(self) -> bool:
         """Check if current package manager supports batch checking."""
         config = self.pm_configs.get(self.pm_type, {})
@@ -109,17 +155,50 @@ class BatchPackageChecker:
             return await self._batch_apt_check(applications)
         elif self.pm_type == "brew":
             return await self._batch_brew_check(applications)
-        elif self.pm_type in ["yum", "dnf"]:
+        elif self.pm_type in ["yum", "dnf", "zypper"]:
             return await self._batch_rpm_check(applications)
         elif self.pm_type == "pacman":
             return await self._batch_pacman_check(applications)
+        elif self.pm_type == "apk":
+            return await self._batch_apk_check(applications)
         else:
             # Unknown package manager, fallback to individual
             return await self._concurrent_individual_checks(applications)
 
     async def _batch_apt_check(self, applications: List[Application]) -> Dict[str, bool]:
-        """APT/DEB batch check using dpkg-query."""
+        """APT/DEB batch check using the dpkg status database, with dpkg-query as fallback."""
         self.logger.debug("Executing APT batch check")
+
+        # Fast path: parse /var/lib/dpkg/status in-process
+        try:
+            return self._batch_check_from_database(applications)
+        except OSError as e:
+            self.logger.warning(f"Cannot read dpkg status file, falling back to dpkg-query: {e}")
+
+        return await self._batch_apt_check_with_dpkg_query(applications)
+
+    def _batch_check_from_database(self, applications: List[Application]) -> Dict[str, bool]:
+        """Batch check by reading the local package database in-process.
+
+        Raises:
+            OSError: If there is no native reader or the database cannot be read
+        """
+        if self.db_reader is None:
+            raise FileNotFoundError(f"No native package database reader for {self.pm_type}")
+
+        self.db_reader.read_packages()
+        results = {}
+
+        for app in applications:
+            packages = app.get_package_list()
+            # All packages must be installed for the application to be considered installed
+            results[app.name] = all(self.db_reader.is_installed(pkg) for pkg in packages)
+
+        self.logger.debug(f"{self.db_reader.DATABASE_NAME} check resolved {len(results)} applications")
+        return results
+
+    async def _batch_apt_check_with_dpkg_query(self, applications: List[Application]) -> Dict[str, bool]:
+        """APT/DEB batch check using dpkg-query."""
         results = {}
 
         try:
@@ -189,8 +268,19 @@ class BatchPackageChecker:
         return results
 
     async def _batch_brew_check(self, applications: List[Application]) -> Dict[str, bool]:
-        """Homebrew batch check using brew list commands."""
+        """Homebrew batch check scanning Cellar/Caskroom, with brew list as fallback."""
         self.logger.debug("Executing Homebrew batch check")
+
+        # Fast path: read the Homebrew prefix directly (no Ruby startup)
+        try:
+            return self._batch_check_from_database(applications)
+        except OSError as e:
+            self.logger.warning(f"Cannot scan Homebrew Cellar, falling back to brew list: {e}")
+
+        return await self._batch_brew_check_with_brew_list(applications)
+
+    async def _batch_brew_check_with_brew_list(self, applications: List[Application]) -> Dict[str, bool]:
+        """Homebrew batch check using brew list commands."""
         results = {}
 
         try:
@@ -251,8 +341,19 @@ class BatchPackageChecker:
         return results
 
     async def _batch_rpm_check(self, applications: List[Application]) -> Dict[str, bool]:
-        """YUM/DNF batch check using rpm -qa."""
+        """YUM/DNF/zypper batch check reading rpmdb.sqlite, with rpm -qa as fallback."""
         self.logger.debug("Executing RPM batch check")
+
+        # Fast path: query the sqlite rpm database directly (BDB/NDB hosts fall back)
+        try:
+            return self._batch_check_from_database(applications)
+        except OSError as e:
+            self.logger.warning(f"Cannot read rpm sqlite database, falling back to rpm -qa: {e}")
+
+        return await self._batch_rpm_check_with_rpm_query(applications)
+
+    async def _batch_rpm_check_with_rpm_query(self, applications: List[Application]) -> Dict[str, bool]:
+        """RPM batch check using rpm -qa."""
         results = {}
 
         try:
@@ -299,8 +400,19 @@ class BatchPackageChecker:
         return results
 
     async def _batch_pacman_check(self, applications: List[Application]) -> Dict[str, bool]:
-        """Pacman batch check using pacman -Qq."""
+        """Pacman batch check reading /var/lib/pacman/local, with pacman -Qq as fallback."""
         self.logger.debug("Executing Pacman batch check")
+
+        # Fast path: read the local database directory in-process
+        try:
+            return self._batch_check_from_database(applications)
+        except OSError as e:
+            self.logger.warning(f"Cannot read pacman local database, falling back to pacman -Qq: {e}")
+
+        return await self._batch_pacman_check_with_pacman(applications)
+
+    async def _batch_pacman_check_with_pacman(self, applications: List[Application]) -> Dict[str, bool]:
+        """Pacman batch check using pacman -Qq."""
         results = {}
 
         try:
@@ -346,47 +458,102 @@ class BatchPackageChecker:
 
         return results
 
-    async def _concurrent_individual_checks(self, applications: List[Application]) -> Dict[str, bool]:
-        """Fallback: Concurrent individual package checks."""
-        self.logger.debug(f"Running concurrent individual checks for {len(applications)} applications")
-        results = {}
+    async def _batch_apk_check(self, applications: List[Application]) -> Dict[str, bool]:
+        """APK batch check reading /lib/apk/db/installed, with individual checks as fallback."""
+        self.logger.debug("Executing APK batch check")
 
-        async def check_single_app(app: Application) -> Tuple[str, bool]:
-            """Check a single application."""
-            try:
-                packages = app.get_package_list()
-                for package in packages:
-                    if not await self._is_package_installed_async(package):
-                        return app.name, False
-                return app.name, True
-            except Exception as e:
-                self.logger.warning(f"Individual check failed for {app.name}: {str(e)}")
-                return app.name, False
+        try:
+            return self._batch_check_from_database(applications)
+        except OSError as e:
+            self.logger.warning(f"Cannot read apk installed database, falling back to individual checks: {e}")
 
-        # Run all checks concurrently
-        tasks = [check_single_app(app) for app in applications]
+        return await self._concurrent_individual_checks(applications)
 
-        try:
-            check_results = await asyncio.gather(*tasks, return_exceptions=True)
+    async def _concurrent_individual_checks(self, applications: List[Application]) -> Dict[str, bool]:
+        """Fallback: bounded concurrent individual package checks.
 
-            for result in check_results:
-                if isinstance(result, tuple):
-                    app_name, is_installed = result
-                    results[app_name] = is_installed
-                else:
-                    # Exception occurred
-                    self.logger.warning(f"Individual check exception: {result}")
+        Packages shared between applications (e.g. suite components) are
+        queried once, and at most limiter.limit checks run at the same time.
+        """
+        self.logger.debug(f"Running concurrent individual checks for {len(applications)} applications")
+        results = {}
 
+        try:
+            async for app, installed in self._iter_individual_checks(applications):
+                results[app.name] = installed
         except Exception as e:
             self.logger.error(f"Concurrent individual checks failed: {str(e)}")
-            # Final fallback: assume all not installed
-            for app in applications:
-                results[app.name] = False
+
+        # Final fallback: anything left unresolved is assumed not installed
+        for app in applications:
+            results.setdefault(app.name, False)
 
         return results
 
+    async def _iter_individual_checks(self, applications: List[Application]) -> AsyncIterator[Tuple[Application, bool]]:
+        """Run coalesced per-package checks and yield applications as they resolve."""
+        # Coalesce: each distinct package is queried exactly once
+        package_apps: Dict[str, List[Application]] = {}
+        pending: Dict[str, int] = {}
+        installed: Dict[str, bool] = {}
+
+        for app in applications:
+            packages = list(dict.fromkeys(app.get_package_list()))
+            pending[app.name] = len(packages)
+            installed[app.name] = True
+            for package in packages:
+                package_apps.setdefault(package, []).append(app)
+
+        # Applications without packages resolve immediately (all() of nothing)
+        for app in applications:
+            if pending[app.name] == 0:
+                yield app, True
+
+        async def check_package(package: str) -> Tuple[str, bool]:
+            """Check a single package within a concurrency slot."""
+            try:
+                async with self.limiter.slot():
+                    return package, await self._is_package_installed_async(package)
+            except Exception as e:
+                self.logger.warning(f"Individual check exception for {package}: {e}")
+                return package, False
+
+        tasks = [asyncio.ensure_future(check_package(package)) for package in package_apps]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                package, package_installed = await next_done
+                for app in package_apps[package]:
+                    installed[app.name] = installed[app.name] and package_installed
+                    pending[app.name] -= 1
+                    if pending[app.name] == 0:
+                        yield app, installed[app.name]
+        finally:
+            # 消费者提前退出时取消尚未完成的检查
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        self.logger.debug(
+            f"Individual checks: {len(package_apps)} unique packages for {len(applications)} applications, "
+            f"concurrency limit {self.limiter.limit}"
+        )
+
+    def _brew_type_of(self, package: str) -> str:
+        """Get the Homebrew install kind of a package ('both' when unknown or mixed)."""
+        if self.catalog is None:
+            return "both"
+        kinds = {self.catalog.get_brew_type(app.name) for app in self.catalog.by_package.get(package, ())}
+        return kinds.pop() if len(kinds) == 1 else "both"
+
     async def _is_package_installed_async(self, package: str) -> bool:
         """Async version of individual package check."""
+        # Native database lookup first (no subprocess)
+        if self.db_reader is not None:
+            try:
+                return self.db_reader.is_installed(package)
+            except OSError:
+                pass
+
         try:
             if self.pm_type in ["apt", "apt-get"]:
                 cmd = ["dpkg", "-l", package]
@@ -410,19 +577,23 @@ class BatchPackageChecker:
                 return False
 
             elif self.pm_type == "brew":
-                # Try both formula and cask
+                # Only query the install kinds the catalog declares for this package
+                brew_type = self._brew_type_of(package)
                 formula_cmd = ["brew", "list", package]
                 cask_cmd = ["brew", "list", "--cask", package]
 
                 # Check formula first
-                process = await asyncio.create_subprocess_exec(
-                    *formula_cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                await process.wait()
-                if process.returncode == 0:
-                    return True
+                if brew_type != "cask":
+                    process = await asyncio.create_subprocess_exec(
+                        *formula_cmd,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE
+                    )
+                    await process.wait()
+                    if process.returncode == 0:
+                        return True
+                    if brew_type == "formula":
+                        return False
 
                 # Check cask if formula failed
                 process = await asyncio.create_subprocess_exec(
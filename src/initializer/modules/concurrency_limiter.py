@@ -0,0 +1,113 @@
+"""Adaptive concurrency limiter for package status subprocesses."""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from ..utils.logger import get_module_logger
+
+
+class AdaptiveConcurrencyLimiter:
+    """Bound concurrent subprocess checks and adapt the bound to observed latency.
+
+    The limit starts from the CPU count and follows an AIMD policy: it grows
+    by one slot while checks complete faster than the target latency and
+    work is queued, and shrinks by a quarter when checks become slow (a sign
+    the host is overloaded). The learned limit persists across refreshes,
+    while the asyncio primitives are recreated for each event loop.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, target_latency: float = 1.0):
+        """Initialize the limiter.
+
+        Args:
+            max_concurrency: Upper bound for concurrent checks (None or 0 = auto from CPU count)
+            target_latency: Per-check latency (seconds) above which concurrency is reduced
+        """
+        cpu_count = os.cpu_count() or 2
+        self.max_limit = max_concurrency if max_concurrency and max_concurrency > 0 else min(32, cpu_count * 4)
+        self.min_limit = 1
+        self.limit = max(self.min_limit, min(self.max_limit, cpu_count * 2))
+        self.target_latency = target_latency
+        self.logger = get_module_logger("concurrency_limiter")
+
+        self._active = 0
+        self._waiting = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.stats = {
+            "completed": 0,
+            "max_queue_depth": 0,
+            "avg_latency": 0.0,
+            "max_latency": 0.0,
+            "total_wait_time": 0.0,
+        }
+
+    def _get_condition(self) -> asyncio.Condition:
+        """Get the condition bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            # 每次刷新可能运行在新的事件循环中，需重新创建同步原语
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self._active = 0
+            self._waiting = 0
+        return self._condition
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one concurrency slot for the duration of the block."""
+        condition = self._get_condition()
+        queued_at = time.monotonic()
+
+        async with condition:
+            self._waiting += 1
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self._waiting)
+            try:
+                await condition.wait_for(lambda: self._active < self.limit)
+            finally:
+                self._waiting -= 1
+            self._active += 1
+
+        started_at = time.monotonic()
+        self.stats["total_wait_time"] += started_at - queued_at
+        try:
+            yield
+        finally:
+            self._record_latency(time.monotonic() - started_at)
+            async with condition:
+                self._active -= 1
+                condition.notify_all()
+
+    def _record_latency(self, latency: float) -> None:
+        """Update latency statistics and adjust the limit (AIMD)."""
+        stats = self.stats
+        stats["completed"] += 1
+        # Exponentially weighted moving average
+        stats["avg_latency"] = latency if stats["completed"] == 1 else stats["avg_latency"] * 0.8 + latency * 0.2
+        stats["max_latency"] = max(stats["max_latency"], latency)
+
+        if stats["avg_latency"] > self.target_latency:
+            new_limit = max(self.min_limit, int(self.limit * 0.75))
+            if new_limit != self.limit:
+                self.logger.debug(f"Check latency {stats['avg_latency']:.2f}s, reducing concurrency to {new_limit}")
+                self.limit = new_limit
+        elif self._waiting > 0 and self.limit < self.max_limit:
+            self.limit += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter state and latency statistics."""
+        return {
+            "concurrency_limit": self.limit,
+            "max_concurrency": self.max_limit,
+            "active": self._active,
+            "queue_depth": self._waiting,
+            "max_queue_depth": self.stats["max_queue_depth"],
+            "completed_checks": self.stats["completed"],
+            "avg_latency_ms": round(self.stats["avg_latency"] * 1000, 1),
+            "max_latency_ms": round(self.stats["max_latency"] * 1000, 1),
+            "total_wait_seconds": round(self.stats["total_wait_time"], 3),
+        }
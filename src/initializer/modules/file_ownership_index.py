@@ -0,0 +1,334 @@
+"""File ownership indexes mapping installed paths to their owning packages."""
+
+import mmap
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from ..utils.logger import get_module_logger
+from .package_db_readers import HomebrewCellarReader, RpmDbReader, stat_fingerprint
+
+
+class FileOwnershipIndex(ABC):
+    """Lazily built path -> owning packages index.
+
+    Only shallow paths (at most MAX_DEPTH components, e.g. /usr/bin/git,
+    /etc/vim, /usr/share/vim) are indexed: those are the only locations the
+    L2 quick checks ever look at, and it keeps the index small. The index is
+    built on first use and rebuilt when the package database fingerprint
+    changes.
+    """
+
+    MAX_DEPTH = 3
+    # Re-stat the database at most this often (seconds) during lookup bursts
+    FRESHNESS_INTERVAL = 1.0
+    DATABASE_NAME = "file list database"
+
+    def __init__(self, db_path: Path):
+        """Initialize the index.
+
+        Args:
+            db_path: File or directory whose fingerprint tracks installed file lists
+        """
+        self.db_path = Path(db_path)
+        self.logger = get_module_logger("file_ownership_index")
+        self._owners: Optional[Dict[str, Tuple[str, ...]]] = None
+        self._fingerprint = None
+        # Resolved lookups, cleared whenever the index is rebuilt
+        self._lookup_cache: Dict[str, FrozenSet[str]] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        """Check whether the file list database exists and is readable."""
+        return os.access(self.db_path, os.R_OK)
+
+    def fingerprint(self):
+        """Get the current fingerprint of the file list database."""
+        return stat_fingerprint(self.db_path)
+
+    def owners(self, path: str) -> Set[str]:
+        """Get the packages owning a path.
+
+        Usrmerge aliases (/bin vs /usr/bin) and symlink targets (e.g.
+        alternatives such as /usr/bin/vi -> /usr/bin/vim.basic) are
+        resolved as well.
+
+        Args:
+            path: Absolute path to look up
+
+        Returns:
+            Set of owning package names (empty if unowned or unknown)
+
+        Raises:
+            OSError: If the file list database cannot be read
+        """
+        index = self._ensure_index()
+        cached = self._lookup_cache.get(path)
+        if cached is None:
+            owners: Set[str] = set()
+            for candidate in self._candidate_paths(path):
+                owners.update(index.get(candidate, ()))
+            cached = self._lookup_cache[path] = frozenset(owners)
+        return set(cached)
+
+    def is_owned_by(self, path: str, packages: Iterable[str]) -> bool:
+        """Check whether a path belongs to any of the given packages.
+
+        Raises:
+            OSError: If the file list database cannot be read
+        """
+        owners = self.owners(path)
+        return any(self.normalize_package(package) in owners for package in packages)
+
+    @staticmethod
+    def normalize_package(package: str) -> str:
+        """Strip qualifiers (architecture, tap) so names match index entries."""
+        return package.split(":", 1)[0].rsplit("/", 1)[-1]
+
+    def _ensure_index(self) -> Dict[str, Tuple[str, ...]]:
+        """Build the index on first use or after the database changed."""
+        now = time.monotonic()
+        if self._owners is not None and now - self._checked_at < self.FRESHNESS_INTERVAL:
+            return self._owners
+
+        fingerprint = self.fingerprint()
+        if fingerprint is None:
+            raise FileNotFoundError(f"{self.DATABASE_NAME} not found: {self.db_path}")
+
+        with self._lock:
+            if self._owners is None or fingerprint != self._fingerprint:
+                owners: Dict[str, Tuple[str, ...]] = {}
+                self._build(owners)
+                self._owners = owners
+                self._fingerprint = fingerprint
+                self._lookup_cache = {}
+                self.logger.debug(f"Built file ownership index from {self.db_path}: {len(owners)} paths")
+            self._checked_at = now
+            return self._owners
+
+    @abstractmethod
+    def _build(self, owners: Dict[str, Tuple[str, ...]]) -> None:
+        """Populate the index (implemented by subclasses)."""
+        pass
+
+    def _add(self, owners: Dict[str, Tuple[str, ...]], path: str, package: str) -> None:
+        """Record that package owns path, if the path is shallow enough."""
+        path = path.rstrip("/")
+        if not path or path.count("/") > self.MAX_DEPTH:
+            return
+        existing = owners.get(path)
+        if existing is None:
+            owners[path] = (package,)
+        elif package not in existing:
+            owners[path] = existing + (package,)
+
+    @staticmethod
+    def _candidate_paths(path: str) -> List[str]:
+        """Get the spellings of a path a package database may have recorded."""
+        paths = [path]
+        resolved = os.path.realpath(path)
+        if resolved != path:
+            paths.append(resolved)
+
+        candidates = []
+        for candidate in paths:
+            candidates.append(candidate)
+            # usrmerge: /bin/x and /usr/bin/x are the same file
+            for usr_dir in ("/bin/", "/sbin/", "/lib/"):
+                if candidate.startswith("/usr" + usr_dir):
+                    candidates.append(candidate[4:])
+                elif candidate.startswith(usr_dir):
+                    candidates.append("/usr" + candidate)
+        return candidates
+
+
+class DpkgFileOwnershipIndex(FileOwnershipIndex):
+    """Ownership index over /var/lib/dpkg/info/*.list."""
+
+    DEFAULT_PATH = Path("/var/lib/dpkg/info")
+    DATABASE_NAME = "dpkg info directory"
+
+    def __init__(self, info_dir: Optional[Path] = None):
+        super().__init__(info_dir or self.DEFAULT_PATH)
+
+    def _build(self, owners: Dict[str, Tuple[str, ...]]) -> None:
+        """Read every .list file via mmap (one installed path per line)."""
+        for entry in os.scandir(self.db_path):
+            if not entry.name.endswith(".list"):
+                continue
+
+            # "libc6:amd64.list" -> "libc6"
+            package = entry.name[:-5].split(":", 1)[0]
+            try:
+                with open(entry.path, "rb") as f:
+                    if os.fstat(f.fileno()).st_size == 0:
+                        continue
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        for line in iter(mm.readline, b""):
+                            # Skip deep paths before decoding (most of the file)
+                            if line.count(b"/") <= self.MAX_DEPTH:
+                                self._add(owners, line.rstrip(b"\n").decode("utf-8", errors="replace"), package)
+            except OSError:
+                continue
+
+
+class PacmanFileOwnershipIndex(FileOwnershipIndex):
+    """Ownership index over /var/lib/pacman/local/*/files."""
+
+    DEFAULT_PATH = Path("/var/lib/pacman/local")
+    DATABASE_NAME = "pacman local database"
+
+    def __init__(self, local_dir: Optional[Path] = None):
+        super().__init__(local_dir or self.DEFAULT_PATH)
+
+    def _build(self, owners: Dict[str, Tuple[str, ...]]) -> None:
+        """Read the %FILES% section of every package (paths are relative to /)."""
+        for entry in os.scandir(self.db_path):
+            if not entry.is_dir():
+                continue
+
+            package = None
+            try:
+                with open(os.path.join(entry.path, "desc"), "r", encoding="utf-8", errors="replace") as f:
+                    lines = iter(f)
+                    for line in lines:
+                        if line.strip() == "%NAME%":
+                            package = next(lines, "").strip()
+                            break
+                if not package:
+                    continue
+
+                with open(os.path.join(entry.path, "files"), "r", encoding="utf-8", errors="replace") as f:
+                    in_files = False
+                    for line in f:
+                        line = line.strip()
+                        if line.startswith("%") and line.endswith("%"):
+                            in_files = line == "%FILES%"
+                        elif in_files and line:
+                            self._add(owners, "/" + line, package)
+            except OSError:
+                continue
+
+
+class ApkFileOwnershipIndex(FileOwnershipIndex):
+    """Ownership index over the F:/R: records of /lib/apk/db/installed."""
+
+    DEFAULT_PATH = Path("/lib/apk/db/installed")
+    DATABASE_NAME = "apk installed database"
+
+    def __init__(self, db_path: Optional[Path] = None):
+        super().__init__(db_path or self.DEFAULT_PATH)
+
+    def _build(self, owners: Dict[str, Tuple[str, ...]]) -> None:
+        """Stream the database; F: sets the current folder, R: names a file in it."""
+        package = ""
+        folder = ""
+        with open(self.db_path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                key, _, value = line.rstrip("\n").partition(":")
+                if key == "P":
+                    package, folder = value, ""
+                elif key == "F" and package:
+                    folder = value
+                    self._add(owners, "/" + folder, package)
+                elif key == "R" and package:
+                    self._add(owners, f"/{folder}/{value}" if folder else f"/{value}", package)
+
+
+class RpmFileOwnershipIndex(FileOwnershipIndex):
+    """Ownership index decoded from the file lists in rpmdb.sqlite headers."""
+
+    TAG_DIRINDEXES, TAG_BASENAMES, TAG_DIRNAMES = 1116, 1117, 1118
+    DATABASE_NAME = "rpm sqlite database"
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.reader = RpmDbReader(db_path)
+        super().__init__(self.reader.db_path)
+
+    def fingerprint(self):
+        """Fingerprint the database together with its write-ahead log."""
+        return self.reader.fingerprint()
+
+    def _build(self, owners: Dict[str, Tuple[str, ...]]) -> None:
+        """Join DIRNAMES[DIRINDEXES[i]] + BASENAMES[i] for every header."""
+        for blob in self.reader._query_header_blobs():
+            tags = self.reader._decode_header(bytes(blob), extra_tags=(
+                self.TAG_DIRINDEXES, self.TAG_BASENAMES, self.TAG_DIRNAMES
+            ))
+            package = tags.get(self.reader.TAG_NAME)
+            basenames = tags.get(self.TAG_BASENAMES) or []
+            dirnames = tags.get(self.TAG_DIRNAMES) or []
+            dirindexes = tags.get(self.TAG_DIRINDEXES)
+            if isinstance(dirindexes, int):
+                dirindexes = [dirindexes]
+            if not package:
+                continue
+
+            for basename, dirindex in zip(basenames, dirindexes or []):
+                if 0 <= dirindex < len(dirnames):
+                    self._add(owners, dirnames[dirindex] + basename, package)
+
+
+class HomebrewFileOwnershipIndex(FileOwnershipIndex):
+    """Ownership derived from symlink targets inside Cellar/Caskroom.
+
+    Homebrew links every executable from <prefix>/bin into
+    Cellar/<formula>/<version>, so the owner is read off the resolved
+    path and no index needs to be built.
+    """
+
+    DATABASE_NAME = "Homebrew Cellar"
+
+    def __init__(self, reader: Optional[HomebrewCellarReader] = None):
+        self.reader = reader or HomebrewCellarReader()
+        prefix = self.reader.prefix
+        super().__init__(prefix / "Cellar" if prefix else Path("/nonexistent"))
+
+    def _build(self, owners: Dict[str, Tuple[str, ...]]) -> None:
+        """Nothing to index: owners() resolves the path itself."""
+        pass
+
+    def owners(self, path: str) -> Set[str]:
+        """Get the formula or cask a path resolves into."""
+        prefix = self.reader.prefix
+        if prefix is None:
+            raise FileNotFoundError("Homebrew Cellar not found")
+
+        resolved = Path(os.path.realpath(path))
+        for root in (prefix / "Cellar", prefix / "Caskroom"):
+            try:
+                relative = resolved.relative_to(os.path.realpath(root))
+            except ValueError:
+                continue
+            if relative.parts:
+                return {relative.parts[0]}
+        return set()
+
+
+def create_file_ownership_index(package_manager_type: str) -> Optional[FileOwnershipIndex]:
+    """Create the file ownership index for a package manager.
+
+    Args:
+        package_manager_type: Type of package manager (apt, brew, pacman, apk, dnf, ...)
+
+    Returns:
+        Index instance, or None if the package manager has no file lists we can read
+    """
+    if package_manager_type in ("apt", "apt-get"):
+        index = DpkgFileOwnershipIndex()
+    elif package_manager_type == "pacman":
+        index = PacmanFileOwnershipIndex()
+    elif package_manager_type == "apk":
+        index = ApkFileOwnershipIndex()
+    elif package_manager_type in ("yum", "dnf", "zypper"):
+        index = RpmFileOwnershipIndex()
+    elif package_manager_type == "brew":
+        index = HomebrewFileOwnershipIndex()
+    else:
+        return None
+
+    return index if index.is_available() else None
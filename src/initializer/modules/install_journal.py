@@ -0,0 +1,280 @@
+"""Write-ahead journal of install sessions, used to resume interrupted sessions."""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.logger import get_module_logger
+from ..utils.state_dir import get_state_dir
+from .install_transaction import action_applications
+from .software_models import Application, ApplicationSuite
+
+
+# Task states as recorded in the journal (the progress screen's "success" is "done")
+JOURNAL_STATUSES = {"pending": "pending", "running": "running", "success": "done", "failed": "failed"}
+
+
+@dataclass
+class JournalTask:
+    """One planned task and its last recorded state.
+
+    Attributes:
+        index: Position in the session's action list
+        name: Display name ("Installing foo")
+        action: "install" or "uninstall"
+        application: Application or suite name
+        is_batch: Suite batch install
+        components: Component names of a batch install
+        packages: Package names of a batch install
+        status: pending, running, done or failed
+        exit_code: Exit code of the task's last command, if one ran
+        message: Failure message
+    """
+    index: int
+    name: str
+    action: str
+    application: str
+    is_batch: bool = False
+    components: List[str] = field(default_factory=list)
+    packages: List[str] = field(default_factory=list)
+    status: str = "pending"
+    exit_code: Optional[int] = None
+    message: str = ""
+
+
+@dataclass
+class JournalState:
+    """Install session reconstructed from the journal.
+
+    Attributes:
+        session: Session ID
+        started: Session start time (epoch seconds)
+        tasks: Planned tasks with their last recorded state
+        finished: True if the session ended normally (completed or aborted by the user)
+    """
+    session: str
+    started: float
+    tasks: List[JournalTask]
+    finished: bool = False
+
+    @property
+    def incomplete_tasks(self) -> List[JournalTask]:
+        """Get the tasks that were pending or running when the session stopped."""
+        return [task for task in self.tasks if task.status in ("pending", "running")]
+
+
+class InstallJournal:
+    """Append-only record of an install session's plan and task state changes.
+
+    The file holds one JSON record per line: the plan (written when the
+    session starts), one record per task state transition with the exit
+    code of the task's last command, and an end record when the session
+    finishes. Every record is fsynced before the call returns, so after a
+    dropped terminal or a crash the journal tells exactly which tasks had
+    completed, which were running and which had not started.
+    """
+
+    JOURNAL_VERSION = 1
+
+    def __init__(self, state_dir: Optional[Path] = None):
+        """Initialize the journal.
+
+        Args:
+            state_dir: Directory of the journal file (defaults to the user's state directory)
+        """
+        self.path = (Path(state_dir) if state_dir else get_state_dir()) / "install_journal.jsonl"
+        self.logger = get_module_logger("install_journal")
+        self._lock = threading.Lock()
+        self._recorded: Dict[int, Tuple[str, Optional[int]]] = {}
+
+    @staticmethod
+    def describe_action(index: int, name: str, action: Dict[str, Any]) -> JournalTask:
+        """Describe an action dict by names so it can be rebuilt from the catalog.
+
+        Args:
+            index: Position in the action list
+            name: Task display name
+            action: Action dict ({"action", "application", "is_batch", ...})
+
+        Returns:
+            JournalTask in pending state
+        """
+        is_batch = bool(action.get("is_batch"))
+        return JournalTask(
+            index=index,
+            name=name,
+            action=action["action"],
+            application=action["application"].name,
+            is_batch=is_batch,
+            components=[app.name for app in action_applications(action)] if is_batch else [],
+            packages=list(action.get("packages") or []) if is_batch else [],
+        )
+
+    def begin(self, session_id: str, tasks: List[JournalTask]) -> None:
+        """Start a new journal for a session, replacing the previous one.
+
+        Args:
+            session_id: Session ID
+            tasks: Planned tasks (see describe_action)
+        """
+        record = {
+            "type": "plan",
+            "version": self.JOURNAL_VERSION,
+            "session": session_id,
+            "started": time.time(),
+            "tasks": [
+                {key: value for key, value in task.__dict__.items() if key not in ("status", "exit_code", "message")}
+                for task in tasks
+            ],
+        }
+        with self._lock:
+            self._recorded = {}
+            self._write([record], truncate=True)
+
+    def record(self, index: int, status: str, exit_code: Optional[int] = None, message: str = "") -> None:
+        """Record a task state transition (unchanged states are not written again).
+
+        Args:
+            index: Task index
+            status: pending, running, success/done or failed
+            exit_code: Exit code of the task's last command
+            message: Failure message
+        """
+        status = JOURNAL_STATUSES.get(status, status)
+        with self._lock:
+            if self._recorded.get(index) == (status, exit_code):
+                return
+            self._recorded[index] = (status, exit_code)
+            self._write([{
+                "type": "task", "index": index, "status": status,
+                "exit_code": exit_code, "message": message, "time": time.time(),
+            }])
+
+    def finish(self, aborted: bool = False) -> None:
+        """Mark the session as ended; a finished session is not offered for resume.
+
+        Args:
+            aborted: The user aborted the session
+        """
+        with self._lock:
+            self._write([{"type": "end", "aborted": aborted, "time": time.time()}])
+
+    def load(self) -> Optional[JournalState]:
+        """Read the journal.
+
+        A torn last line (crash while writing) is ignored.
+
+        Returns:
+            JournalState, or None if there is no readable journal
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self.logger.warning(f"Failed to read install journal: {e}")
+            return None
+
+        state: Optional[JournalState] = None
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            kind = record.get("type")
+            if kind == "plan":
+                if record.get("version") != self.JOURNAL_VERSION:
+                    return None
+                tasks = [JournalTask(**entry) for entry in record.get("tasks", [])]
+                state = JournalState(record.get("session", ""), record.get("started", 0.0), tasks)
+            elif state is None:
+                continue
+            elif kind == "task" and 0 <= record.get("index", -1) < len(state.tasks):
+                task = state.tasks[record["index"]]
+                task.status = record.get("status", task.status)
+                task.exit_code = record.get("exit_code")
+                task.message = record.get("message", "")
+                state.finished = False  # A retry after the end record reopens the session
+            elif kind == "end":
+                state.finished = True
+        return state
+
+    def _write(self, records: List[Dict[str, Any]], truncate: bool = False) -> None:
+        """Append records and force them to disk (caller holds the lock)."""
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "w" if truncate else "a", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            self.logger.warning(f"Failed to write install journal: {e}")
+
+
+def restore_actions(state: JournalState, app_installer) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Rebuild the actions of an interrupted session's incomplete tasks.
+
+    Tasks that were running when the session stopped are re-checked with
+    the package checkers first: an install whose applications are all
+    installed (and have no post-install step to redo) and an uninstall
+    whose applications are all gone are not run again.
+
+    Args:
+        state: Journal state of the interrupted session
+        app_installer: AppInstaller providing the catalog and status checks
+
+    Returns:
+        (actions to run, notes describing the tasks that are not run)
+    """
+    suites = {item.name: item for item in app_installer.software_items if isinstance(item, ApplicationSuite)}
+    notes: List[str] = []
+    candidates: List[Tuple[JournalTask, Dict[str, Any]]] = []
+
+    for task in state.tasks:
+        if task.status == "failed":
+            exit_code = f", exit code {task.exit_code}" if task.exit_code is not None else ""
+            notes.append(f"{task.name}: failed in the interrupted session{exit_code}, not retried")
+
+    for task in state.incomplete_tasks:
+        names = task.components if task.is_batch else [task.application]
+        applications: List[Application] = [app_installer.catalog.get(name) for name in names]
+        if any(app is None for app in applications):
+            notes.append(f"{task.name}: no longer in the application catalog, skipped")
+            continue
+
+        if task.is_batch:
+            action = {
+                "action": task.action,
+                "application": suites.get(task.application, applications[0]),
+                "packages": task.packages or [p for app in applications for p in app.get_package_list()],
+                "components": applications,
+                "is_batch": True,
+            }
+        else:
+            action = {"action": task.action, "application": applications[0], "is_batch": False}
+        candidates.append((task, action))
+
+    running = [app.name for task, action in candidates if task.status == "running"
+               for app in action_applications(action)]
+    status = app_installer.refresh_application_status(running) if running else {}
+
+    actions = []
+    for task, action in candidates:
+        applications = action_applications(action)
+        if task.status == "running" and all(app.name in status for app in applications):
+            if task.action == "install":
+                completed = all(status[app.name] for app in applications) and not any(app.post_install for app in applications)
+            else:
+                completed = not any(status[app.name] for app in applications)
+            if completed:
+                notes.append(f"{task.name}: verified as completed, skipped")
+                continue
+        actions.append(action)
+
+    return actions, notes
@@ -0,0 +1,266 @@
+"""Progress tracking from package manager status output."""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Set, Tuple
+
+
+APT_STATUS_PATTERN = re.compile(r"(dlstatus|pmstatus|pmerror|pmconffile|media-change):(.*)$")
+APT_NEED_TO_GET_PATTERN = re.compile(
+    r"Need to get ([\d.,]+\s*[kMG]?B)(?:/([\d.,]+\s*[kMG]?B))? of archives", re.IGNORECASE
+)
+APT_SUMMARY_PATTERN = re.compile(r"(\d+) upgraded, (\d+) newly installed, (\d+) to remove")
+
+DNF_TOTAL_PATTERN = re.compile(r"Total download size:\s*([\d.,]+\s*[kMG]?)", re.IGNORECASE)
+DNF_DOWNLOAD_PATTERN = re.compile(r"^\((\d+)/(\d+)\):\s*\S+.*\|\s*([\d.,]+\s*[kMG]?B?)\s")
+DNF_STEP_PATTERN = re.compile(
+    r"^\s*(Installing|Upgrading|Reinstalling|Downgrading|Cleanup|Erasing|Removing|Obsoleting|Verifying)\s*:"
+    r"\s*(\S+)\s+(\d+)/(\d+)\s*$"
+)
+
+PACMAN_TOTAL_PATTERN = re.compile(r"Total Download Size:\s*([\d.,]+\s*[KMG]?i?B)", re.IGNORECASE)
+PACMAN_STEP_PATTERN = re.compile(
+    r"^\((\d+)/(\d+)\)\s+(installing|upgrading|reinstalling|downgrading|removing)\s+(\S+)"
+)
+
+BREW_DEPENDENCIES_PATTERN = re.compile(r"^==> (?:Installing|Fetching) dependencies for \S+: (.+)$")
+BREW_STEP_PATTERN = re.compile(r"^==> (Fetching|Downloading|Pouring|Installing) (\S+)")
+
+SIZE_UNITS = {
+    "": 1, "B": 1,
+    "K": 1000, "KB": 1000, "M": 1000 ** 2, "MB": 1000 ** 2, "G": 1000 ** 3, "GB": 1000 ** 3,
+    "KIB": 1024, "MIB": 1024 ** 2, "GIB": 1024 ** 3,
+}
+
+# Share of the overall bar used by the download phase when there is one
+DOWNLOAD_SHARE = 40.0
+
+
+def parse_size(text: str, binary: bool = False) -> Optional[int]:
+    """Convert a size such as "12.3 MB", "456 kB", "1,2 M" or "3.5 MiB" to bytes.
+
+    Args:
+        text: Size with unit
+        binary: Treat bare K/M/G units as powers of 1024 (dnf)
+
+    Returns:
+        Number of bytes, or None if the text is not a size
+    """
+    match = re.match(r"\s*([\d.,]+)\s*([kKMG]?i?B?)\s*$", text)
+    if not match:
+        return None
+    number = match.group(1)
+    # "2,000 kB" uses a thousands separator, "1,2 MB" a decimal comma
+    number = number.replace(",", "") if re.fullmatch(r"\d{1,3}(,\d{3})+", number) else number.replace(",", ".")
+    try:
+        value = float(number)
+    except ValueError:
+        return None
+    unit = match.group(2).upper()
+    if binary and unit in ("K", "M", "G"):
+        unit += "IB"
+    return int(value * SIZE_UNITS.get(unit, 1))
+
+
+def format_size(size: int) -> str:
+    """Format a byte count for display (e.g. 12.3 MB)."""
+    for unit, factor in (("GB", 1000 ** 3), ("MB", 1000 ** 2), ("kB", 1000)):
+        if size >= factor:
+            return f"{size / factor:.1f} {unit}"
+    return f"{size} B"
+
+
+@dataclass
+class ProgressUpdate:
+    """Progress of a package manager command.
+
+    Attributes:
+        percent: Overall progress (0-100)
+        phase: "download" or "install"
+        detail: Human readable status (current package, step counter, bytes)
+        bytes_done: Downloaded bytes, if known
+        bytes_total: Total download size, if known
+    """
+    percent: float
+    phase: str
+    detail: str
+    bytes_done: Optional[int] = None
+    bytes_total: Optional[int] = None
+
+
+class InstallProgressParser:
+    """Turn package manager output into progress updates.
+
+    APT reports exact progress through its status records (see
+    AppInstaller.set_apt_status_fd); dnf, pacman and Homebrew print step counters such
+    as "(3/12) installing foo" that are used instead. The reported
+    percentage never goes backwards.
+    """
+
+    def __init__(self, package_manager: Optional[str], download_only: bool = False):
+        """Initialize the parser.
+
+        Args:
+            package_manager: apt, apt-get, dnf, yum, pacman or brew
+            download_only: The command only downloads (apt update), so downloading is the whole bar
+        """
+        self.package_manager = package_manager or ""
+        self.download_share = 100.0 if download_only else DOWNLOAD_SHARE
+        self.percent = 0.0
+        self.bytes_total: Optional[int] = None
+        self.downloaded_seen = False
+        self.package_total = 0
+        self.packages_done: Set[str] = set()
+        self._download_bytes = 0
+        self._structured = False
+        self._handlers: Dict[str, Callable[[str], Optional[ProgressUpdate]]] = {
+            "dnf": self._parse_dnf,
+            "yum": self._parse_dnf,
+            "pacman": self._parse_pacman,
+            "brew": self._parse_brew,
+        }
+
+    @property
+    def has_progress(self) -> bool:
+        """Check whether the output contained structured progress at all."""
+        return self._structured
+
+    def feed(self, line: str) -> Tuple[Optional[str], Optional[ProgressUpdate]]:
+        """Process one output line.
+
+        Args:
+            line: Output line without its terminator
+
+        Returns:
+            (line to display or None if it was a status record, progress update or None)
+        """
+        status = APT_STATUS_PATTERN.search(line)
+        if status:
+            prefix = line[:status.start()].strip()
+            return (prefix or None), self._parse_apt_status(status.group(1), status.group(2))
+
+        if self.package_manager in ("apt", "apt-get"):
+            self._parse_apt_text(line)
+            return line, None
+
+        handler = self._handlers.get(self.package_manager)
+        return line, (handler(line) if handler else None)
+
+    def _update(self, percent: float, phase: str, detail: str) -> ProgressUpdate:
+        """Build an update, keeping the percentage monotonic."""
+        self._structured = True
+        self.percent = min(100.0, max(self.percent, percent))
+        bytes_done = None
+        if phase == "download" and self.bytes_total:
+            bytes_done = min(self.bytes_total, self._download_bytes)
+            detail = f"{detail} - {format_size(bytes_done)}/{format_size(self.bytes_total)}"
+        return ProgressUpdate(self.percent, phase, detail, bytes_done, self.bytes_total)
+
+    def _install_range(self, fraction: float) -> float:
+        """Map install-phase progress (0-1) to the overall percentage."""
+        start = self.download_share if self.downloaded_seen else 0.0
+        return start + (100.0 - start) * fraction
+
+    def _step_detail(self, description: str) -> str:
+        """Append the completed package counter to a status description."""
+        if self.package_total:
+            done = min(len(self.packages_done), self.package_total)
+            return f"{description} ({done}/{self.package_total} packages)"
+        return description
+
+    # APT
+
+    def _parse_apt_text(self, line: str) -> None:
+        """Pick up the download size and package count from apt's summary lines."""
+        need = APT_NEED_TO_GET_PATTERN.search(line)
+        if need:
+            self.bytes_total = parse_size(need.group(1))
+            return
+        summary = APT_SUMMARY_PATTERN.search(line)
+        if summary:
+            self.package_total = sum(int(value) for value in summary.groups())
+
+    def _parse_apt_status(self, kind: str, fields: str) -> Optional[ProgressUpdate]:
+        """Parse one APT::Status-Fd record (the part after "<kind>:")."""
+        match = re.match(r"(.*?):([\d.]+):(.*)$", fields)
+        if kind not in ("dlstatus", "pmstatus") or not match:
+            return None
+        subject, percent, description = match.group(1), float(match.group(2)), match.group(3).strip()
+
+        if kind == "dlstatus":
+            self.downloaded_seen = True
+            if self.bytes_total:
+                self._download_bytes = int(self.bytes_total * percent / 100)
+            return self._update(self.download_share * percent / 100, "download", description or "Downloading")
+
+        if description.startswith(("Installed ", "Removed ", "Completely removed ")):
+            self.packages_done.add(subject)
+        return self._update(self._install_range(percent / 100), "install", self._step_detail(description))
+
+    # dnf / yum
+
+    def _parse_dnf(self, line: str) -> Optional[ProgressUpdate]:
+        """Parse dnf/yum download and transaction step counters."""
+        total = DNF_TOTAL_PATTERN.search(line)
+        if total:
+            self.bytes_total = parse_size(total.group(1), binary=True)
+            return None
+
+        download = DNF_DOWNLOAD_PATTERN.match(line)
+        if download:
+            current, count = int(download.group(1)), int(download.group(2))
+            self.downloaded_seen = True
+            self._download_bytes += parse_size(download.group(3), binary=True) or 0
+            return self._update(self.download_share * current / count, "download", f"Downloaded {current}/{count} packages")
+
+        step = DNF_STEP_PATTERN.match(line)
+        if step:
+            action, package, current, count = step.group(1), step.group(2), int(step.group(3)), int(step.group(4))
+            # Verifying is the last pass over the same packages
+            fraction = 0.9 + 0.1 * current / count if action == "Verifying" else 0.9 * current / count
+            return self._update(self._install_range(fraction), "install", f"{action} {package} ({current}/{count})")
+        return None
+
+    # pacman
+
+    def _parse_pacman(self, line: str) -> Optional[ProgressUpdate]:
+        """Parse pacman's download size and per-package step counters."""
+        total = PACMAN_TOTAL_PATTERN.search(line)
+        if total:
+            self.bytes_total = parse_size(total.group(1))
+            return None
+        if line.startswith(":: Retrieving packages"):
+            self.downloaded_seen = True
+            return self._update(0, "download", "Downloading packages")
+
+        step = PACMAN_STEP_PATTERN.match(line)
+        if step:
+            current, count, action, package = int(step.group(1)), int(step.group(2)), step.group(3), step.group(4)
+            return self._update(
+                self._install_range((current - 1) / count), "install", f"{action.capitalize()} {package} ({current}/{count})"
+            )
+        return None
+
+    # Homebrew
+
+    def _parse_brew(self, line: str) -> Optional[ProgressUpdate]:
+        """Parse Homebrew's dependency list and fetch/pour steps."""
+        dependencies = BREW_DEPENDENCIES_PATTERN.match(line)
+        if dependencies:
+            names = re.split(r",\s*|\s+and\s+", dependencies.group(1).strip())
+            self.package_total = max(self.package_total, len([name for name in names if name]) + 1)
+            return None
+
+        step = BREW_STEP_PATTERN.match(line)
+        if not step:
+            return None
+        action, package = step.group(1), step.group(2)
+        if action in ("Fetching", "Downloading"):
+            self.downloaded_seen = True
+            return self._update(self.percent, "download", f"{action} {package}")
+        if action == "Pouring":
+            self.packages_done.add(package)
+        total = max(self.package_total, len(self.packages_done), 1)
+        return self._update(
+            self._install_range(len(self.packages_done) / total), "install", self._step_detail(f"{action} {package}")
+        )
@@ -0,0 +1,134 @@
+"""Planning of combined package manager transactions for install sessions."""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from ..utils.logger import get_module_logger
+from .software_models import Application
+
+
+def action_applications(action: Dict[str, Any]) -> List[Application]:
+    """Get the applications an action covers (suite batches expand to their components)."""
+    if action.get("is_batch"):
+        return list(action.get("components") or [])
+    return [action["application"]]
+
+
+@dataclass
+class InstallTransaction:
+    """One package manager invocation covering several confirmed actions.
+
+    Attributes:
+        action: "install" or "uninstall"
+        action_indexes: Indexes of the covered actions in the session action list
+        applications: Applications (suite components expanded) the transaction covers
+        packages: Deduplicated package names in first-seen order
+        command: Combined command line
+    """
+    action: str
+    action_indexes: List[int] = field(default_factory=list)
+    applications: List[Application] = field(default_factory=list)
+    packages: List[str] = field(default_factory=list)
+    command: str = ""
+
+    def as_action(self) -> Dict[str, Any]:
+        """Get an action dict describing the whole transaction (for status refresh and reports)."""
+        return {
+            "action": self.action,
+            "application": self.applications[0],
+            "packages": list(self.packages),
+            "components": list(self.applications),
+            "is_batch": True,
+        }
+
+
+class InstallTransactionPlanner:
+    """Merge the actions of an install session into per-direction transactions.
+
+    All eligible install actions become one package manager invocation and
+    all eligible removals another, so the dependency resolver, the package
+    database load and the triggers run once instead of once per application.
+    Actions that need their own command line (per-app recommends overrides,
+    Homebrew casks) stay outside and run individually.
+    """
+
+    # A single action gains nothing from a combined transaction
+    MIN_ACTIONS = 2
+
+    def __init__(self, app_installer):
+        """Initialize the planner.
+
+        Args:
+            app_installer: AppInstaller providing commands and package manager options
+        """
+        self.app_installer = app_installer
+        self.logger = get_module_logger("install_transaction")
+
+    def plan(self, actions: List[Dict[str, Any]]) -> List[InstallTransaction]:
+        """Plan the combined transactions for a list of confirmed actions.
+
+        Args:
+            actions: Action dicts as produced by the App Install page
+
+        Returns:
+            Transactions to run, removals first (empty if nothing can be merged)
+        """
+        config = self.app_installer._get_package_manager_config()
+        if not config.get("batch_supported", False):
+            return []
+
+        transactions = {
+            "uninstall": InstallTransaction("uninstall"),
+            "install": InstallTransaction("install"),
+        }
+        for index, action in enumerate(actions):
+            transaction = transactions.get(action.get("action"))
+            applications = action_applications(action)
+            if transaction is None or not applications or not all(self._is_eligible(app, transaction.action) for app in applications):
+                continue
+
+            transaction.action_indexes.append(index)
+            transaction.applications.extend(applications)
+            transaction.packages.extend(
+                action.get("packages") or [package for app in applications for package in app.get_package_list()]
+            )
+
+        removed = set(transactions["uninstall"].packages)
+        conflicting = removed.intersection(transactions["install"].packages)
+        if conflicting:
+            # 同一个包既要安装又要卸载时，保持逐个执行的原有顺序语义
+            self.logger.info(f"Not merging transactions, packages both installed and removed: {sorted(conflicting)}")
+            return []
+
+        planned = []
+        for transaction in transactions.values():
+            if len(transaction.action_indexes) < self.MIN_ACTIONS:
+                continue
+            # 多个套件共享的包只安装/卸载一次
+            transaction.packages = list(dict.fromkeys(transaction.packages))
+            transaction.command = self._build_command(transaction)
+            if transaction.command:
+                planned.append(transaction)
+                self.logger.info(
+                    f"Planned {transaction.action} transaction: {len(transaction.action_indexes)} actions, "
+                    f"{len(transaction.packages)} packages"
+                )
+        return planned
+
+    def _is_eligible(self, app: Application, action: str) -> bool:
+        """Check whether an application can share a transaction command line."""
+        if not app.get_package_list():
+            return False
+        if self.app_installer.package_manager == "brew" and action == "install":
+            # Casks need "brew install --cask"
+            return self.app_installer.catalog.get_brew_type(app.name) == "formula"
+        if action == "install" and app.install_recommends is not None:
+            config = self.app_installer._get_package_manager_config()
+            return app.install_recommends == config.get("install_recommends", False)
+        return True
+
+    def _build_command(self, transaction: InstallTransaction) -> Optional[str]:
+        """Build the combined command line for a transaction."""
+        if transaction.action == "install":
+            return self.app_installer.get_batch_install_command(transaction.packages)
+        return self.app_installer.get_batch_uninstall_command(transaction.packages)
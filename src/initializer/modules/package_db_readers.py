@@ -0,0 +1,700 @@
+"""Native readers for local package databases (no subprocess spawning)."""
+
+import mmap
+import os
+import re
+import shutil
+import sqlite3
+import struct
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..utils.logger import get_module_logger
+
+
+# Fingerprint of a file on disk: (mtime_ns, size, inode)
+Fingerprint = Tuple[int, int, int]
+
+
+@dataclass(frozen=True)
+class PackageRecord:
+    """Installed package information read from a local package database."""
+    name: str
+    status: str
+    version: str = ""
+    architecture: str = ""
+    installed: bool = False
+
+
+def version_sort_key(version: str) -> Tuple:
+    """Sort key comparing the numeric parts of a version as numbers.
+
+    The version is split on "." and "_" (Homebrew revisions), so 1.10 sorts
+    after 1.9 and 1.2_1 after 1.2.
+
+    Args:
+        version: Version string
+
+    Returns:
+        Tuple usable as a sort key
+    """
+    # 数字部分按整数比较，其余部分按字符串比较（排在数字之前）
+    return tuple((1, int(part), "") if part.isdigit() else (0, 0, part)
+                 for part in re.split(r"[._]", version))
+
+
+def stat_fingerprint(path: Path) -> Optional[Fingerprint]:
+    """Get the (mtime_ns, size, inode) fingerprint of a path.
+
+    Args:
+        path: File or directory to fingerprint
+
+    Returns:
+        Fingerprint tuple, or None if the path cannot be stat'ed
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class PackageDatabaseReader(ABC):
+    """Base class for in-process readers of a local package database.
+
+    Subclasses implement _parse() for their on-disk format. Parsed results
+    are shared between instances and reused until the database's
+    fingerprint changes, so repeated checks cost a single os.stat().
+    """
+
+    DEFAULT_PATH: Path = Path("/")
+    DATABASE_NAME = "package database"
+
+    # Shared parse cache: path -> (fingerprint, records)
+    _cache: Dict[str, Tuple[Fingerprint, Dict[str, PackageRecord]]] = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """Initialize the reader.
+
+        Args:
+            db_path: Path to the database (defaults to DEFAULT_PATH)
+        """
+        self.db_path = Path(db_path) if db_path else self.DEFAULT_PATH
+        self.logger = get_module_logger("package_db_readers")
+
+    def is_available(self) -> bool:
+        """Check whether the database exists and is readable."""
+        return os.access(self.db_path, os.R_OK)
+
+    def fingerprint(self) -> Optional[Fingerprint]:
+        """Get the current fingerprint of the database."""
+        return stat_fingerprint(self.db_path)
+
+    def read_packages(self) -> Dict[str, PackageRecord]:
+        """Read all package records from the database.
+
+        Returns:
+            Dictionary mapping package names to their records
+
+        Raises:
+            OSError: If the database cannot be read
+        """
+        key = str(self.db_path)
+        fingerprint = self.fingerprint()
+        if fingerprint is None:
+            raise FileNotFoundError(f"{self.DATABASE_NAME} not found: {self.db_path}")
+
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] == fingerprint:
+                return cached[1]
+
+        records = self._parse()
+
+        with self._cache_lock:
+            self._cache[key] = (fingerprint, records)
+
+        self.logger.debug(f"Parsed {self.db_path}: {len(records)} package entries")
+        return records
+
+    def get_package(self, package: str) -> Optional[PackageRecord]:
+        """Get the record for a single package.
+
+        Args:
+            package: Package name
+
+        Returns:
+            PackageRecord or None if the package is unknown
+        """
+        return self.read_packages().get(package)
+
+    def is_installed(self, package: str) -> bool:
+        """Check whether a package is installed.
+
+        Args:
+            package: Package name to check
+
+        Returns:
+            True if installed, False otherwise
+
+        Raises:
+            OSError: If the database cannot be read
+        """
+        record = self.get_package(package)
+        return record is not None and record.installed
+
+    def get_installed_packages(self) -> Dict[str, PackageRecord]:
+        """Get only the records of fully installed packages."""
+        return {name: record for name, record in self.read_packages().items() if record.installed}
+
+    @abstractmethod
+    def _parse(self) -> Dict[str, PackageRecord]:
+        """Parse the database into a package -> PackageRecord map."""
+        pass
+
+
+class _StanzaFileReader(PackageDatabaseReader):
+    """Reader for "key<sep>value" stanza files separated by blank lines."""
+
+    FIELD_SEPARATOR = b":"
+    FIELDS: Tuple[bytes, ...] = ()
+
+    def _parse(self) -> Dict[str, PackageRecord]:
+        """Parse the file via mmap in a single streaming pass."""
+        records: Dict[str, PackageRecord] = {}
+
+        with open(self.db_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return records
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                fields: Dict[bytes, bytes] = {}
+                for line in iter(mm.readline, b""):
+                    if line[:1] in (b" ", b"\t"):
+                        # Continuation line of a multi-line field (Description, Conffiles...)
+                        continue
+
+                    line = line.rstrip(b"\r\n")
+                    if not line:
+                        self._add_record(records, fields)
+                        fields = {}
+                        continue
+
+                    name, sep, value = line.partition(self.FIELD_SEPARATOR)
+                    if sep and name in self.FIELDS:
+                        fields[name] = value.strip()
+
+                # Last stanza may not be followed by a blank line
+                self._add_record(records, fields)
+
+        return records
+
+    @abstractmethod
+    def _add_record(self, records: Dict[str, PackageRecord], fields: Dict[bytes, bytes]) -> None:
+        """Convert one parsed stanza into a PackageRecord and index it."""
+        pass
+
+
+class DpkgStatusReader(_StanzaFileReader):
+    """Streaming, memory-mapped parser for the dpkg status database.
+
+    Records are keyed by package name and additionally by "name:arch",
+    so multi-arch queries resolve the same way dpkg-query does.
+    """
+
+    DEFAULT_PATH = Path("/var/lib/dpkg/status")
+    DATABASE_NAME = "dpkg status file"
+    INSTALLED_STATUS = "install ok installed"
+    FIELDS = (b"Package", b"Status", b"Version", b"Architecture")
+
+    @property
+    def status_path(self) -> Path:
+        """Path to the dpkg status file."""
+        return self.db_path
+
+    def _add_record(self, records: Dict[str, PackageRecord], fields: Dict[bytes, bytes]) -> None:
+        """Convert one parsed stanza into a PackageRecord and index it."""
+        package = fields.get(b"Package")
+        if not package:
+            return
+
+        status = fields.get(b"Status", b"").decode("utf-8", errors="replace")
+        record = PackageRecord(
+            name=package.decode("utf-8", errors="replace"),
+            status=status,
+            version=fields.get(b"Version", b"").decode("utf-8", errors="replace"),
+            architecture=fields.get(b"Architecture", b"").decode("utf-8", errors="replace"),
+            installed=self.INSTALLED_STATUS in status,
+        )
+
+        if record.architecture:
+            records[f"{record.name}:{record.architecture}"] = record
+
+        # Multi-arch packages appear once per architecture; prefer an installed entry
+        existing = records.get(record.name)
+        if existing is None or (record.installed and not existing.installed):
+            records[record.name] = record
+
+
+class ApkInstalledReader(_StanzaFileReader):
+    """Parser for Alpine's /lib/apk/db/installed database.
+
+    Each stanza lists one installed package using single-letter keys
+    (P: name, V: version, A: architecture).
+    """
+
+    DEFAULT_PATH = Path("/lib/apk/db/installed")
+    DATABASE_NAME = "apk installed database"
+    FIELDS = (b"P", b"V", b"A")
+
+    def _add_record(self, records: Dict[str, PackageRecord], fields: Dict[bytes, bytes]) -> None:
+        """Convert one parsed stanza into a PackageRecord and index it."""
+        package = fields.get(b"P")
+        if not package:
+            return
+
+        name = package.decode("utf-8", errors="replace")
+        records[name] = PackageRecord(
+            name=name,
+            status="installed",
+            version=fields.get(b"V", b"").decode("utf-8", errors="replace"),
+            architecture=fields.get(b"A", b"").decode("utf-8", errors="replace"),
+            installed=True,
+        )
+
+
+class PacmanLocalDbReader(PackageDatabaseReader):
+    """Reader for pacman's local database (/var/lib/pacman/local/*/desc).
+
+    Every installed package has a "<name>-<version>-<rel>" directory whose
+    desc file holds %NAME%, %VERSION% and %ARCH% sections. Adding or
+    removing a package changes the directory's mtime, which invalidates
+    the shared cache.
+    """
+
+    DEFAULT_PATH = Path("/var/lib/pacman/local")
+    DATABASE_NAME = "pacman local database"
+    SECTIONS = {"%NAME%": "name", "%VERSION%": "version", "%ARCH%": "arch"}
+
+    def _parse(self) -> Dict[str, PackageRecord]:
+        """Read every desc file in one directory scan."""
+        records: Dict[str, PackageRecord] = {}
+
+        with os.scandir(self.db_path) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+
+                try:
+                    with open(os.path.join(entry.path, "desc"), "r", encoding="utf-8", errors="replace") as f:
+                        values = self._parse_desc(f)
+                except OSError:
+                    continue
+
+                name = values.get("name")
+                if not name:
+                    continue
+
+                records[name] = PackageRecord(
+                    name=name,
+                    status="installed",
+                    version=values.get("version", ""),
+                    architecture=values.get("arch", ""),
+                    installed=True,
+                )
+
+        return records
+
+    def _parse_desc(self, lines) -> Dict[str, str]:
+        """Extract the first value of the interesting %SECTION% headers."""
+        values: Dict[str, str] = {}
+        current = None
+        for line in lines:
+            line = line.strip()
+            if not line:
+                current = None
+            elif line.startswith("%") and line.endswith("%"):
+                current = self.SECTIONS.get(line)
+            elif current and current not in values:
+                values[current] = line
+                if len(values) == len(self.SECTIONS):
+                    break
+        return values
+
+
+class RpmDbReader(PackageDatabaseReader):
+    """Read-only reader for the sqlite rpm database (rpmdb.sqlite).
+
+    Every installed package is one header blob in the Packages table; the
+    NAME, VERSION, RELEASE, EPOCH and ARCH tags are decoded straight from
+    the blob in a single query. Older BDB/NDB databases are not supported
+    and raise FileNotFoundError so callers fall back to ``rpm -qa``.
+    """
+
+    CANDIDATE_PATHS = [
+        Path("/var/lib/rpm/rpmdb.sqlite"),
+        Path("/usr/lib/sysimage/rpm/rpmdb.sqlite"),
+    ]
+    DATABASE_NAME = "rpm sqlite database"
+
+    HEADER_MAGIC = b"\x8e\xad\xe8\x01"
+    TAG_NAME, TAG_VERSION, TAG_RELEASE, TAG_EPOCH, TAG_ARCH = 1000, 1001, 1002, 1003, 1022
+    TYPE_INT32, TYPE_STRING, TYPE_STRING_ARRAY, TYPE_I18NSTRING = 4, 6, 8, 9
+    _INDEX_ENTRY = struct.Struct(">iiii")
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """Initialize the rpm database reader.
+
+        Args:
+            db_path: Path to rpmdb.sqlite (defaults to the first existing candidate)
+        """
+        if db_path is None:
+            db_path = next((path for path in self.CANDIDATE_PATHS if path.exists()), self.CANDIDATE_PATHS[0])
+        super().__init__(db_path)
+
+    def fingerprint(self) -> Optional[Tuple]:
+        """Fingerprint the database together with its write-ahead log."""
+        main = stat_fingerprint(self.db_path)
+        if main is None:
+            return None
+        return main + (stat_fingerprint(Path(f"{self.db_path}-wal")),)
+
+    def _parse(self) -> Dict[str, PackageRecord]:
+        """Decode every header in the Packages table."""
+        records: Dict[str, PackageRecord] = {}
+
+        for blob in self._query_header_blobs():
+            tags = self._decode_header(bytes(blob))
+            name = tags.get(self.TAG_NAME)
+            if not name:
+                continue
+
+            version = f"{tags.get(self.TAG_VERSION, '')}-{tags.get(self.TAG_RELEASE, '')}".rstrip("-")
+            epoch = tags.get(self.TAG_EPOCH)
+            if epoch:
+                version = f"{epoch}:{version}"
+
+            record = PackageRecord(
+                name=name,
+                status="installed",
+                version=version,
+                architecture=tags.get(self.TAG_ARCH, ""),
+                installed=True,
+            )
+            if record.architecture:
+                records[f"{name}.{record.architecture}"] = record
+            records.setdefault(name, record)
+
+        return records
+
+    def _query_header_blobs(self) -> List[bytes]:
+        """Fetch all header blobs using a read-only connection.
+
+        Raises:
+            OSError: If the database cannot be opened or queried
+        """
+        uri = self.db_path.resolve().as_uri()
+        # No immutable=1 fallback: it would ignore the -wal file and hide recent transactions
+        try:
+            connection = sqlite3.connect(f"{uri}?mode=ro", uri=True, timeout=5)
+            try:
+                return [row[0] for row in connection.execute("SELECT blob FROM Packages")]
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            raise OSError(f"Cannot query {self.db_path}: {e}") from e
+
+    def _decode_header(self, blob: bytes, extra_tags: Tuple[int, ...] = ()) -> Dict[int, object]:
+        """Extract the interesting tags from an RPM header blob.
+
+        Args:
+            blob: Header blob from the Packages table
+            extra_tags: Additional tags to decode besides name/version/arch
+
+        Returns:
+            Dictionary mapping tag numbers to str, int, or lists for array tags
+        """
+        if blob[:4] == self.HEADER_MAGIC:
+            blob = blob[8:]
+        if len(blob) < 8:
+            return {}
+
+        index_count, data_length = struct.unpack_from(">ii", blob, 0)
+        data_start = 8 + index_count * self._INDEX_ENTRY.size
+        if index_count <= 0 or data_start + data_length > len(blob):
+            return {}
+
+        wanted = (self.TAG_NAME, self.TAG_VERSION, self.TAG_RELEASE, self.TAG_EPOCH, self.TAG_ARCH) + extra_tags
+        tags: Dict[int, object] = {}
+        for i in range(index_count):
+            tag, tag_type, offset, count = self._INDEX_ENTRY.unpack_from(blob, 8 + i * self._INDEX_ENTRY.size)
+            if tag not in wanted:
+                continue
+
+            position = data_start + offset
+            if tag_type in (self.TYPE_STRING, self.TYPE_I18NSTRING):
+                end = blob.find(b"\0", position)
+                if end != -1:
+                    tags[tag] = blob[position:end].decode("utf-8", errors="replace")
+            elif tag_type == self.TYPE_STRING_ARRAY:
+                values = []
+                for _ in range(count):
+                    end = blob.find(b"\0", position)
+                    if end == -1:
+                        break
+                    values.append(blob[position:end].decode("utf-8", errors="replace"))
+                    position = end + 1
+                tags[tag] = values
+            elif tag_type == self.TYPE_INT32 and position + 4 * count <= len(blob):
+                values = struct.unpack_from(f">{count}i", blob, position)
+                tags[tag] = values[0] if count == 1 else list(values)
+
+            if len(tags) == len(wanted):
+                break
+        return tags
+
+
+class HomebrewCellarReader:
+    """Filesystem-based Homebrew status provider.
+
+    Reads $(brew --prefix)/Cellar, Caskroom and the opt symlinks directly
+    instead of spawning ``brew list`` (each call pays ~1s of Ruby startup).
+    The prefix is resolved once per process; parsed results are reused
+    until the Cellar, Caskroom or opt directories change.
+    """
+
+    DATABASE_NAME = "Homebrew Cellar"
+    CANDIDATE_PREFIXES = ["/opt/homebrew", "/usr/local", "/home/linuxbrew/.linuxbrew"]
+
+    _prefix_resolved = False
+    _prefix: Optional[Path] = None
+    _cache: Dict[str, Tuple[Tuple, Dict[str, PackageRecord]]] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, prefix: Optional[Path] = None):
+        """Initialize the Homebrew reader.
+
+        Args:
+            prefix: Homebrew prefix (resolved automatically when omitted)
+        """
+        self.logger = get_module_logger("package_db_readers")
+        self._explicit_prefix = Path(prefix) if prefix else None
+
+    @classmethod
+    def resolve_prefix(cls) -> Optional[Path]:
+        """Resolve the Homebrew prefix once and cache it for the process.
+
+        Order: $HOMEBREW_PREFIX, the location of the brew executable,
+        well-known prefixes, and finally a single ``brew --prefix`` call.
+
+        Returns:
+            Prefix path, or None if Homebrew is not installed
+        """
+        with cls._lock:
+            if cls._prefix_resolved:
+                return cls._prefix
+
+            prefix = None
+            env_prefix = os.environ.get("HOMEBREW_PREFIX")
+            if env_prefix and (Path(env_prefix) / "Cellar").is_dir():
+                prefix = Path(env_prefix)
+
+            brew_path = shutil.which("brew")
+            if prefix is None and brew_path:
+                # <prefix>/bin/brew (the symlink itself, not its target)
+                candidate = Path(brew_path).parent.parent
+                if (candidate / "Cellar").is_dir():
+                    prefix = candidate
+
+            if prefix is None:
+                for candidate in cls.CANDIDATE_PREFIXES:
+                    if (Path(candidate) / "Cellar").is_dir():
+                        prefix = Path(candidate)
+                        break
+
+            if prefix is None and brew_path:
+                try:
+                    result = subprocess.run(
+                        [brew_path, "--prefix"], capture_output=True, text=True, timeout=10
+                    )
+                    if result.returncode == 0 and result.stdout.strip():
+                        prefix = Path(result.stdout.strip())
+                except (subprocess.TimeoutExpired, OSError):
+                    pass
+
+            cls._prefix = prefix
+            cls._prefix_resolved = True
+            return prefix
+
+    @property
+    def prefix(self) -> Optional[Path]:
+        """Homebrew prefix used by this reader."""
+        return self._explicit_prefix or self.resolve_prefix()
+
+    def get_database_paths(self) -> List[Path]:
+        """Get the directories that make up Homebrew's installed state."""
+        prefix = self.prefix
+        if prefix is None:
+            return []
+        return [prefix / "Cellar", prefix / "Caskroom", prefix / "opt"]
+
+    def is_available(self) -> bool:
+        """Check whether a Homebrew Cellar exists."""
+        prefix = self.prefix
+        return prefix is not None and (prefix / "Cellar").is_dir()
+
+    def fingerprint(self) -> Tuple:
+        """Get the combined fingerprint of Cellar, Caskroom and opt.
+
+        Includes the keg directories inside Cellar and Caskroom, whose
+        mtimes change when a version is added or removed (a cask upgrade
+        only adds Caskroom/<name>/<version>).
+        """
+        paths = self.get_database_paths()
+        return tuple(stat_fingerprint(path) for path in paths) + tuple(
+            self._keg_fingerprint(path) for path in paths[:2]
+        )
+
+    def read_packages(self) -> Dict[str, PackageRecord]:
+        """Read installed formulas and casks.
+
+        Returns:
+            Dictionary mapping formula/cask names to records; status is
+            "formula" or "cask" and version is the linked (or newest) version
+
+        Raises:
+            FileNotFoundError: If no Homebrew Cellar can be found
+        """
+        if not self.is_available():
+            raise FileNotFoundError("Homebrew Cellar not found")
+
+        key = str(self.prefix)
+        fingerprint = self.fingerprint()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] == fingerprint:
+                return cached[1]
+
+        records: Dict[str, PackageRecord] = {}
+        prefix = self.prefix
+        # Casks first so a formula of the same name wins
+        for kind, directory in (("cask", prefix / "Caskroom"), ("formula", prefix / "Cellar")):
+            for name, versions in self._scan_keg_directory(directory).items():
+                version = self._linked_version(name) if kind == "formula" else ""
+                records[name] = PackageRecord(
+                    name=name,
+                    status=kind,
+                    version=version or versions[-1],
+                    installed=True,
+                )
+
+        with self._lock:
+            self._cache[key] = (fingerprint, records)
+
+        self.logger.debug(f"Scanned Homebrew prefix {prefix}: {len(records)} installed formulas/casks")
+        return records
+
+    def get_package(self, package: str) -> Optional[PackageRecord]:
+        """Get the record for a formula or cask (tap-qualified names accepted)."""
+        name = package.rsplit("/", 1)[-1]
+        records = self.read_packages()
+        record = records.get(name)
+        if record is not None:
+            return record
+
+        # Aliases (e.g. python3 -> python@3.12) are exposed as opt symlinks
+        opt_link = self.prefix / "opt" / name
+        try:
+            target = Path(os.path.realpath(opt_link))
+        except OSError:
+            return None
+        if opt_link.is_symlink() and target.is_dir() and target.parent.name in records:
+            return records[target.parent.name]
+        return None
+
+    def is_installed(self, package: str) -> bool:
+        """Check whether a formula or cask is installed.
+
+        Raises:
+            FileNotFoundError: If no Homebrew Cellar can be found
+        """
+        return self.get_package(package) is not None
+
+    def get_version(self, package: str) -> Optional[str]:
+        """Get the installed version of a formula or cask."""
+        record = self.get_package(package)
+        return record.version if record else None
+
+    def _scan_keg_directory(self, directory: Path) -> Dict[str, List[str]]:
+        """List <directory>/<name>/<version> entries, versions sorted."""
+        kegs: Dict[str, List[str]] = {}
+        try:
+            with os.scandir(directory) as iterator:
+                entries = list(iterator)
+        except OSError:
+            return kegs
+
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            try:
+                with os.scandir(entry.path) as children:
+                    versions = sorted(
+                        (child.name for child in children
+                         if not child.name.startswith(".") and child.is_dir()),
+                        key=version_sort_key,
+                    )
+            except OSError:
+                continue
+            if versions:
+                kegs[entry.name] = versions
+        return kegs
+
+    @staticmethod
+    def _keg_fingerprint(directory: Path) -> Tuple:
+        """Get the (name, mtime_ns) pairs of the keg directories in a directory."""
+        kegs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        kegs.append((entry.name, entry.stat().st_mtime_ns))
+                    except OSError:
+                        continue
+        except OSError:
+            return ()
+        return tuple(sorted(kegs))
+
+    def _linked_version(self, name: str) -> str:
+        """Get the version the opt/<name> symlink points at."""
+        try:
+            return Path(os.readlink(self.prefix / "opt" / name)).name
+        except OSError:
+            return ""
+
+
+def create_package_db_reader(package_manager_type: str):
+    """Create the in-process database reader for a package manager.
+
+    Args:
+        package_manager_type: Type of package manager (apt, brew, pacman, apk, dnf, ...)
+
+    Returns:
+        Reader instance, or None if the package manager has no native reader
+    """
+    if package_manager_type in ("apt", "apt-get"):
+        return DpkgStatusReader()
+    if package_manager_type == "brew":
+        return HomebrewCellarReader()
+    if package_manager_type == "pacman":
+        return PacmanLocalDbReader()
+    if package_manager_type == "apk":
+        return ApkInstalledReader()
+    if package_manager_type in ("yum", "dnf", "zypper"):
+        return RpmDbReader()
+    return None
@@ -10,6 +10,7 @@ from datetime import datetime
 
 from ..config_manager import ConfigManager
 from ..utils.logger import get_module_logger
+from .apt_update_policy import AptUpdatePolicy
 
 
 @dataclass
@@ -204,6 +205,9 @@ class PackageManagerDetector:
             
         try:
             if pm_name == "apt":
+                # Package lists from the old mirror must be refreshed before the next install
+                AptUpdatePolicy().invalidate(f"mirror changed to {mirror_url}")
+
                 # Backup current sources.list
                 sources_file = "/etc/apt/sources.list"
                 backup_file = f"{sources_file}.bak_{backup_suffix}"
@@ -228,6 +232,7 @@ class PackageManagerDetector:
                 
                 # Update package index using apt instead of apt-get
                 subprocess.run(["apt", "update"], check=True)
+                AptUpdatePolicy().mark_updated()
                 return True, f"Successfully changed APT mirror to {mirror_url}"
                 
             elif pm_name == "brew":
@@ -0,0 +1,202 @@
+"""Background download of an install plan's packages ahead of the installs."""
+
+import asyncio
+import os
+import shlex
+import shutil
+from pathlib import Path
+from typing import List, Optional, Set
+
+from ..utils.logger import get_module_logger
+
+
+class PackagePrefetcher:
+    """Download packages while earlier install commands are still running.
+
+    APT and Homebrew can download without blocking a concurrent install:
+    APT runs against a private copy of its state (dpkg status file, package
+    lists, cache), so every lock it takes lives in that copy, and fetches
+    into a private staging directory; finished .deb files are copied into
+    the system archive cache right before each install command.
+    Package managers that hold their database lock while downloading
+    (dnf, yum, zypper, pacman) prefetch the whole plan as one up-front
+    download-only stage instead, which at least merges the downloads.
+    """
+
+    CONCURRENT_MANAGERS = ("apt", "apt-get", "brew")
+    APT_ARCHIVE_DIR = "/var/cache/apt/archives"
+    APT_LISTS_DIR = Path("/var/lib/apt/lists")
+    DPKG_STATUS_FILE = Path("/var/lib/dpkg/status")
+    # Entries of the lists directory that are not package lists
+    IGNORED_LIST_ENTRIES = {"lock", "partial", "auxfiles"}
+
+    def __init__(self, app_installer, staging_dir: Optional[Path] = None):
+        """Initialize the prefetcher.
+
+        Args:
+            app_installer: AppInstaller providing package manager and commands
+            staging_dir: Private APT download directory (defaults to ~/.cache/initializer/apt-archives);
+                the private APT state is kept next to it in apt-state
+        """
+        self.app_installer = app_installer
+        self.package_manager = app_installer.package_manager
+        self.staging_dir = Path(staging_dir) if staging_dir else Path.home() / ".cache" / "initializer" / "apt-archives"
+        self.state_dir = self.staging_dir.with_name("apt-state")
+        self.logger = get_module_logger("package_prefetch")
+
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.packages: List[str] = []
+        self._output_tail: List[str] = []
+        self._published: Set[str] = set()
+        self._reader: Optional[asyncio.Task] = None
+        self._cancelled = False
+
+    @property
+    def runs_concurrently(self) -> bool:
+        """Check whether prefetching can overlap with install commands."""
+        return self.package_manager in self.CONCURRENT_MANAGERS
+
+    @property
+    def is_running(self) -> bool:
+        """Check whether the background download is still in progress."""
+        return self.process is not None and self.process.returncode is None
+
+    def get_command(self, packages: List[str]) -> Optional[str]:
+        """Get the download-only command for the given packages.
+
+        Args:
+            packages: Package names to download
+
+        Returns:
+            Command string, or None if the package manager cannot prefetch
+        """
+        if self.package_manager in ("apt", "apt-get"):
+            return self.app_installer.get_prefetch_command(packages, str(self.staging_dir), str(self.state_dir))
+        return self.app_installer.get_prefetch_command(packages)
+
+    def prepare_apt_state(self) -> None:
+        """Create the private APT state the download-only run works on.
+
+        The dpkg status file is copied (apt derives its system lock from its
+        directory) and the package lists are hard-linked where permitted and
+        copied otherwise; apt update replaces list files by renaming, so the
+        links keep the snapshot intact. The cache directory starts empty.
+
+        Raises:
+            OSError: If the state cannot be created
+        """
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        (self.state_dir / "dpkg").mkdir(parents=True)
+        (self.state_dir / "lists" / "partial").mkdir(parents=True)
+        (self.state_dir / "cache").mkdir()
+        shutil.copy2(self.DPKG_STATUS_FILE, self.state_dir / "dpkg" / "status")
+
+        with os.scandir(self.APT_LISTS_DIR) as entries:
+            for entry in entries:
+                if entry.name in self.IGNORED_LIST_ENTRIES or not entry.is_file():
+                    continue
+                target = self.state_dir / "lists" / entry.name
+                try:
+                    os.link(entry.path, target)
+                except OSError:
+                    # 跨文件系统或 protected_hardlinks 禁止链接时复制
+                    shutil.copy2(entry.path, target)
+
+    async def start(self, packages: List[str]) -> bool:
+        """Start downloading packages in the background (concurrent managers only).
+
+        Args:
+            packages: Package names to download
+
+        Returns:
+            True if the download process was started
+        """
+        if not packages or not self.runs_concurrently:
+            return False
+
+        if self.package_manager in ("apt", "apt-get"):
+            # 每个会话使用干净的暂存目录，apt 要求 partial 子目录存在
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+            (self.staging_dir / "partial").mkdir(parents=True, exist_ok=True)
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.prepare_apt_state)
+            except OSError as e:
+                self.logger.warning(f"Cannot prepare private APT state, not prefetching: {e}")
+                return False
+
+        command = self.get_command(packages)
+        if not command:
+            return False
+
+        self.packages = list(packages)
+        self.process = await asyncio.create_subprocess_shell(
+            command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        self._reader = asyncio.ensure_future(self._drain_output())
+        self.logger.info(f"Prefetching {len(packages)} packages in background: {command}")
+        return True
+
+    async def _drain_output(self) -> None:
+        """Consume the download output, keeping the last lines for error reports."""
+        async for line in self.process.stdout:
+            self._output_tail.append(line.decode("utf-8", errors="replace").rstrip())
+            del self._output_tail[:-5]
+
+    async def wait(self) -> bool:
+        """Wait for the background download to finish.
+
+        Returns:
+            True if the download succeeded
+        """
+        if self.process is None:
+            return False
+        if self._reader is not None:
+            await self._reader
+        returncode = await self.process.wait()
+        if returncode != 0 and not self._cancelled:
+            self.logger.warning(f"Prefetch exited with code {returncode}: {' | '.join(self._output_tail)}")
+        return returncode == 0
+
+    def get_publish_command(self) -> Optional[str]:
+        """Get the command copying newly downloaded .deb files into the APT archive cache.
+
+        Only complete files are considered: APT downloads into partial/ and
+        renames a file into the staging directory once its hash is verified.
+
+        Returns:
+            Command string, or None if there is nothing new to publish
+        """
+        if self.package_manager not in ("apt", "apt-get") or self.process is None:
+            return None
+
+        try:
+            new_files = sorted(
+                path for path in self.staging_dir.glob("*.deb") if path.name not in self._published
+            )
+        except OSError:
+            return None
+        if not new_files:
+            return None
+
+        self._published.update(path.name for path in new_files)
+        files = " ".join(shlex.quote(str(path)) for path in new_files)
+        return f"sudo cp -t {self.APT_ARCHIVE_DIR}/ {files}"
+
+    def cancel(self) -> None:
+        """Stop the background download if it is still running."""
+        if self.is_running:
+            self._cancelled = True
+            try:
+                self.process.terminate()
+            except ProcessLookupError:
+                pass
+
+    def cleanup(self) -> None:
+        """Stop downloading and remove the staging and private state directories."""
+        self.cancel()
+        if self.package_manager in ("apt", "apt-get"):
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+            shutil.rmtree(self.state_dir, ignore_errors=True)
@@ -0,0 +1,173 @@
+"""Persistent package status cache keyed by package database fingerprints."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..utils.logger import get_module_logger
+from ..utils.state_dir import get_state_dir
+from .package_db_readers import HomebrewCellarReader, stat_fingerprint
+from .software_models import Application
+
+
+class PackageStatusCache:
+    """On-disk cache of application installation status.
+
+    The cache is keyed by a fingerprint (mtime, size, inode) of the package
+    manager's local database plus a signature of the application catalog.
+    As long as neither changes, a cold start can load every application's
+    installed flag without running any checks.
+    """
+
+    CACHE_VERSION = 1
+
+    RPM_DATABASE_PATHS = [
+        "/var/lib/rpm", "/var/lib/rpm/rpmdb.sqlite", "/var/lib/rpm/rpmdb.sqlite-wal", "/var/lib/rpm/Packages",
+        "/usr/lib/sysimage/rpm", "/usr/lib/sysimage/rpm/rpmdb.sqlite", "/usr/lib/sysimage/rpm/rpmdb.sqlite-wal",
+    ]
+
+    # Local package databases whose changes invalidate cached status
+    DATABASE_PATHS = {
+        "apt": ["/var/lib/dpkg/status"],
+        "apt-get": ["/var/lib/dpkg/status"],
+        "yum": RPM_DATABASE_PATHS,
+        "dnf": RPM_DATABASE_PATHS,
+        "zypper": RPM_DATABASE_PATHS,
+        "pacman": ["/var/lib/pacman/local"],
+        "apk": ["/lib/apk/db/installed"],
+        "brew": ["/opt/homebrew/Cellar", "/opt/homebrew/Caskroom",
+                 "/usr/local/Cellar", "/usr/local/Caskroom",
+                 "/home/linuxbrew/.linuxbrew/Cellar", "/home/linuxbrew/.linuxbrew/Caskroom"],
+    }
+
+    def __init__(self, package_manager_type: str, cache_dir: Optional[Path] = None):
+        """Initialize the package status cache.
+
+        Args:
+            package_manager_type: Type of package manager (apt, brew, yum, etc.)
+            cache_dir: Directory for cache files (defaults to the user's state directory)
+        """
+        self.pm_type = package_manager_type
+        self.logger = get_module_logger("package_status_cache")
+        self.cache_dir = Path(cache_dir) if cache_dir else get_state_dir()
+        self.cache_file = self.cache_dir / f"package_status_{package_manager_type}.json"
+
+    def get_database_paths(self) -> List[str]:
+        """Get the package database paths watched for this package manager."""
+        if self.pm_type == "brew":
+            brew_paths = HomebrewCellarReader().get_database_paths()
+            if brew_paths:
+                return [str(path) for path in brew_paths]
+        return list(self.DATABASE_PATHS.get(self.pm_type, []))
+
+    def current_fingerprint(self) -> Optional[List[List]]:
+        """Compute the current fingerprint of the package databases.
+
+        Returns:
+            List of [path, mtime_ns, size, inode] entries for existing paths,
+            or None if no database could be found (caching disabled)
+        """
+        fingerprint = []
+        for path in self.get_database_paths():
+            stat = stat_fingerprint(Path(path))
+            if stat is not None:
+                fingerprint.append([path, *stat])
+
+        return fingerprint or None
+
+    def load(self, applications: List[Application], fingerprint: Optional[List[List]]) -> Optional[Dict[str, bool]]:
+        """Load cached results if the fingerprint and catalog still match.
+
+        Args:
+            applications: Applications that need a status
+            fingerprint: Current database fingerprint from current_fingerprint()
+
+        Returns:
+            Dictionary mapping application names to installation status,
+            or None if the cache is missing or stale
+        """
+        if fingerprint is None:
+            return None
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            self.logger.debug(f"No package status cache at {self.cache_file}")
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Failed to read package status cache: {e}")
+            return None
+
+        if data.get("version") != self.CACHE_VERSION or data.get("package_manager") != self.pm_type:
+            self.logger.debug("Package status cache format mismatch, ignoring")
+            return None
+
+        if data.get("fingerprint") != fingerprint:
+            self.logger.info("Package database changed since last run, status cache invalidated")
+            return None
+
+        if data.get("catalog") != self._catalog_signature(applications):
+            self.logger.info("Application catalog changed since last run, status cache invalidated")
+            return None
+
+        results = data.get("results", {})
+        if not all(app.name in results for app in applications):
+            return None
+
+        self.logger.debug(f"Loaded {len(results)} cached application statuses")
+        return {app.name: bool(results[app.name]) for app in applications}
+
+    def store(self, applications: List[Application], results: Dict[str, bool],
+              fingerprint: Optional[List[List]]) -> None:
+        """Persist check results together with the fingerprint they were computed against.
+
+        Args:
+            applications: Applications that were checked
+            results: Dictionary mapping application names to installation status
+            fingerprint: Database fingerprint taken before the check started
+        """
+        if fingerprint is None:
+            return
+
+        data = {
+            "version": self.CACHE_VERSION,
+            "package_manager": self.pm_type,
+            "fingerprint": fingerprint,
+            "catalog": self._catalog_signature(applications),
+            "results": {app.name: bool(results.get(app.name, False)) for app in applications},
+        }
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix(".tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.cache_file)
+            self.logger.debug(f"Package status cache written: {self.cache_file}")
+        except OSError as e:
+            self.logger.warning(f"Failed to write package status cache: {e}")
+
+    def invalidate(self) -> None:
+        """Remove the on-disk cache so the next check rebuilds it."""
+        try:
+            self.cache_file.unlink()
+            self.logger.info("Package status cache invalidated")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"Failed to remove package status cache: {e}")
+
+    def _catalog_signature(self, applications: List[Application]) -> str:
+        """Hash the catalog fields that influence status checking."""
+        digest = hashlib.sha1()
+        for app in sorted(applications, key=lambda a: a.name):
+            digest.update(app.name.encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(app.package.encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(" ".join(app.executables or []).encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()
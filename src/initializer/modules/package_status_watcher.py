@@ -0,0 +1,331 @@
+"""Filesystem watcher that reports package database and PATH changes."""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+from ..utils.logger import get_module_logger
+from .package_db_readers import Fingerprint, stat_fingerprint
+
+
+@dataclass
+class WatchEvent:
+    """Debounced batch of filesystem changes relevant to package status."""
+    database_changed: bool = False
+    executables: Set[str] = field(default_factory=set)
+    full_rescan: bool = False
+
+    def merge(self, other: "WatchEvent") -> None:
+        """Merge another event into this one."""
+        self.database_changed = self.database_changed or other.database_changed
+        self.executables.update(other.executables)
+        self.full_rescan = self.full_rescan or other.full_rescan
+
+    def is_empty(self) -> bool:
+        """Check whether the event carries any change."""
+        return not (self.database_changed or self.executables or self.full_rescan)
+
+
+@dataclass
+class _WatchTarget:
+    """A watched directory and how its entries map to package status."""
+    directory: str
+    database: bool = False
+    # Database file names inside the directory; None means any entry counts
+    database_names: Optional[Set[str]] = None
+    executables: bool = False
+
+
+class _InotifyBackend:
+    """Minimal inotify binding through ctypes (Linux only)."""
+
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, targets: Dict[str, _WatchTarget]):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._add_watch.restype = ctypes.c_int
+
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        self.targets: Dict[int, _WatchTarget] = {}
+        for directory, target in targets.items():
+            wd = self._add_watch(self.fd, os.fsencode(directory), self.WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err in (errno.ENOSPC, errno.EMFILE):
+                    self.close()
+                    raise OSError(err, f"inotify watch limit reached: {os.strerror(err)}")
+                continue
+            self.targets[wd] = target
+
+        if not self.targets:
+            self.close()
+            raise OSError(errno.ENOENT, "no watchable directories")
+
+    def wait(self, timeout: float) -> WatchEvent:
+        """Wait up to timeout seconds for events and translate them."""
+        event = WatchEvent()
+        try:
+            readable, _, _ = select.select([self.fd], [], [], timeout)
+        except (OSError, ValueError):
+            return event
+        if not readable:
+            return event
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return event
+
+        offset = 0
+        header_size = self.EVENT_HEADER.size
+        while offset + header_size <= len(data):
+            wd, mask, _cookie, name_len = self.EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + header_size:offset + header_size + name_len].rstrip(b"\0")
+            offset += header_size + name_len
+
+            if mask & self.IN_Q_OVERFLOW:
+                event.full_rescan = True
+                continue
+
+            target = self.targets.get(wd)
+            if target is None:
+                continue
+
+            entry = os.fsdecode(name)
+            if target.database and (target.database_names is None or entry in target.database_names):
+                event.database_changed = True
+            if target.executables and entry:
+                event.executables.add(entry)
+
+        return event
+
+    def close(self) -> None:
+        """Close the inotify file descriptor."""
+        if self.fd >= 0:
+            try:
+                os.close(self.fd)
+            except OSError:
+                pass
+            self.fd = -1
+
+
+class _PollingBackend:
+    """Portable fallback that compares stat fingerprints periodically."""
+
+    def __init__(self, targets: Dict[str, _WatchTarget], stop_event: threading.Event):
+        self.targets = targets
+        self.stop_event = stop_event
+        self._fingerprints: Dict[str, Optional[Fingerprint]] = {}
+        self._entries: Dict[str, Set[str]] = {}
+        self._scan(initial=True)
+
+    def wait(self, timeout: float) -> WatchEvent:
+        """Sleep for timeout seconds, then report what changed since the last scan."""
+        if self.stop_event.wait(timeout):
+            return WatchEvent()
+        return self._scan()
+
+    def _scan(self, initial: bool = False) -> WatchEvent:
+        event = WatchEvent()
+        for directory, target in self.targets.items():
+            if target.database:
+                names = target.database_names or {""}
+                for name in names:
+                    path = os.path.join(directory, name) if name else directory
+                    current = stat_fingerprint(Path(path))
+                    if self._fingerprints.get(path) != current and not initial:
+                        event.database_changed = True
+                    self._fingerprints[path] = current
+
+            if target.executables:
+                current = stat_fingerprint(Path(directory))
+                if self._fingerprints.get(directory) == current and not initial:
+                    continue
+                self._fingerprints[directory] = current
+                try:
+                    entries = set(os.listdir(directory))
+                except OSError:
+                    entries = set()
+                if not initial:
+                    event.executables.update(entries.symmetric_difference(self._entries.get(directory, set())))
+                self._entries[directory] = entries
+
+        return event
+
+    def close(self) -> None:
+        """Nothing to release for the polling backend."""
+
+
+class PackageStatusWatcher:
+    """Watch package databases and PATH directories for installation changes.
+
+    Uses inotify when available and falls back to stat polling otherwise.
+    Bursts of events (a package manager rewrites its database several times
+    per transaction) are debounced into a single WatchEvent that is handed
+    to the callback on the watcher thread.
+    """
+
+    def __init__(self, database_paths: List[str], on_change: Callable[[WatchEvent], None],
+                 watch_path_dirs: bool = True, debounce_seconds: float = 1.0,
+                 poll_interval_seconds: float = 2.0):
+        """Initialize the watcher.
+
+        Args:
+            database_paths: Package database files or directories to watch
+            on_change: Callback invoked with each debounced WatchEvent
+            watch_path_dirs: Also watch PATH directories for executables
+            debounce_seconds: Quiet period before changes are reported
+            poll_interval_seconds: Scan interval for the polling fallback
+        """
+        self.database_paths = database_paths
+        self.on_change = on_change
+        self.watch_path_dirs = watch_path_dirs
+        self.debounce_seconds = debounce_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.logger = get_module_logger("package_status_watcher")
+
+        self.backend_name: Optional[str] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Check whether the watcher thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Start watching in a daemon thread.
+
+        Returns:
+            True if the watcher is running, False if there was nothing to watch
+        """
+        if self.is_running:
+            return True
+
+        targets = self._build_targets()
+        if not targets:
+            self.logger.info("No package database or PATH directories to watch")
+            return False
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(targets,), name="package-status-watcher", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the watcher thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _build_targets(self) -> Dict[str, _WatchTarget]:
+        """Resolve watched paths into directories to watch."""
+        targets: Dict[str, _WatchTarget] = {}
+
+        for db_path in self.database_paths:
+            if os.path.isdir(db_path):
+                directory = os.path.realpath(db_path)
+                target = targets.setdefault(directory, _WatchTarget(directory))
+                target.database = True
+                target.database_names = None
+            elif os.path.isfile(db_path):
+                # 数据库文件通常以 rename 方式原子替换，因此监视其父目录
+                directory = os.path.realpath(os.path.dirname(db_path))
+                target = targets.setdefault(directory, _WatchTarget(directory))
+                if not target.database:
+                    target.database = True
+                    target.database_names = set()
+                if target.database_names is not None:
+                    target.database_names.add(os.path.basename(db_path))
+
+        if self.watch_path_dirs:
+            for path_dir in os.environ.get("PATH", "").split(os.pathsep):
+                if path_dir and os.path.isdir(path_dir):
+                    directory = os.path.realpath(path_dir)
+                    targets.setdefault(directory, _WatchTarget(directory)).executables = True
+
+        return targets
+
+    def _create_backend(self, targets: Dict[str, _WatchTarget]):
+        """Create the inotify backend, falling back to polling."""
+        if hasattr(select, "select") and os.name == "posix":
+            try:
+                backend = _InotifyBackend(targets)
+                self.backend_name = "inotify"
+                return backend
+            except (OSError, AttributeError) as e:
+                self.logger.info(f"inotify unavailable ({e}), falling back to polling")
+
+        self.backend_name = "polling"
+        return _PollingBackend(targets, self._stop_event)
+
+    def _run(self, targets: Dict[str, _WatchTarget]) -> None:
+        """Watcher thread main loop with debouncing."""
+        backend = self._create_backend(targets)
+        self.logger.info(f"Package status watcher started ({self.backend_name}, {len(targets)} directories)")
+
+        pending = WatchEvent()
+        last_event_time = 0.0
+        wait_timeout = 0.5 if self.backend_name == "inotify" else self.poll_interval_seconds
+
+        try:
+            while not self._stop_event.is_set():
+                timeout = wait_timeout
+                if not pending.is_empty():
+                    remaining = self.debounce_seconds - (time.monotonic() - last_event_time)
+                    timeout = max(0.05, min(timeout, remaining))
+
+                event = backend.wait(timeout)
+                if not event.is_empty():
+                    pending.merge(event)
+                    last_event_time = time.monotonic()
+                    continue
+
+                if not pending.is_empty() and time.monotonic() - last_event_time >= self.debounce_seconds:
+                    flushed, pending = pending, WatchEvent()
+                    self._dispatch(flushed)
+        except Exception as e:
+            self.logger.error(f"Package status watcher stopped unexpectedly: {e}")
+        finally:
+            backend.close()
+            self.logger.info("Package status watcher stopped")
+
+    def _dispatch(self, event: WatchEvent) -> None:
+        """Invoke the change callback, isolating its failures from the loop."""
+        self.logger.debug(
+            f"Package status change detected: database={event.database_changed}, "
+            f"executables={len(event.executables)}, full_rescan={event.full_rescan}"
+        )
+        try:
+            self.on_change(event)
+        except Exception as e:
+            self.logger.warning(f"Package status change handler failed: {e}")
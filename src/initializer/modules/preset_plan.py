@@ -0,0 +1,286 @@
+"""Resolution of configuration presets into ordered action plans."""
+
+import getpass
+import os
+import pwd
+import shlex
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from ..utils.logger import get_module_logger
+from .install_transaction import InstallTransactionPlanner, action_applications
+from .software_models import Application
+
+
+# Packages behind "install_development_tools" per package manager
+DEVELOPMENT_PACKAGES = {
+    "apt": ["build-essential"],
+    "apt-get": ["build-essential"],
+    "dnf": ["gcc", "gcc-c++", "make"],
+    "yum": ["gcc", "gcc-c++", "make"],
+    "pacman": ["base-devel"],
+    "zypper": ["gcc", "gcc-c++", "make"],
+    "apk": ["build-base"],
+}
+
+# user_management settings that no module implements yet
+UNSUPPORTED_USER_SETTINGS = {
+    "create_admin_user": "creating an admin user",
+    "setup_ssh_keys": "setting up SSH keys",
+    "disable_root_login": "disabling root login",
+}
+
+
+@dataclass
+class PresetStep:
+    """One step of a preset plan.
+
+    Attributes:
+        kind: "apt_update", "install" or "command" (shell commands run through
+            the installer's sudo handling), "ohmyzsh", "neovim" or "lazyvim"
+            (run through the Zsh and Vim managers)
+        title: Human readable description
+        command: Shell command line (command kinds only)
+        applications: Catalog applications whose status is saved after success
+    """
+    kind: str
+    title: str
+    command: str = ""
+    applications: List[Application] = field(default_factory=list)
+
+    @property
+    def privileged(self) -> bool:
+        """Check whether the step needs root privileges."""
+        return "sudo" in self.command or self.kind == "neovim"
+
+
+@dataclass
+class PresetPlan:
+    """Ordered steps that apply a preset.
+
+    Attributes:
+        preset: Preset file name (without .yaml)
+        title: Preset display name
+        steps: Steps to run, in order
+        notes: Planned work that is not run (already done, skipped, unsupported)
+    """
+    preset: str
+    title: str
+    steps: List[PresetStep] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+
+    @property
+    def requires_privileges(self) -> bool:
+        """Check whether any step needs root privileges."""
+        return any(step.privileged for step in self.steps)
+
+
+class PresetPlanner:
+    """Turn a preset into the steps the installer and managers would run.
+
+    Packages map onto catalog applications where the catalog has an
+    application for exactly that package (so post-install steps and status
+    tracking apply); other packages are installed as ad-hoc applications.
+    Installed packages are left out, eligible installs are merged into one
+    package manager transaction, and apt's package lists are only refreshed
+    when the update policy says they are stale.
+    """
+
+    def __init__(self, app_installer, modules_config: Optional[Dict[str, Any]] = None):
+        """Initialize the planner.
+
+        Args:
+            app_installer: AppInstaller providing the catalog, commands and status checks
+            modules_config: Raw modules configuration (for the oh-my-zsh install URL)
+        """
+        self.app_installer = app_installer
+        self.modules_config = (modules_config or {}).get("modules", {})
+        self.logger = get_module_logger("preset_plan")
+
+    def plan(self, preset_name: str, preset: Dict[str, Any]) -> PresetPlan:
+        """Resolve a preset into a plan.
+
+        Args:
+            preset_name: Preset file name
+            preset: Preset configuration as loaded by ConfigManager.load_preset
+
+        Returns:
+            PresetPlan with the steps to run
+        """
+        plan = PresetPlan(preset_name, preset.get("name") or preset_name)
+        enabled_modules = preset.get("enabled_modules")
+
+        def module_enabled(name: str) -> bool:
+            section = preset.get(name)
+            if isinstance(section, dict) and section.get("enabled") is False:
+                return False
+            return enabled_modules is None or name in enabled_modules
+
+        package_manager = self.app_installer.package_manager
+        packages: List[str] = []
+        if module_enabled("package_manager"):
+            packages.extend(self._preset_packages(preset, package_manager, plan))
+        elif preset.get("package_manager"):
+            plan.notes.append("Package manager module is not enabled in this preset")
+
+        shell = None
+        if module_enabled("user_management"):
+            shell = self._plan_user_management(preset.get("user_management") or {}, packages, plan)
+
+        applications: List[Application] = []
+        for name in preset.get("applications") or []:
+            app = self.app_installer.catalog.get(name)
+            if app is None:
+                plan.notes.append(f"Application {name} is not in the application catalog")
+            else:
+                applications.append(app)
+        applications.extend(self._package_applications(packages, applications))
+
+        if package_manager is None and applications:
+            plan.notes.append("No supported package manager detected, packages are not installed")
+            applications = []
+
+        missing = []
+        for app in applications:
+            if self.app_installer.check_application_status(app):
+                plan.notes.append(f"{app.name} is already installed")
+            else:
+                missing.append(app)
+
+        package_settings = preset.get("package_manager") or {}
+        if module_enabled("package_manager") and package_settings.get("update_sources"):
+            self._plan_apt_update(plan)
+        self._plan_installs(missing, plan)
+
+        if shell:
+            if self._login_shell() == shell:
+                plan.notes.append(f"{shell} is already the login shell")
+            else:
+                plan.steps.append(self._shell_step(shell))
+
+        zsh_settings = preset.get("zsh_management") or {}
+        if zsh_settings.get("install_ohmyzsh"):
+            plan.steps.append(PresetStep("ohmyzsh", "Install Oh-my-zsh"))
+
+        vim_settings = preset.get("vim_management") or {}
+        if vim_settings.get("install_neovim"):
+            plan.steps.append(PresetStep("neovim", "Install NeoVim"))
+        if vim_settings.get("install_lazyvim"):
+            plan.steps.append(PresetStep("lazyvim", "Install LazyVim"))
+
+        self.logger.info(f"Preset {preset_name} resolved: {len(plan.steps)} steps, {len(plan.notes)} notes")
+        return plan
+
+    @property
+    def ohmyzsh_install_url(self) -> str:
+        """Get the configured oh-my-zsh install script URL."""
+        zsh_config = self.modules_config.get("zsh_management", {})
+        return zsh_config.get("ohmyzsh", {}).get(
+            "install_url", "https://raw.githubusercontent.com/ohmyzsh/ohmyzsh/master/tools/install.sh"
+        )
+
+    def _preset_packages(self, preset: Dict[str, Any], package_manager: Optional[str], plan: PresetPlan) -> List[str]:
+        """Collect the package names a preset asks for on this package manager."""
+        settings = preset.get("package_manager") or {}
+        homebrew = preset.get("homebrew") or {}
+        packages: List[str] = []
+
+        if package_manager == "brew":
+            if homebrew.get("enabled"):
+                packages.extend(homebrew.get("default_packages") or [])
+            if settings.get("essential_packages"):
+                plan.notes.append("Essential packages are distribution packages, not installed with Homebrew")
+            return list(dict.fromkeys(packages))
+
+        if homebrew.get("enabled"):
+            plan.notes.append("Homebrew setup is not run headless, Homebrew packages skipped")
+        if settings.get("install_essential_packages", True):
+            packages.extend(settings.get("essential_packages") or [])
+        if settings.get("install_development_tools"):
+            development = DEVELOPMENT_PACKAGES.get(package_manager or "")
+            if development:
+                packages.extend(development)
+            else:
+                plan.notes.append(f"No development tools defined for {package_manager or 'this system'}")
+        return list(dict.fromkeys(packages))
+
+    def _plan_user_management(self, settings: Dict[str, Any], packages: List[str], plan: PresetPlan) -> Optional[str]:
+        """Plan the supported user settings; returns the login shell to set, if any."""
+        for key, description in UNSUPPORTED_USER_SETTINGS.items():
+            if settings.get(key):
+                plan.notes.append(f"{key}: {description} is not supported yet, skipped")
+
+        if not settings.get("configure_shell"):
+            return None
+        shell = settings.get("shell_preference") or "zsh"
+        if shell not in packages and shell not in ("bash", "sh"):
+            packages.append(shell)
+        return shell
+
+    def _package_applications(self, packages: List[str], selected: List[Application]) -> List[Application]:
+        """Map package names onto catalog applications, or ad-hoc ones."""
+        covered = {package for app in selected for package in app.get_package_list()}
+        applications = []
+        for package in packages:
+            if package in covered:
+                continue
+            covered.add(package)
+            # Only reuse a catalog entry that installs exactly this package
+            matches = [app for app in self.app_installer.catalog.applications_for_packages([package])
+                       if app.get_package_list() == [package]]
+            applications.append(matches[0] if matches else Application(name=package, package=package))
+        return applications
+
+    def _plan_apt_update(self, plan: PresetPlan) -> None:
+        """Refresh apt's package lists unless the update policy says they are fresh."""
+        if self.app_installer.package_manager not in ("apt", "apt-get"):
+            return
+        if self.app_installer.needs_apt_update():
+            decision = self.app_installer.apt_update_decision
+            plan.steps.append(PresetStep(
+                "apt_update", f"Update package lists ({decision.reason})",
+                self.app_installer.get_apt_update_command(),
+            ))
+        else:
+            plan.notes.append(f"APT update skipped: {self.app_installer.apt_update_decision.reason}")
+
+    def _plan_installs(self, applications: List[Application], plan: PresetPlan) -> None:
+        """Plan package installs, merged into one transaction where possible, then post-install steps."""
+        actions = [{"action": "install", "application": app, "is_batch": False} for app in applications]
+        merged = set()
+        for transaction in InstallTransactionPlanner(self.app_installer).plan(actions):
+            merged.update(transaction.action_indexes)
+            plan.steps.append(PresetStep(
+                "install", f"Install {len(transaction.packages)} packages",
+                transaction.command, list(transaction.applications),
+            ))
+
+        for index, action in enumerate(actions):
+            if index in merged:
+                continue
+            app = action["application"]
+            command = self.app_installer.get_install_command(app)
+            if command:
+                plan.steps.append(PresetStep("install", f"Install {app.name}", command, [app]))
+            else:
+                plan.notes.append(f"No install command for {app.name} on {self.app_installer.package_manager}")
+
+        for app in (app for action in actions for app in action_applications(action)):
+            post_install = self.app_installer.get_post_install_command(app)
+            if post_install:
+                plan.steps.append(PresetStep("command", f"Post-install for {app.name}", post_install))
+
+    @staticmethod
+    def _login_shell() -> str:
+        """Get the name of the current user's login shell from the passwd database."""
+        try:
+            return os.path.basename(pwd.getpwuid(os.getuid()).pw_shell)
+        except (KeyError, OSError):
+            return ""
+
+    @staticmethod
+    def _shell_step(shell: str) -> PresetStep:
+        """Build the login shell change (through sudo, chsh would prompt for the password)."""
+        user = getpass.getuser()
+        command = f'sudo chsh -s "$(command -v {shlex.quote(shell)})" {shlex.quote(user)}'
+        return PresetStep("command", f"Set the login shell of {user} to {shell}", command)
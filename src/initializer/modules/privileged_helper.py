@@ -0,0 +1,541 @@
+"""Long-lived root helper process executing privileged commands for a session."""
+
+import asyncio
+import json
+import re
+import signal
+import struct
+import subprocess
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..utils.logger import get_module_logger
+from .task_scheduler import split_commands
+
+
+# Frame: payload length, kind, request id, then the payload bytes
+FRAME_HEADER = struct.Struct(">IBI")
+
+# Client -> helper
+KIND_START = ord("S")  # JSON {"command", "env", "cwd"}
+KIND_SIGNAL = ord("C")  # signal number (ASCII)
+KIND_PAUSE = ord("H")  # stop reading the command's output
+KIND_RESUME = ord("G")  # read the command's output again
+KIND_QUIT = ord("Q")
+# Helper -> client
+KIND_READY = ord("R")
+KIND_PID = ord("P")  # process id (ASCII)
+KIND_OUTPUT = ord("O")  # raw output bytes (stdout and stderr merged)
+KIND_EXIT = ord("X")  # return code (ASCII)
+
+# sudo at the start of a simple command
+SUDO_PREFIX = re.compile(r"(^|[;&|(\n])(\s*)sudo\s+")
+# Expanded or redirected by the operator's own shell before sudo starts
+USER_SHELL_CHARS = frozenset("$`~<>")
+
+# Written after the password; everything before it is discarded by the helper,
+# which covers sudo not prompting at all (cached timestamp, NOPASSWD rules)
+SYNC_MARKER = b"\x00initializer-helper-sync\x00"
+
+# Runs as root under "sudo python -c"; standard library only, since the
+# package is not importable in sudo's reset environment.
+HELPER_SOURCE = r'''
+import json, os, signal, struct, subprocess, sys, threading
+HEADER = struct.Struct(">IBI")
+inp = sys.stdin.buffer
+devnull = os.open(os.devnull, os.O_RDWR)
+os.dup2(devnull, 2)
+lock = threading.Lock()
+procs = {}
+flows = {}
+SYNC = %r
+
+def send(kind, rid, payload=b""):
+    # Loop until the whole frame is written; a partial pipe write must not cut it
+    data = memoryview(HEADER.pack(len(payload), kind, rid) + payload)
+    with lock:
+        while data:
+            data = data[os.write(1, data):]
+
+def read_exact(n):
+    data = b""
+    while len(data) < n:
+        chunk = inp.read(n - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+def pump(rid, proc, flowing):
+    fd = proc.stdout.fileno()
+    while True:
+        flowing.wait()
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            break
+        send(79, rid, chunk)
+    code = proc.wait()
+    procs.pop(rid, None)
+    flows.pop(rid, None)
+    send(88, rid, str(code).encode())
+
+def start(rid, request):
+    env = dict(os.environ)
+    env.update(request.get("env") or {})
+    try:
+        proc = subprocess.Popen(["/bin/sh", "-c", request["command"]], stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env,
+                                cwd=request.get("cwd") or None, start_new_session=True)
+    except OSError as e:
+        send(79, rid, (str(e) + "\n").encode())
+        send(88, rid, b"127")
+        return
+    procs[rid] = proc
+    flowing = flows[rid] = threading.Event()
+    flowing.set()
+    send(80, rid, str(proc.pid).encode())
+    threading.Thread(target=pump, args=(rid, proc, flowing), daemon=True).start()
+
+tail = b""
+while tail != SYNC:
+    c = inp.read(1)
+    if not c:
+        sys.exit(0)
+    tail = (tail + c)[-len(SYNC):]
+
+send(82, 0)
+while True:
+    header = read_exact(HEADER.size)
+    if header is None:
+        break
+    length, kind, rid = HEADER.unpack(header)
+    payload = read_exact(length) if length else b""
+    if payload is None:
+        break
+    if kind == 83:
+        start(rid, json.loads(payload))
+    elif kind == 67:
+        proc = procs.get(rid)
+        if proc is not None:
+            try:
+                os.killpg(proc.pid, int(payload or signal.SIGTERM))
+            except OSError:
+                pass
+    elif kind == 72:
+        flowing = flows.get(rid)
+        if flowing is not None:
+            flowing.clear()
+    elif kind == 71:
+        flowing = flows.get(rid)
+        if flowing is not None:
+            flowing.set()
+    elif kind == 81:
+        break
+
+for proc in list(procs.values()):
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except OSError:
+        pass
+''' % (SYNC_MARKER,)
+
+
+def helper_command(command: str) -> Optional[str]:
+    """Get the command line the helper should run for a sudo command line.
+
+    Only lines whose simple commands all start with a plain "sudo" (no
+    options) run the same as root: the prefixes are stripped and the rest
+    is sent to the helper. Lines with commands run as the operator, sudo
+    options, or anything the operator's shell would expand or redirect
+    before sudo starts ($, `, ~, <, >) keep going through sudo.
+
+    Args:
+        command: Shell command line
+
+    Returns:
+        Command line without the sudo prefixes, or None if it must not run in the helper
+    """
+    if USER_SHELL_CHARS.intersection(command):
+        return None
+
+    segments = [words for words in split_commands(command) if words]
+    if not segments or any(len(words) < 2 or words[0] != "sudo" or words[1].startswith("-")
+                           for words in segments):
+        return None
+
+    stripped, count = SUDO_PREFIX.subn(r"\1\2", command)
+    # "sudo" inside a quoted argument would be stripped as well
+    if count != len(segments):
+        return None
+    return stripped
+
+
+class _HelperRequest:
+    """Client-side state of one command running in the helper."""
+
+    def __init__(self, on_output: Callable[[bytes], None], on_exit: Callable[[int], None]):
+        self.on_output = on_output
+        self.on_exit = on_exit
+        self.pid: Optional[int] = None
+
+
+class _StreamFlowControl:
+    """Transport stand-in that pauses one command's output in the helper.
+
+    StreamReader calls pause_reading() once its buffer passes twice its
+    limit and resume_reading() when a read brings it back under the limit
+    (both on the event loop). The helper then stops or restarts reading
+    that command's pipe only, so other commands and the shared reader
+    thread keep going. After release() the output is never paused again.
+    """
+
+    def __init__(self, process: "HelperProcess"):
+        self._process = process
+        self._paused = False
+        self._released = False
+
+    def pause_reading(self) -> None:
+        if not self._released and not self._paused:
+            self._paused = True
+            self._process._helper.set_flowing(self._process.request_id, False)
+
+    def resume_reading(self) -> None:
+        if self._paused:
+            self._paused = False
+            self._process._helper.set_flowing(self._process.request_id, True)
+
+    def release(self) -> None:
+        """Stop throttling (the output is no longer going to be read)."""
+        self._released = True
+        self.resume_reading()
+
+
+class HelperProcess:
+    """Process-like handle for a command running in the helper.
+
+    Mirrors the parts of asyncio.subprocess.Process that the install screens
+    use (stdout stream, returncode, wait, terminate, kill), so helper and
+    local processes are handled the same way. Output is pushed by the helper;
+    while the stdout buffer is full the helper stops reading this command's
+    pipe, so a slow reader throttles the command as it would a local
+    process. Like with a local process, stdout must be read for wait() to
+    finish.
+    """
+
+    def __init__(self, helper: "PrivilegedHelper", request_id: int, loop: asyncio.AbstractEventLoop):
+        self._helper = helper
+        self._loop = loop
+        self.request_id = request_id
+        self.stdin = None
+        self.stdout = asyncio.StreamReader(limit=2 ** 20, loop=loop)
+        self._flow = _StreamFlowControl(self)
+        self.stdout.set_transport(self._flow)
+        self.returncode: Optional[int] = None
+        self._exited = loop.create_future()
+
+    @property
+    def pid(self) -> Optional[int]:
+        """Get the root-side process ID (None until the helper reported it)."""
+        request = self._helper._requests.get(self.request_id)
+        return request.pid if request else None
+
+    def _feed(self, data: bytes) -> None:
+        """Pass output to the stdout stream (called on the reader thread)."""
+        try:
+            self._loop.call_soon_threadsafe(self.stdout.feed_data, data)
+        except RuntimeError:
+            pass  # Loop already closed; nobody is waiting any more
+
+    def _set_exit(self, returncode: int) -> None:
+        """Record the exit (called on the owning event loop)."""
+        self.returncode = returncode
+        self.stdout.feed_eof()
+        if not self._exited.done():
+            self._exited.set_result(returncode)
+
+    async def wait(self) -> int:
+        """Wait for the command to exit.
+
+        Returns:
+            Return code (negative if the helper died)
+        """
+        return await self._exited
+
+    def send_signal(self, signum: int) -> None:
+        """Send a signal to the command's process group."""
+        if self.returncode is None:
+            self._helper.send_signal(self.request_id, signum)
+        if signum in (signal.SIGTERM, signal.SIGKILL):
+            # The caller may stop reading; let the command drain and exit
+            self._flow.release()
+
+    def terminate(self) -> None:
+        """Ask the command to stop (SIGTERM)."""
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        """Kill the command (SIGKILL)."""
+        self.send_signal(signal.SIGKILL)
+
+
+class PrivilegedHelper:
+    """Client for a root helper started once per session through sudo.
+
+    The helper authenticates a single time and then runs every privileged
+    command of the session, so commands no longer pay a PAM round trip each
+    and a long session cannot run into the sudo timestamp timeout. Requests
+    and output travel as length-prefixed frames over the helper's stdin and
+    stdout; any number of commands can run at the same time, each in its
+    own process group so it can be cancelled. The helper exits when its
+    stdin closes, i.e. at the latest when this process exits.
+
+    Only command lines made entirely of sudo commands are run here (see
+    helper_command()); they run with the environment sudo gave the helper,
+    as each sudo would have.
+    """
+
+    READY_TIMEOUT = 15.0
+
+    def __init__(self):
+        """Initialize the helper client (the helper is started by start())."""
+        self.logger = get_module_logger("privileged_helper")
+        self._process: Optional[subprocess.Popen] = None
+        self._requests: Dict[int, _HelperRequest] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._next_id = 1
+        self._connected = False
+        self._state_changed = threading.Event()  # Set when the helper reported ready or went away
+        self._reader: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Check whether the helper is up and accepting commands."""
+        return self._connected and self._process is not None
+
+    def start(self, password: str) -> Tuple[bool, str]:
+        """Start the helper, authenticating with the given sudo password.
+
+        Args:
+            password: Verified sudo password
+
+        Returns:
+            (success, error message)
+        """
+        if self.is_running:
+            return True, ""
+
+        command = ["sudo", "-S", "-p", "", sys.executable, "-c", HELPER_SOURCE]
+        try:
+            self._process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True,
+            )
+            self._state_changed.clear()
+            self._reader = threading.Thread(target=self._read_frames, name="privileged-helper", daemon=True)
+            self._reader.start()
+            self._process.stdin.write(f"{password}\n".encode("utf-8") + SYNC_MARKER)
+            self._process.stdin.flush()
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Failed to start privileged helper: {e}")
+            self._process = None
+            return False, str(e)
+
+        if self._state_changed.wait(self.READY_TIMEOUT) and self._connected:
+            self.logger.info(f"Privileged helper started (pid {self._process.pid})")
+            return True, ""
+
+        error = ""
+        try:
+            self._process.kill()
+            _, stderr = self._process.communicate(timeout=2)
+            error = stderr.decode("utf-8", errors="replace").strip()
+        except Exception:
+            pass
+        self.logger.warning(f"Privileged helper did not start: {error or 'no response'}")
+        self._process = None
+        return False, error or "Privileged helper did not respond"
+
+    def stop(self) -> None:
+        """Stop the helper; commands still running are terminated."""
+        process = self._process
+        if process is None:
+            return
+        try:
+            self._send(KIND_QUIT, 0)
+            process.stdin.close()
+            process.wait(timeout=5)
+        except Exception:
+            try:
+                process.kill()
+            except OSError:
+                pass
+        self._process = None
+        self._connected = False
+        self.logger.info("Privileged helper stopped")
+
+    def submit(self, command: str, on_output: Callable[[bytes], None], on_exit: Callable[[int], None],
+               env: Optional[Dict[str, str]] = None, cwd: Optional[str] = None) -> int:
+        """Start a command in the helper.
+
+        Callbacks run on the helper's reader thread.
+
+        Args:
+            command: Shell command line
+            on_output: Called with each chunk of output
+            on_exit: Called once with the return code
+            env: Extra environment variables for this command
+            cwd: Working directory (defaults to the helper's)
+
+        Returns:
+            Request ID
+
+        Raises:
+            RuntimeError: If the helper is not running
+        """
+        if not self.is_running:
+            raise RuntimeError("Privileged helper is not running")
+
+        with self._lock:
+            request_id = self._next_id
+            self._next_id += 1
+            self._requests[request_id] = _HelperRequest(on_output, on_exit)
+        payload = json.dumps({"command": command, "env": env or {}, "cwd": cwd}).encode("utf-8")
+        try:
+            self._send(KIND_START, request_id, payload)
+        except OSError as e:
+            with self._lock:
+                self._requests.pop(request_id, None)
+            raise RuntimeError(f"Privileged helper is not running: {e}") from e
+        self.logger.debug(f"Helper request {request_id}: {command}")
+        return request_id
+
+    def run(self, command: str, env: Optional[Dict[str, str]] = None,
+            timeout: Optional[float] = 300) -> Tuple[Optional[int], str]:
+        """Run a command and wait for it (blocking).
+
+        Args:
+            command: Shell command line
+            env: Extra environment variables for this command
+            timeout: Seconds before the command is killed
+
+        Returns:
+            (return code or None on timeout, combined output)
+        """
+        chunks: List[bytes] = []
+        done = threading.Event()
+        result: List[int] = []
+
+        def on_exit(returncode: int) -> None:
+            result.append(returncode)
+            done.set()
+
+        request_id = self.submit(command, chunks.append, on_exit, env)
+        if not done.wait(timeout):
+            self.send_signal(request_id, signal.SIGKILL)
+            done.wait(5)
+        output = b"".join(chunks).decode("utf-8", errors="replace")
+        return (result[0] if result else None), output
+
+    async def spawn(self, command: str, env: Optional[Dict[str, str]] = None,
+                    cwd: Optional[str] = None) -> HelperProcess:
+        """Start a command and return a process-like handle bound to the running loop.
+
+        Args:
+            command: Shell command line
+            env: Extra environment variables for this command
+            cwd: Working directory
+
+        Returns:
+            Handle with stdout stream, wait(), terminate() and kill()
+
+        Raises:
+            RuntimeError: If the helper is not running
+        """
+        loop = asyncio.get_running_loop()
+        process = HelperProcess(self, 0, loop)
+
+        def call_in_loop(callback, *args) -> None:
+            try:
+                loop.call_soon_threadsafe(callback, *args)
+            except RuntimeError:
+                pass  # Loop already closed; nobody is waiting any more
+
+        process.request_id = self.submit(
+            command,
+            process._feed,
+            lambda returncode: call_in_loop(process._set_exit, returncode),
+            env,
+            cwd,
+        )
+        return process
+
+    def send_signal(self, request_id: int, signum: int) -> None:
+        """Send a signal to a running command's process group."""
+        try:
+            self._send(KIND_SIGNAL, request_id, str(int(signum)).encode("ascii"))
+        except OSError as e:
+            self.logger.debug(f"Failed to signal helper request {request_id}: {e}")
+
+    def set_flowing(self, request_id: int, flowing: bool) -> None:
+        """Pause or resume reading a running command's output in the helper."""
+        try:
+            self._send(KIND_RESUME if flowing else KIND_PAUSE, request_id)
+        except OSError as e:
+            self.logger.debug(f"Failed to change flow of helper request {request_id}: {e}")
+
+    def _send(self, kind: int, request_id: int, payload: bytes = b"") -> None:
+        """Write one frame to the helper."""
+        process = self._process
+        if process is None or process.stdin is None:
+            raise OSError("Privileged helper is not running")
+        with self._write_lock:
+            process.stdin.write(FRAME_HEADER.pack(len(payload), kind, request_id) + payload)
+            process.stdin.flush()
+
+    def _read_frames(self) -> None:
+        """Reader thread: dispatch frames from the helper until it exits."""
+        process = self._process
+        stream = process.stdout
+        try:
+            while True:
+                header = stream.read(FRAME_HEADER.size)
+                if len(header) < FRAME_HEADER.size:
+                    break
+                length, kind, request_id = FRAME_HEADER.unpack(header)
+                payload = stream.read(length) if length else b""
+                if len(payload) < length:
+                    break
+
+                if kind == KIND_READY:
+                    self._connected = True
+                    self._state_changed.set()
+                    continue
+                request = self._requests.get(request_id)
+                if request is None:
+                    continue
+                if kind == KIND_OUTPUT:
+                    request.on_output(payload)
+                elif kind == KIND_PID:
+                    request.pid = int(payload)
+                elif kind == KIND_EXIT:
+                    with self._lock:
+                        self._requests.pop(request_id, None)
+                    request.on_exit(int(payload))
+        except Exception as e:
+            self.logger.warning(f"Privileged helper connection failed: {e}")
+        finally:
+            self._connected = False
+            self._state_changed.set()
+            # 助手进程退出时，让所有等待中的命令以失败结束
+            with self._lock:
+                orphaned, self._requests = list(self._requests.values()), {}
+            for request in orphaned:
+                try:
+                    request.on_exit(-1)
+                except Exception:
+                    pass
@@ -1,22 +1,86 @@
 """Quick verification layer for efficient preliminary package status checking."""
 
-import shutil
-from typing import List, Dict, Tuple, Optional
+import os
+import re
+import sys
+from typing import List, Dict, Tuple, Optional, FrozenSet
 from pathlib import Path
 from ..utils.logger import get_module_logger
+from .app_catalog import AppCatalog
 from .software_models import Application
+from .file_ownership_index import FileOwnershipIndex, create_file_ownership_index
+
+
+class DirectoryIndex:
+    """In-memory index of directory listings for O(1) existence lookups.
+
+    Each directory is listed once into a set of entry names and re-listed
+    only when its mtime changes, so repeated lookups never touch the disk.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        # directory -> (mtime_ns or None if missing, entry names)
+        self._entries: Dict[str, Tuple[Optional[int], FrozenSet[str]]] = {}
+
+    def refresh(self, directories: List[str]) -> int:
+        """Re-list directories whose mtime changed since the last scan.
+
+        Args:
+            directories: Directories that must be indexed
+
+        Returns:
+            Number of directories that were (re)scanned
+        """
+        rescanned = 0
+        for directory in directories:
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                mtime = None
+
+            cached = self._entries.get(directory)
+            if cached is not None and cached[0] == mtime:
+                continue
+
+            names: FrozenSet[str] = frozenset()
+            if mtime is not None:
+                try:
+                    names = frozenset(os.listdir(directory))
+                except OSError:
+                    pass
+            self._entries[directory] = (mtime, names)
+            rescanned += 1
+        return rescanned
+
+    def contains(self, directory: str, name: str) -> bool:
+        """Check whether directory/name existed at the last scan."""
+        cached = self._entries.get(directory)
+        return cached is not None and name in cached[1]
+
+    def merged(self, directories: List[str]) -> Dict[str, List[str]]:
+        """Merge listings into name -> directories (in the given order)."""
+        merged: Dict[str, List[str]] = {}
+        for directory in directories:
+            for name in self._entries.get(directory, (None, frozenset()))[1]:
+                merged.setdefault(name, []).append(directory)
+        return merged
 
 
 class QuickVerificationChecker:
     """Quick verification layer using filesystem checks before expensive system queries."""
 
-    def __init__(self, package_manager_type: str):
+    TEST_PACKAGE_PATTERN = re.compile(r'[a-z]+-[a-z]+-[a-z]+.*\d+')
+
+    def __init__(self, package_manager_type: str, catalog: Optional[AppCatalog] = None):
         """Initialize the quick verification checker.
 
         Args:
             package_manager_type: Type of package manager (apt, brew, yum, etc.)
+            catalog: Compiled application catalog (provides the Homebrew install kinds)
         """
         self.pm_type = package_manager_type
+        self.catalog = catalog
         self.logger = get_module_logger("quick_verification_checker")
 
         # Common installation paths by package manager type
@@ -109,8 +173,67 @@ class QuickVerificationChecker:
             "atom": ["atom"],
         }
 
+        # 非 macOS 系统上跳过 /Applications 等 macOS 专用路径
+        if sys.platform != "darwin":
+            for pm, templates in self.common_paths.items():
+                self.common_paths[pm] = [t for t in templates if not t.startswith(("/Applications/", "/System/"))]
+
+        # Precomputed directory listings for PATH and common path templates
+        self._index = DirectoryIndex()
+        self._path_dirs: List[str] = []
+        self._path_env: Optional[str] = None
+        self._path_lookup: Dict[str, List[str]] = {}
+        self._executable_hits: Dict[str, List[str]] = {}
+        # name suffix ("" or ".app") -> names present in any common path directory
+        self._common_names: Dict[str, FrozenSet[str]] = {}
+        self._path_templates = self._compile_path_templates()
+
+        # path -> owning package index (built lazily on first lookup); when
+        # available, filesystem hits only count if they belong to the app's package
+        self.ownership_index: Optional[FileOwnershipIndex] = create_file_ownership_index(package_manager_type)
+
         self.logger.info(f"QuickVerificationChecker initialized for {package_manager_type}")
 
+    def _compile_path_templates(self) -> List[Tuple[str, str]]:
+        """Split common path templates into (directory, name suffix) pairs."""
+        # Get paths for current package manager, fallback to all paths
+        templates = self.common_paths.get(self.pm_type, sum(self.common_paths.values(), []))
+
+        compiled = []
+        for template in dict.fromkeys(templates):
+            prefix, _, suffix = template.partition("{package}")
+            compiled.append((prefix.rstrip("/") or "/", suffix))
+        return compiled
+
+    def refresh_index(self) -> None:
+        """Bring the PATH and common path index up to date.
+
+        Only directories whose mtime changed are re-listed, so this costs
+        one stat per indexed directory when nothing was installed.
+        """
+        path_env = os.environ.get("PATH", "")
+        path_changed = path_env != self._path_env
+        if path_changed:
+            self._path_env = path_env
+            self._path_dirs = list(dict.fromkeys(d for d in path_env.split(os.pathsep) if d))
+
+        path_rescanned = self._index.refresh(self._path_dirs)
+        if path_changed or path_rescanned:
+            # executable name -> PATH directories containing it, in PATH order
+            self._path_lookup = self._index.merged(self._path_dirs)
+            self._executable_hits = {}
+
+        common_rescanned = self._index.refresh([d for d, _ in self._path_templates])
+        if common_rescanned or not self._common_names:
+            common_names: Dict[str, set] = {}
+            for directory, suffix in self._path_templates:
+                common_names.setdefault(suffix, set()).update(self._index.merged([directory]))
+            self._common_names = {suffix: frozenset(names) for suffix, names in common_names.items()}
+
+        rescanned = path_rescanned + common_rescanned
+        if rescanned:
+            self.logger.debug(f"Filesystem index refreshed: {rescanned} directories rescanned")
+
     def quick_verify_applications(self, applications: List[Application]) -> Tuple[Dict[str, bool], List[Application]]:
         """Quickly verify applications using filesystem checks.
 
@@ -126,6 +249,8 @@ class QuickVerificationChecker:
         verified_results = {}
         unverified_apps = []
 
+        self.refresh_index()
+
         for app in applications:
             quick_result = self._quick_verify_single_app(app)
 
@@ -165,13 +290,14 @@ class QuickVerificationChecker:
         executables = self._get_executables_for_app(app)
 
         for executable in executables:
-            if self._check_executable_in_path(executable):
+            # Any PATH match may be the packaged one (shims/venvs often shadow it)
+            if any(self._is_owned_by_packages(path, packages) for path in self._find_executable_paths(executable)):
                 self.logger.debug(f"Found executable {executable} for {app.name}")
                 return True
 
         # Check other indicators (paths, files) for positive confirmation
         for package in packages:
-            if self._check_package_indicators(package):
+            if self._check_package_indicators(package, packages):
                 self.logger.debug(f"Found package indicators for {app.name}")
                 return True
 
@@ -191,6 +317,10 @@ class QuickVerificationChecker:
         if app.executables:
             return app.executables
 
+        # Cask tokens (e.g. visual-studio-code) are not executable names
+        if self._is_cask_only(app):
+            return []
+
         # Priority 2: Use hardcoded special rules (for backward compatibility)
         packages = app.get_package_list()
         executables = []
@@ -204,6 +334,10 @@ class QuickVerificationChecker:
 
         return executables
 
+    def _is_cask_only(self, app: Application) -> bool:
+        """Check whether the catalog declares a Homebrew application as a cask."""
+        return self.pm_type == "brew" and self.catalog is not None and self.catalog.get_brew_type(app.name) == "cask"
+
     def _is_definitely_nonexistent(self, package: str) -> bool:
         """Check if a package is definitely non-existent based on name patterns.
 
@@ -234,34 +368,38 @@ class QuickVerificationChecker:
                 return True
 
         # Check for random-looking names (contains numbers and hyphens suggesting test names)
-        import re
-        if re.search(r'[a-z]+-[a-z]+-[a-z]+.*\d+', package_lower):
+        if self.TEST_PACKAGE_PATTERN.search(package_lower):
             if len(package) > 20:  # Very long names are often test packages
                 self.logger.debug(f"Detected likely test package by pattern: {package}")
                 return True
 
         return False
 
-    def _check_package_indicators(self, package: str) -> Optional[bool]:
+    def _check_package_indicators(self, package: str, owners: Optional[List[str]] = None) -> Optional[bool]:
         """Check various indicators for a single package.
 
         Args:
             package: Package name to check
+            owners: Packages a found path must belong to (defaults to [package])
 
         Returns:
             True if strong evidence of installation, False if strong evidence of absence, None if uncertain
         """
+        owners = owners or [package]
+
         # Method 1: Check if executable is in PATH
-        if self._check_executable_in_path(package):
+        if any(self._is_owned_by_packages(path, owners) for path in self._find_executable_paths(package)):
             return True
 
         # Method 2: Check common installation paths
-        if self._check_common_paths(package):
-            return True
+        for path in self._find_common_paths(package):
+            if self._is_owned_by_packages(path, owners):
+                return True
 
         # Method 3: Check package-specific paths and files
-        if self._check_package_specific_files(package):
-            return True
+        for path in self._find_package_specific_files(package):
+            if self._is_owned_by_packages(path, owners):
+                return True
 
         # Method 4: For some packages, absence of key files indicates not installed
         if self._check_definitive_absence(package):
@@ -270,35 +408,93 @@ class QuickVerificationChecker:
         # Uncertain - need system-level check
         return None
 
-    def _check_executable_in_path(self, executable: str) -> bool:
-        """Check if an executable exists in PATH."""
+    def _is_owned_by_packages(self, path: str, packages: List[str]) -> bool:
+        """Check that a path found on disk belongs to one of the app's packages.
+
+        Without an ownership index every hit counts (heuristic mode). With
+        one, leftovers such as /etc/<package> after an uninstall, or a
+        same-named binary from another package, no longer count as installed.
+        """
+        if self.ownership_index is None:
+            return True
+
         try:
-            return shutil.which(executable) is not None
-        except Exception:
-            return False
+            owned = self.ownership_index.is_owned_by(path, packages)
+        except OSError as e:
+            self.logger.warning(f"File ownership index unavailable, using heuristic L2 checks: {e}")
+            self.ownership_index = None
+            return True
+
+        if not owned:
+            self.logger.debug(f"Ignoring {path}: not owned by {', '.join(packages)}")
+        return owned
+
+    def _check_executable_in_path(self, executable: str) -> bool:
+        """Check if an executable exists in PATH (same semantics as shutil.which)."""
+        return self._find_executable(executable) is not None
+
+    def _find_executable(self, executable: str) -> Optional[str]:
+        """Locate an executable via the PATH index.
+
+        Returns:
+            Full path of the first match in PATH order, or None
+        """
+        paths = self._find_executable_paths(executable)
+        return paths[0] if paths else None
+
+    def _find_executable_paths(self, executable: str) -> List[str]:
+        """Get every PATH location of an executable, in PATH order."""
+        if self._path_env is None:
+            self.refresh_index()
+
+        if os.sep in executable:
+            return [executable] if os.path.isfile(executable) and os.access(executable, os.X_OK) else []
+
+        cached = self._executable_hits.get(executable)
+        if cached is not None:
+            return cached
+
+        found = []
+        for directory in self._path_lookup.get(executable, ()):
+            # Only index hits are confirmed on disk (executable bit, not a directory)
+            candidate = os.path.join(directory, executable)
+            if os.access(candidate, os.X_OK) and not os.path.isdir(candidate):
+                found.append(candidate)
+
+        self._executable_hits[executable] = found
+        return found
 
     def _check_common_paths(self, package: str) -> bool:
         """Check common installation paths for the package."""
-        # Get paths for current package manager, fallback to all paths
-        paths_templates = self.common_paths.get(
-            self.pm_type,
-            # Combine all paths as fallback
-            sum(self.common_paths.values(), [])
-        )
+        return bool(self._find_common_paths(package))
 
-        for path_template in paths_templates:
-            try:
-                path = Path(path_template.format(package=package))
-                if path.exists():
-                    self.logger.debug(f"Found package indicator at: {path}")
-                    return True
-            except Exception:
-                continue
+    def _find_common_paths(self, package: str) -> List[str]:
+        """Get the common installation paths that exist for the package."""
+        if self._path_env is None:
+            self.refresh_index()
 
-        return False
+        if os.sep not in package and not any(
+            f"{package}{suffix}" in names for suffix, names in self._common_names.items()
+        ):
+            return []
+
+        # Nested names (e.g. tap-qualified formulas) are not indexed and are checked on disk
+        found = []
+        for directory, suffix in self._path_templates:
+            name = f"{package}{suffix}"
+            if self._index.contains(directory, name) if os.sep not in name else Path(directory, name).exists():
+                found.append(os.path.join(directory, name))
+
+        if found:
+            self.logger.debug(f"Found package indicator at: {found[0]}")
+        return found
 
     def _check_package_specific_files(self, package: str) -> bool:
         """Check for package-specific files and directories."""
+        return bool(self._find_package_specific_files(package))
+
+    def _find_package_specific_files(self, package: str) -> List[str]:
+        """Get the package-specific files and directories that exist."""
         # Docker 卸载后常遗留 /var/lib/docker 等目录，不能作为安装判断依据，因此不在 specific_checks 中配置 Docker，避免误判。
         specific_checks = {
             # Python packages
@@ -324,6 +520,7 @@ class QuickVerificationChecker:
             "git": ["/usr/local/share/git-core"] if self.pm_type == "brew" else [],
         }
 
+        found = []
         if package in specific_checks:
             for path_pattern in specific_checks[package]:
                 try:
@@ -333,16 +530,16 @@ class QuickVerificationChecker:
                         matches = glob.glob(path_pattern)
                         if matches:
                             self.logger.debug(f"Found package-specific files for {package}: {matches[0]}")
-                            return True
+                            found.extend(matches)
                     else:
                         path = Path(path_pattern)
                         if path.exists():
                             self.logger.debug(f"Found package-specific path for {package}: {path}")
-                            return True
+                            found.append(str(path))
                 except Exception:
                     continue
 
-        return False
+        return found
 
     def _check_definitive_absence(self, package: str) -> bool:
         """Check for definitive signs that a package is NOT installed.
@@ -40,6 +40,7 @@ class Application(SoftwareItem):
     post_install: str = ""
     tags: List[str] = field(default_factory=list)
     install_recommends: bool = None  # None means use global config, True/False overrides
+    depends_on: List[str] = field(default_factory=list)  # Applications to set up before this one
     installed: bool = False
     type: str = "standalone"  # "standalone" or "component"
 
@@ -6,6 +6,7 @@ import os
 import asyncio
 from typing import Optional, Tuple
 from ..utils.logger import get_module_logger
+from .privileged_helper import PrivilegedHelper, helper_command
 
 
 class SudoManager:
@@ -24,6 +25,9 @@ class SudoManager:
         # 用于密码加密的简单密钥（基于用户ID和进程ID）
         self._cipher_key = self._generate_cipher_key()
 
+        # 验证成功后启动的常驻 root 助手进程，会话内的 sudo 命令都经由它执行
+        self._helper: Optional[PrivilegedHelper] = None
+
     def _generate_cipher_key(self) -> int:
         """生成用于密码加密的简单密钥.
 
@@ -161,6 +165,7 @@ class SudoManager:
                 self._retry_count = 0  # 重置重试计数
 
                 self.logger.info("sudo权限验证成功")
+                self._start_helper(password)
                 return True, "验证成功"
             else:
                 # 验证失败
@@ -202,6 +207,53 @@ class SudoManager:
             self.logger.error(f"sudo权限验证异常: {e}")
             return False, error_msg
 
+    def _start_helper(self, password: str) -> None:
+        """启动常驻特权助手进程（失败时回退为逐条命令执行sudo）.
+
+        Args:
+            password: 已验证的密码
+        """
+        if self._helper is not None and self._helper.is_running:
+            return
+        helper = PrivilegedHelper()
+        success, error = helper.start(password)
+        if success:
+            self._helper = helper
+            self.logger.info("特权助手进程已启动，后续sudo命令无需重复认证")
+        else:
+            self._helper = None
+            self.logger.warning(f"特权助手启动失败，回退为逐条命令执行sudo: {error}")
+
+    def get_helper(self) -> Optional[PrivilegedHelper]:
+        """获取正在运行的特权助手.
+
+        Returns:
+            运行中的助手，未启动或已退出时返回None
+        """
+        if self._helper is not None and self._helper.is_running:
+            return self._helper
+        return None
+
+    def _format_helper_result(self, returncode: Optional[int], output: str) -> Tuple[bool, str]:
+        """将助手执行结果转换为 (成功状态, 输出信息或错误信息).
+
+        Args:
+            returncode: 退出码，超时为None
+            output: 合并后的命令输出
+
+        Returns:
+            (成功状态, 输出信息或错误信息)
+        """
+        output = output.strip()
+        if returncode is None:
+            return False, "命令执行超时（5分钟）"
+        if returncode == 0:
+            return True, output if output else "命令执行成功"
+        error_msg = output if output else "命令执行失败"
+        error_msg += f" (退出码: {returncode})"
+        self.logger.warning(f"sudo命令执行失败: {error_msg}")
+        return False, error_msg
+
     def execute_with_sudo(self, command: str) -> Tuple[bool, str]:
         """使用缓存的密码执行sudo命令.
 
@@ -231,6 +283,15 @@ class SudoManager:
             # 如果命令不需要sudo，直接执行
             return self._execute_command_direct(command)
 
+        helper = self.get_helper()
+        helper_cmd = helper_command(command) if helper is not None else None
+        if helper_cmd is not None:
+            try:
+                self.logger.debug(f"通过特权助手执行命令: {helper_cmd}")
+                return self._format_helper_result(*helper.run(helper_cmd, timeout=300))
+            except RuntimeError as e:
+                self.logger.warning(f"特权助手不可用，回退为直接执行sudo: {e}")
+
         try:
             # 解密密码
             password = self._decrypt_password(self._password)
@@ -386,6 +447,22 @@ class SudoManager:
             # 如果命令不需要sudo，直接执行
             return await self._execute_command_direct_async(command)
 
+        helper = self.get_helper()
+        helper_cmd = helper_command(command) if helper is not None else None
+        if helper_cmd is not None:
+            try:
+                self.logger.debug(f"通过特权助手异步执行命令: {helper_cmd}")
+                process = await helper.spawn(helper_cmd)
+                try:
+                    output = await asyncio.wait_for(process.stdout.read(), timeout=300.0)
+                    returncode = await process.wait()
+                except asyncio.TimeoutError:
+                    process.kill()
+                    return self._format_helper_result(None, "")
+                return self._format_helper_result(returncode, output.decode("utf-8", errors="replace"))
+            except RuntimeError as e:
+                self.logger.warning(f"特权助手不可用，回退为直接执行sudo: {e}")
+
         try:
             # 解密密码
             password = self._decrypt_password(self._password)
@@ -530,7 +607,11 @@ class SudoManager:
             return False
 
     def clear_password(self) -> None:
-        """清理内存中的密码和验证状态."""
+        """清理内存中的密码和验证状态，并停止特权助手."""
+        if self._helper is not None:
+            self._helper.stop()
+            self._helper = None
+
         if self._password:
             # 清理加密密码
             self._password = None
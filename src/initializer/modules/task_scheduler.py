@@ -0,0 +1,302 @@
+"""Dependency-aware scheduler running install session work as a task graph."""
+
+import asyncio
+import shlex
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional
+
+from ..utils.logger import get_module_logger
+
+
+# Resource names; nodes sharing a resource never run at the same time
+PACKAGE_MANAGER_LOCK = "package_manager"  # dpkg/rpm/pacman database lock
+USER_DOTFILES_LOCK = "user_dotfiles"  # files in the user's home directory
+
+PACKAGE_MANAGER_COMMANDS = frozenset({
+    "apt", "apt-get", "aptitude", "apt-mark", "dpkg", "dpkg-reconfigure", "debconf-set-selections",
+    "add-apt-repository", "update-initramfs", "yum", "dnf", "rpm", "zypper", "pacman", "apk", "brew",
+    "snap", "flatpak",
+})
+TOOL_LOCKS = {
+    "pip": "pip", "pip3": "pip", "pipx": "pip",
+    "npm": "npm", "pnpm": "npm", "yarn": "npm", "corepack": "npm",
+    "systemctl": "system", "usermod": "system", "groupadd": "system", "update-alternatives": "system",
+}
+# Programs known to only touch user files; anything unknown takes the package manager lock
+USER_FILE_COMMANDS = frozenset({
+    "git", "curl", "wget", "echo", "printf", "cat", "tee", "touch", "mkdir", "ln", "cp", "mv", "rm",
+    "chmod", "chown", "sed", "grep", "tar", "unzip", "gzip", "test", "[", "true", "false", "cd",
+    "export", "source", ".", "chsh",
+})
+SHELL_COMMANDS = frozenset({"sh", "bash", "dash", "zsh"})
+SHELL_KEYWORDS = frozenset({
+    "if", "then", "else", "elif", "fi", "do", "done", "while", "until", "case", "esac", "!", "{", "}",
+    "exec", "command", "time",
+})
+# Options of the prefix commands that take a value in the next word
+PREFIX_OPTION_ARGUMENTS = {
+    "sudo": {"-u", "-g", "-h", "-p", "-C", "-D", "-r", "-t", "-T", "-U", "--user", "--group", "--host",
+             "--prompt", "--close-from", "--chdir", "--role", "--type", "--command-timeout", "--other-user"},
+    "env": {"-u", "-C", "--unset", "--chdir"},
+    "nohup": set(),
+}
+COMMAND_SEPARATORS = frozenset({";", "&&", "||", "|", "&", "(", ")", ";;", "|&"})
+
+
+def split_commands(command: str) -> List[List[str]]:
+    """Split a command line into the word lists of its simple commands (quotes respected)."""
+    lexer = shlex.shlex(command.replace("\n", ";"), posix=True, punctuation_chars=True)
+    lexer.whitespace_split = True
+    segments: List[List[str]] = [[]]
+    try:
+        for token in lexer:
+            if token in COMMAND_SEPARATORS:
+                segments.append([])
+            else:
+                segments[-1].append(token)
+    except ValueError:
+        # 引号不匹配时退回到按空白拆分
+        return [segment.split() for segment in command.replace("&&", ";").replace("||", ";").replace("|", ";").split(";")]
+    return segments
+
+
+def _strip_prefixes(words: List[str]) -> List[str]:
+    """Drop sudo/env/nohup prefixes (with their options), shell keywords and variable assignments."""
+    while words:
+        head = words[0]
+        if head in SHELL_KEYWORDS or ("=" in head and not head.startswith("-")):
+            words = words[1:]
+            continue
+        if head not in PREFIX_OPTION_ARGUMENTS:
+            break
+        takes_value = PREFIX_OPTION_ARGUMENTS[head]
+        words = words[1:]
+        while words and words[0].startswith("-"):
+            option = words[0]
+            words = words[1:]
+            if option == "--":
+                break
+            if option.startswith("--"):
+                if "=" not in option and option in takes_value:
+                    words = words[1:]
+                continue
+            # 短选项可以合并（-Eu bob）；值可以紧跟在选项字母后（-ubob）
+            for index, letter in enumerate(option[1:], 1):
+                if f"-{letter}" in takes_value:
+                    if index == len(option) - 1:
+                        words = words[1:]
+                    break
+    return words
+
+
+def _shell_script(words: List[str]) -> Optional[str]:
+    """Get the script of a "sh -c SCRIPT" style invocation (None if it runs a file or stdin)."""
+    for index, word in enumerate(words[1:], 1):
+        if not word.startswith("-") or word.startswith("--"):
+            return None
+        if "c" in word[1:]:
+            return words[index + 1] if index + 1 < len(words) else None
+    return None
+
+
+def classify_command_resources(command: str) -> FrozenSet[str]:
+    """Get the locks a shell command needs, based on the programs it runs.
+
+    Package manager invocations take the package manager lock, known tools
+    (pip, npm, systemctl, ...) take a lock of their own, and programs known
+    to only touch user files take the dotfiles lock. Scripts passed to
+    "sh -c"/"bash -c" are classified recursively; any other program may
+    call the package manager and therefore takes its lock.
+
+    Args:
+        command: Shell command line (may chain commands with &&, ; or |)
+
+    Returns:
+        Set of resource names
+    """
+    resources = set()
+    for words in split_commands(command):
+        words = _strip_prefixes(words)
+        if not words:
+            continue
+
+        program = words[0].rsplit("/", 1)[-1]
+        if program in ("python", "python3") and words[1:3] == ["-m", "pip"]:
+            program = "pip"
+
+        if program in SHELL_COMMANDS:
+            script = _shell_script(words)
+            resources.update(classify_command_resources(script) if script else {PACKAGE_MANAGER_LOCK})
+        elif program in PACKAGE_MANAGER_COMMANDS:
+            resources.add(PACKAGE_MANAGER_LOCK)
+        elif program in TOOL_LOCKS:
+            resources.add(TOOL_LOCKS[program])
+        elif program in USER_FILE_COMMANDS:
+            resources.add(USER_DOTFILES_LOCK)
+        else:
+            resources.add(PACKAGE_MANAGER_LOCK)
+    return frozenset(resources or {USER_DOTFILES_LOCK})
+
+
+@dataclass
+class TaskNode:
+    """One unit of work in the task graph.
+
+    Attributes:
+        key: Unique node identifier
+        run: Coroutine factory; the coroutine returns True on success
+        resources: Locks held while the node runs
+        depends_on: Keys of nodes that must succeed first
+        on_skip: Called with the failed dependency key when the node is skipped
+        state: pending, running, success, failed or skipped
+    """
+    key: str
+    run: Callable[[], Awaitable[bool]]
+    resources: FrozenSet[str] = frozenset()
+    depends_on: List[str] = field(default_factory=list)
+    on_skip: Optional[Callable[[str], None]] = None
+    state: str = "pending"
+
+
+class TaskScheduler:
+    """Run a graph of task nodes concurrently under resource locks.
+
+    A node starts once all of its dependencies succeeded, none of its
+    resources is held by a running node and fewer than max_parallel nodes
+    are running. Ready nodes start in insertion order, so nodes competing
+    for the same lock keep the order they were added in. When a node fails,
+    everything depending on it is skipped.
+    """
+
+    def __init__(self, max_parallel: int = 2):
+        """Initialize the scheduler.
+
+        Args:
+            max_parallel: Maximum number of nodes running at the same time
+        """
+        self.max_parallel = max(1, max_parallel)
+        self.nodes: Dict[str, TaskNode] = {}
+        self.logger = get_module_logger("task_scheduler")
+
+    def add(self, key: str, run: Callable[[], Awaitable[bool]], resources: Iterable[str] = (),
+            depends_on: Iterable[str] = (), on_skip: Optional[Callable[[str], None]] = None) -> TaskNode:
+        """Add a node to the graph.
+
+        Args:
+            key: Unique node identifier
+            run: Coroutine factory returning True on success
+            resources: Locks held while the node runs
+            depends_on: Keys of nodes that must succeed first (may be added later)
+            on_skip: Called when the node is skipped because a dependency failed
+
+        Returns:
+            The created node
+
+        Raises:
+            ValueError: If a node with the same key already exists
+        """
+        if key in self.nodes:
+            raise ValueError(f"Duplicate task node: {key}")
+        node = TaskNode(key, run, frozenset(resources), list(dict.fromkeys(depends_on)), on_skip)
+        self.nodes[key] = node
+        return node
+
+    def validate(self) -> None:
+        """Check that every dependency exists and the graph has no cycles.
+
+        Raises:
+            ValueError: If a dependency is unknown or the dependencies form a cycle
+        """
+        for node in self.nodes.values():
+            for dependency in node.depends_on:
+                if dependency not in self.nodes:
+                    raise ValueError(f"Task node '{node.key}' depends on unknown node '{dependency}'")
+
+        # Kahn's algorithm: every node must become ready eventually
+        remaining = {key: len(node.depends_on) for key, node in self.nodes.items()}
+        dependents: Dict[str, List[str]] = {}
+        for node in self.nodes.values():
+            for dependency in node.depends_on:
+                dependents.setdefault(dependency, []).append(node.key)
+
+        ready = [key for key, count in remaining.items() if count == 0]
+        visited = 0
+        while ready:
+            key = ready.pop()
+            visited += 1
+            for dependent in dependents.get(key, []):
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+
+        if visited != len(self.nodes):
+            cyclic = sorted(key for key, count in remaining.items() if count > 0)
+            raise ValueError(f"Dependency cycle between task nodes: {', '.join(cyclic)}")
+
+    async def run(self, should_stop: Optional[Callable[[], bool]] = None) -> Dict[str, str]:
+        """Run the graph until every node finished or was skipped.
+
+        Args:
+            should_stop: Polled before starting nodes; when it returns True no
+                new node starts and the pending ones are left as they are
+
+        Returns:
+            Dictionary mapping node keys to their final state
+
+        Raises:
+            ValueError: If the graph is invalid (see validate())
+        """
+        self.validate()
+        running: Dict[asyncio.Task, TaskNode] = {}
+        held = set()
+
+        while True:
+            stopping = should_stop is not None and should_stop()
+            if not stopping:
+                self._skip_blocked_nodes()
+                for node in self.nodes.values():
+                    if len(running) >= self.max_parallel:
+                        break
+                    if node.state != "pending" or held & node.resources:
+                        continue
+                    if all(self.nodes[dep].state == "success" for dep in node.depends_on):
+                        node.state = "running"
+                        held |= node.resources
+                        running[asyncio.ensure_future(node.run())] = node
+                        self.logger.debug(f"Started task node {node.key} ({len(running)} running)")
+
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                held -= node.resources
+                try:
+                    node.state = "success" if future.result() else "failed"
+                except Exception as e:
+                    node.state = "failed"
+                    self.logger.error(f"Task node {node.key} raised: {e}")
+
+        return {key: node.state for key, node in self.nodes.items()}
+
+    def _skip_blocked_nodes(self) -> None:
+        """Skip pending nodes whose dependencies failed or were skipped (transitively)."""
+        changed = True
+        while changed:
+            changed = False
+            for node in self.nodes.values():
+                if node.state != "pending":
+                    continue
+                failed = next(
+                    (dep for dep in node.depends_on if self.nodes[dep].state in ("failed", "skipped")), None
+                )
+                if failed is None:
+                    continue
+                node.state = "skipped"
+                changed = True
+                if node.on_skip is not None:
+                    try:
+                        node.on_skip(failed)
+                    except Exception as e:
+                        self.logger.warning(f"Skip handler of {node.key} failed: {e}")
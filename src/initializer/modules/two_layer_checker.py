@@ -1,32 +1,44 @@
 """Two-layer package status checker combining quick verification and batch system checking."""
 
 import time
-from typing import List, Dict, Any, Union
+from pathlib import Path
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple, Union
 from ..utils.logger import get_module_logger
+from .app_catalog import AppCatalog
 from .quick_verification_checker import QuickVerificationChecker
 from .batch_package_checker import BatchPackageChecker
+from .package_status_cache import PackageStatusCache
 from .software_models import Application, ApplicationSuite, SoftwareItem
 
 
 class TwoLayerPackageChecker:
     """Efficient two-layer package status checker using L2 (quick verification) + L3 (batch system check)."""
 
-    def __init__(self, package_manager_type: str):
+    def __init__(self, package_manager_type: str, max_concurrency: Optional[int] = None,
+                 state_dir: Optional[Path] = None, catalog: Optional[AppCatalog] = None):
         """Initialize the two-layer checker.
 
         Args:
             package_manager_type: Type of package manager (apt, brew, yum, etc.)
+            max_concurrency: Upper bound for concurrent L3 individual checks (None = auto)
+            state_dir: Directory of the persistent status cache (defaults to the user's state directory)
+            catalog: Compiled application catalog shared with the installer (optional)
         """
         self.pm_type = package_manager_type
+        self.catalog = catalog
         self.logger = get_module_logger("two_layer_package_checker")
 
         # Initialize both layers
-        self.quick_checker = QuickVerificationChecker(package_manager_type)
-        self.batch_checker = BatchPackageChecker(package_manager_type)
+        self.quick_checker = QuickVerificationChecker(package_manager_type, catalog)
+        self.batch_checker = BatchPackageChecker(package_manager_type, max_concurrency, catalog)
+
+        # Persistent status cache keyed by package database fingerprints
+        self.status_cache = PackageStatusCache(package_manager_type, state_dir)
 
         # Performance tracking
         self.stats = {
             "total_checks": 0,
+            "cache_hits": 0,
             "l2_hits": 0,
             "l3_checks": 0,
             "l2_hit_rate": 0.0,
@@ -107,6 +119,27 @@ class TwoLayerPackageChecker:
             self.logger.info("Falling back to L3-only mode")
             return await self.batch_checker.batch_check_applications(applications)
 
+    async def refresh_applications(self, applications: List[Application]) -> Dict[str, bool]:
+        """Re-verify only the given applications, bypassing the status cache.
+
+        Used after install/uninstall sessions so that just the touched
+        applications are checked again instead of the whole catalog.
+
+        Args:
+            applications: Applications to re-check
+
+        Returns:
+            Dictionary mapping application names to installation status
+        """
+        if not applications:
+            return {}
+
+        self.logger.info(f"Targeted status refresh for {len(applications)} applications")
+        results = await self.check_applications(applications)
+        for app in applications:
+            app.installed = results.get(app.name, False)
+        return results
+
     def get_performance_stats(self) -> Dict[str, Any]:
         """Get performance statistics for the two-layer checker.
 
@@ -117,6 +150,7 @@ class TwoLayerPackageChecker:
             "total_applications_checked": self.stats["total_checks"],
             "l2_quick_verifications": self.stats["l2_hits"],
             "l3_system_checks": self.stats["l3_checks"],
+            "status_cache_hits": self.stats["cache_hits"],
             "l2_hit_rate_percent": round(self.stats["l2_hit_rate"], 1),
             "total_time_seconds": round(self.stats["total_time"], 3),
             "l2_time_seconds": round(self.stats["l2_time"], 3),
@@ -125,15 +159,107 @@ class TwoLayerPackageChecker:
             "performance_breakdown": {
                 "quick_verification_percentage": round((self.stats["l2_time"] / max(0.001, self.stats["total_time"])) * 100, 1),
                 "system_check_percentage": round((self.stats["l3_time"] / max(0.001, self.stats["total_time"])) * 100, 1)
-            }
+            },
+            "individual_checks": self.batch_checker.limiter.get_stats()
         }
 
 
-    async def check_software_items(self, software_items: List[Union[ApplicationSuite, Application]]) -> Dict[str, bool]:
+    def _expand_software_items(self, software_items: List[Union[ApplicationSuite, Application]]) -> List[Application]:
+        """Flatten suites into their components, keeping standalone applications."""
+        # 目录编译时已展开套件，无需再次遍历
+        if self.catalog is not None and software_items is self.catalog.software_items:
+            return list(self.catalog.applications)
+
+        all_applications = []
+        for item in software_items:
+            if isinstance(item, ApplicationSuite):
+                all_applications.extend(item.components)
+            else:
+                all_applications.append(item)
+        return all_applications
+
+    async def iter_check_software_items(self, software_items: List[Union[ApplicationSuite, Application]],
+                                        use_cache: bool = True) -> AsyncIterator[Tuple[Application, bool]]:
+        """Stream installation status for mixed software items as each layer resolves it.
+
+        Cached results are yielded at once; otherwise L2 verified applications
+        are yielded right after the quick filesystem pass and the rest follow
+        one by one as L3 answers them. Suites are expanded, so one tuple is
+        yielded per component or standalone application, and each
+        application's installed flag is updated before it is yielded.
+
+        Args:
+            software_items: List of software items (mix of ApplicationSuite and Application objects)
+            use_cache: Whether cached results may be used (results are always written back)
+
+        Yields:
+            Tuples of (application, installation status)
+        """
+        all_applications = self._expand_software_items(software_items)
+        if not all_applications:
+            return
+
+        self.logger.info(f"Starting streaming check for {len(all_applications)} applications")
+        start_time = time.time()
+
+        # Take the fingerprint before checking so concurrent package changes invalidate the result
+        fingerprint = self.status_cache.current_fingerprint()
+        cached_results = self.status_cache.load(all_applications, fingerprint) if use_cache else None
+
+        if cached_results is not None:
+            self.stats["cache_hits"] += len(all_applications)
+            self.logger.info(f"Loaded {len(cached_results)} application statuses from status cache")
+            for app in all_applications:
+                app.installed = cached_results[app.name]
+                yield app, app.installed
+            return
+
+        self.stats["total_checks"] += len(all_applications)
+        results: Dict[str, bool] = {}
+
+        try:
+            # Layer 2: Quick verification
+            l2_start = time.time()
+            quick_results, unverified_apps = self.quick_checker.quick_verify_applications(all_applications)
+            self.stats["l2_hits"] += len(quick_results)
+            self.stats["l2_time"] += time.time() - l2_start
+            self.logger.info(f"L2 quick verification: {len(quick_results)} verified, {len(unverified_apps)} need L3")
+        except Exception as e:
+            self.logger.error(f"L2 quick verification failed, checking everything with L3: {str(e)}")
+            quick_results, unverified_apps = {}, list(all_applications)
+
+        for app in all_applications:
+            if app.name in quick_results:
+                app.installed = results[app.name] = quick_results[app.name]
+                yield app, app.installed
+
+        # Layer 3: stream remaining applications as they resolve
+        if unverified_apps:
+            l3_start = time.time()
+            async for app, installed in self.batch_checker.iter_check_applications(unverified_apps):
+                app.installed = results[app.name] = installed
+                yield app, installed
+            self.stats["l3_checks"] += len(unverified_apps)
+            self.stats["l3_time"] += time.time() - l3_start
+
+        total_duration = time.time() - start_time
+        self.stats["total_time"] += total_duration
+        self.stats["l2_hit_rate"] = (self.stats["l2_hits"] / self.stats["total_checks"]) * 100 if self.stats["total_checks"] > 0 else 0
+        self.logger.info(f"Streaming check completed in {total_duration:.3f}s")
+
+        # Only a complete pass is written back to the status cache
+        self.status_cache.store(all_applications, results, fingerprint)
+
+    async def check_software_items(self, software_items: List[Union[ApplicationSuite, Application]],
+                                   use_cache: bool = True) -> Dict[str, bool]:
         """Check installation status for mixed software items (suites and standalone applications).
 
+        Results are served from the persistent status cache when the package
+        database fingerprint is unchanged since the last check.
+
         Args:
             software_items: List of software items (mix of ApplicationSuite and Application objects)
+            use_cache: Whether cached results may be used (results are always written back)
 
         Returns:
             Dictionary mapping software item names to installation status
@@ -141,34 +267,15 @@ class TwoLayerPackageChecker:
         self.logger.info(f"Starting software items check for {len(software_items)} items")
         start_time = time.time()
 
-        # Collect all applications that need to be checked
-        all_applications = []
-        item_to_applications = {}  # Map item name to its applications
-
-        for item in software_items:
-            if isinstance(item, ApplicationSuite):
-                # For suites, collect all components
-                item_to_applications[item.name] = item.components
-                all_applications.extend(item.components)
-            else:
-                # For standalone applications
-                item_to_applications[item.name] = [item]
-                all_applications.append(item)
-
-        self.logger.debug(f"Expanded {len(software_items)} software items to {len(all_applications)} applications")
-
-        # Use the existing two-layer checking logic
-        app_results = await self.check_applications(all_applications)
+        # Drain the stream; it updates each application's installed flag
+        async for _app, _installed in self.iter_check_software_items(software_items, use_cache):
+            pass
 
         # Map results back to software items
         item_results = {}
 
         for item in software_items:
             if isinstance(item, ApplicationSuite):
-                # For suites, update component status and determine suite status
-                for component in item.components:
-                    component.installed = app_results.get(component.name, False)
-
                 # Suite is considered installed if any component is installed
                 # This matches the UI display logic for partial/full installation
                 suite_installed = any(component.installed for component in item.components)
@@ -181,11 +288,9 @@ class TwoLayerPackageChecker:
 
             else:
                 # For standalone applications
-                item.installed = app_results.get(item.name, False)
                 item_results[item.name] = item.installed
 
         duration = time.time() - start_time
         self.logger.info(f"Software items check completed in {duration:.3f}s")
 
         return item_results
-
@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import Callable, Dict, List, Optional, Tuple
 
 from ..utils.logger import get_logger
+from ..utils.stream_reader import iter_stream_batches, strip_ansi
 
 logger = get_logger("zsh_manager")
 
@@ -2050,28 +2051,31 @@ source $ZSH/oh-my-zsh.sh
             logger.debug(f"Running command: {cmd_str}")
             progress_callback(f"Executing: {display_cmd}")
 
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
             )
 
             output_lines = []
 
-            # 实时读取输出
-            while True:
-                line = process.stdout.readline()
-                if not line:
-                    break
-                line = line.rstrip()
-                if line:
-                    output_lines.append(line)
-                    progress_callback(line)
+            async def read_output() -> None:
+                # 按块读取输出，同时按 \n 和 \r 拆分（git clone 等命令用 \r 刷新进度）
+                async for batch in iter_stream_batches(process.stdout):
+                    for stream_line in batch:
+                        line = strip_ansi(stream_line.text).rstrip()
+                        if line:
+                            output_lines.append(line)
+                            progress_callback(line)
+                await process.wait()
 
-            # 等待进程完成
-            process.wait(timeout=timeout)
+            try:
+                await asyncio.wait_for(read_output(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.error("Command timed out")
+                process.kill()
+                await process.wait()
+                return {"success": False, "error": "Operation timed out", "output": "\n".join(output_lines)}
 
             output = "\n".join(output_lines)
 
@@ -2088,10 +2092,6 @@ source $ZSH/oh-my-zsh.sh
                     "output": output,
                 }
 
-        except subprocess.TimeoutExpired:
-            logger.error("Command timed out")
-            process.kill()
-            return {"success": False, "error": "Operation timed out", "output": ""}
         except Exception as exc:
             logger.error(f"Command execution failed: {exc}", exc_info=True)
             return {"success": False, "error": str(exc), "output": ""}
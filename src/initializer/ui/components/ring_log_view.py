@@ -0,0 +1,285 @@
+"""Virtualized log view backed by a fixed-capacity ring buffer."""
+
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Iterable, List, Optional, Tuple
+
+from rich.cells import cell_len
+from rich.errors import MarkupError
+from rich.text import Text
+from textual.cache import LRUCache
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+from ...utils.logger import get_ui_logger
+
+
+# Loads older lines: (file line number to stop before, page size) -> lines, oldest first
+HistoryLoader = Callable[[int, int], List[str]]
+
+# A line for the log view: (text, log type) or (text, log type, file line number)
+LogLine = Tuple
+
+
+def read_log_page(path: Path, first_line: int, count: int, anchor: Tuple[int, int] = (0, 0)) -> List[str]:
+    """Read a page of lines from a log file by line number.
+
+    Args:
+        path: Log file
+        first_line: Number of the first line to return (0-based)
+        count: Number of lines to return
+        anchor: (line number, byte offset) of a known line at or before first_line
+
+    Returns:
+        Up to count lines starting at first_line, oldest first
+    """
+    anchor_line, offset = anchor
+    end = first_line + count
+    lines = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        # 从已知行位置向后读取，不必从文件开头扫描
+        for number, raw in enumerate(f, anchor_line):
+            if number >= end:
+                break
+            if number >= first_line:
+                lines.append(raw.decode("utf-8", errors="replace").rstrip("\n"))
+    return lines
+
+
+class RingLogView(ScrollView, can_focus=False):
+    """Log display that keeps a fixed number of lines and renders only visible ones.
+
+    Lines live in a ring buffer; writing a line is an append, and the oldest
+    line is dropped once the capacity is reached. Nothing is mounted per
+    line: the view renders the rows inside the viewport on demand (Line API)
+    and caches the rendered strips, so the cost of a write does not depend
+    on how much output came before. The view follows new output while it is
+    scrolled to the bottom.
+
+    Lines that dropped out of the buffer can be paged back in from the
+    session log file through a history loader. Lines written to that file
+    carry their file line number, so paging continues right before the
+    oldest buffered file line even though the file and the view do not
+    hold the same lines.
+    """
+
+    DEFAULT_CSS = """
+    RingLogView {
+        height: 1fr;
+        background: $surface;
+        scrollbar-size: 1 1;
+    }
+    RingLogView > .ring-log--success {
+        color: $success;
+        text-style: bold;
+    }
+    RingLogView > .ring-log--error {
+        color: $error;
+        text-style: bold;
+    }
+    RingLogView > .ring-log--warning {
+        color: $warning;
+    }
+    RingLogView > .ring-log--info {
+        color: $primary;
+    }
+    RingLogView > .ring-log--history {
+        color: $text-muted;
+    }
+    """
+
+    COMPONENT_CLASSES = {
+        "ring-log--success",
+        "ring-log--error",
+        "ring-log--warning",
+        "ring-log--info",
+        "ring-log--history",
+    }
+
+    def __init__(self, capacity: int = 2000, history_loader: Optional[HistoryLoader] = None,
+                 history_page: int = 500, *, id: Optional[str] = None, classes: Optional[str] = None):
+        """Initialize the log view.
+
+        Args:
+            capacity: Maximum number of lines kept in memory
+            history_loader: Loader for lines older than the buffer (e.g. from the session log file)
+            history_page: Number of lines loaded per history page
+            id: Widget ID
+            classes: Widget CSS classes
+        """
+        super().__init__(id=id, classes=classes)
+        self.capacity = max(1, capacity)
+        self.history_loader = history_loader
+        self.history_page = max(1, history_page)
+        self.logger = get_ui_logger("ring_log_view")
+
+        # (sequence number, text, log type, file line number); sequence numbers identify cached strips
+        self._lines: Deque[Tuple[int, str, str, Optional[int]]] = deque()
+        self._next_sequence = 0
+        self._history: List[str] = []
+        self._history_end: Optional[int] = None  # File line number preceding the loaded history
+        self._history_exhausted = False
+        self._width = 0
+        self._strip_cache: LRUCache[Tuple[int, int], Strip] = LRUCache(1024)
+
+    @property
+    def line_count(self) -> int:
+        """Get the number of lines currently displayed (history included)."""
+        return len(self._history) + len(self._lines)
+
+    @property
+    def dropped_lines(self) -> bool:
+        """Check whether lines have dropped out of the ring buffer."""
+        return self._next_sequence > len(self._lines)
+
+    def write_line(self, text: str, log_type: str = "normal", file_line: Optional[int] = None) -> None:
+        """Append one line.
+
+        Args:
+            text: Line text (Rich markup is rendered)
+            log_type: normal, success, error, warning or info
+            file_line: Line number of the line in the session log file, if it was written there
+        """
+        self.write_lines([(text, log_type, file_line)])
+
+    def write_lines(self, lines: Iterable[LogLine]) -> None:
+        """Append lines, dropping the oldest ones beyond the capacity.
+
+        Args:
+            lines: (text, log type) pairs or (text, log type, file line number) triples
+        """
+        follow = self.is_vertical_scroll_end
+        dropped = 0
+        for text, log_type, *source in lines:
+            if len(self._lines) >= self.capacity:
+                _, old_text, _, _ = self._lines.popleft()
+                if self._history:
+                    # 已加载历史时保持历史与缓冲区首尾相接（行位置不变）
+                    self._history.append(old_text)
+                else:
+                    dropped += 1
+            self._lines.append((self._next_sequence, text, log_type, source[0] if source else None))
+            self._next_sequence += 1
+            self._width = max(self._width, cell_len(text))
+
+        if len(self._history) > self.capacity * 4:
+            # History paged in long ago; release it rather than grow without bound
+            dropped += len(self._history)
+            self._history = []
+            self._history_end = None
+            self._history_exhausted = False
+
+        self.virtual_size = Size(self._width, self.line_count)
+        if follow:
+            self.scroll_end(animate=False, immediate=True, x_axis=False, force=True)
+        else:
+            if dropped:
+                # Keep the rows the user is reading in place
+                self.scroll_to(y=max(0, self.scroll_y - dropped), animate=False, immediate=True, force=True)
+            self.refresh()
+
+    def load_history(self) -> int:
+        """Page in the lines preceding the oldest displayed line.
+
+        Returns:
+            Number of lines loaded
+        """
+        if self.history_loader is None or self._history_exhausted or not self.dropped_lines:
+            return 0
+        end = self._history_end
+        if end is None:
+            # Continue before the oldest buffered line that was written to the file
+            end = next((file_line for _, _, _, file_line in self._lines if file_line is not None), None)
+            if end is None:
+                return 0
+        try:
+            page = self.history_loader(end, self.history_page)
+        except Exception as e:
+            self.logger.warning(f"Failed to load log history: {e}")
+            return 0
+        self._history_end = end - len(page)
+        if len(page) < min(end, self.history_page) or self._history_end <= 0:
+            self._history_exhausted = True
+        if not page:
+            return 0
+
+        self._history[:0] = page
+        self._strip_cache.clear()  # History rows are cached by position
+        self._width = max(self._width, max(cell_len(line) for line in page))
+        self.virtual_size = Size(self._width, self.line_count)
+        self.scroll_to(y=self.scroll_y + len(page), animate=False, immediate=True, force=True)
+        self.refresh()
+        return len(page)
+
+    def clear(self) -> None:
+        """Remove all lines."""
+        self._lines.clear()
+        self._history = []
+        self._history_end = None
+        self._history_exhausted = False
+        self._strip_cache.clear()
+        self._width = 0
+        self.virtual_size = Size(0, 0)
+        self.refresh()
+
+    def scroll_up(self, *args, **kwargs) -> None:
+        """Scroll up, paging in history when already at the top."""
+        if self.scroll_y <= 0 and self.load_history():
+            return
+        super().scroll_up(*args, **kwargs)
+
+    def scroll_page_up(self, *args, **kwargs) -> None:
+        """Scroll up a page, paging in history when already at the top."""
+        if self.scroll_y <= 0 and self.load_history():
+            return
+        super().scroll_page_up(*args, **kwargs)
+
+    def notify_style_update(self) -> None:
+        """Drop cached strips when the theme or styles change."""
+        super().notify_style_update()
+        self._strip_cache.clear()
+
+    def render_line(self, y: int) -> Strip:
+        """Render one row of the viewport."""
+        scroll_x, scroll_y = self.scroll_offset
+        index = scroll_y + y
+        width = self.size.width
+        rich_style = self.rich_style
+        if index >= self.line_count:
+            return Strip.blank(width, rich_style)
+
+        strip = self._get_strip(index)
+        return strip.crop_extend(scroll_x, scroll_x + width, rich_style).apply_offsets(scroll_x, index)
+
+    def _get_strip(self, index: int) -> Strip:
+        """Get the uncropped strip for a line, rendering it on first use."""
+        history_count = len(self._history)
+        if index < history_count:
+            key = (-1, index)
+            text, log_type = self._history[index], "history"
+        else:
+            sequence, text, log_type, _ = self._lines[index - history_count]
+            key = (sequence, 0)
+
+        strip = self._strip_cache.get(key)
+        if strip is None:
+            line_text = self._to_text(text)
+            line_text.stylize_before(self.rich_style)
+            if log_type in ("success", "error", "warning", "info", "history"):
+                line_text.stylize(self.get_component_rich_style(f"ring-log--{log_type}"))
+            strip = Strip(line_text.render(self.app.console), line_text.cell_len)
+            self._strip_cache[key] = strip
+        return strip
+
+    @staticmethod
+    def _to_text(text: str) -> Text:
+        """Convert a line to Rich text, falling back to plain text for invalid markup."""
+        try:
+            line_text = Text.from_markup(text)
+        except MarkupError:
+            line_text = Text(text)
+        line_text.no_wrap = True
+        line_text.end = ""
+        return line_text
@@ -1,5 +1,6 @@
 """Application Installation Confirmation."""
 
+from rich.markup import escape
 from textual import on, work
 from textual.app import ComposeResult
 from textual.containers import Container, ScrollableContainer
@@ -94,11 +95,13 @@ class AppInstallConfirm(ModalScreen):
     }
     """
     
-    def __init__(self, actions: List[Dict], callback: Callable[[bool, Optional[SudoManager]], None], app_installer):
+    def __init__(self, actions: List[Dict], callback: Callable[[bool, Optional[SudoManager]], None], app_installer,
+                 notes: Optional[List[str]] = None):
         super().__init__()
         self.actions = actions
         self.callback = callback
         self.app_installer = app_installer
+        self.notes = notes or []  # Tasks of a resumed session that are not run again
 
         # 初始化logger和sudo管理器
         self.logger = get_module_logger("app_install_confirmation_modal")
@@ -146,6 +149,12 @@ class AppInstallConfirm(ModalScreen):
             yield Rule()
 
             with ScrollableContainer(id="confirmation-content"):
+                if self.notes:
+                    yield Label("Not Run Again from the Interrupted Session:", classes="action-header")
+                    yield Static("─" * 50, classes="section-separator")
+                    for note in self.notes:
+                        yield Static(f"  • {escape(note)}", classes="app-description")
+
                 # Group actions by type
                 install_actions = [a for a in self.actions if a["action"] == "install"]
                 uninstall_actions = [a for a in self.actions if a["action"] == "uninstall"]
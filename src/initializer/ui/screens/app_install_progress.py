@@ -2,17 +2,32 @@
 
 from textual import on, work
 from textual.app import ComposeResult
-from textual.containers import Container, Vertical, ScrollableContainer
+from textual.containers import Container
 from textual.screen import ModalScreen
-from textual.widgets import Static, Rule, Label
+from textual.widgets import Static, Rule, Label, ProgressBar
 from textual.reactive import reactive
 from textual.events import Key
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Set, Tuple
+from contextvars import ContextVar
 import asyncio
 import signal
+import threading
 from datetime import datetime
 from ...utils.log_manager import LogLevel
+from ...utils.log_writer import BufferedLogWriter, has_line_prefix
+from ...utils.stream_reader import iter_stream_batches, strip_ansi
+from ..components.ring_log_view import RingLogView, read_log_page
 from ...modules.sudo_manager import SudoManager
+from ...modules.privileged_helper import helper_command
+from ...modules.install_journal import InstallJournal
+from ...modules.install_progress import InstallProgressParser
+from ...modules.install_transaction import InstallTransaction, InstallTransactionPlanner, action_applications
+from ...modules.task_scheduler import PACKAGE_MANAGER_LOCK, TaskScheduler, classify_command_resources
+from ...modules.package_prefetch import PackagePrefetcher
+
+
+# Indexes of the tasks whose commands the current asyncio task runs (for exit code tracking)
+_CURRENT_TASKS: ContextVar[Tuple[int, ...]] = ContextVar("install_current_tasks", default=())
 
 
 class LogCategory:
@@ -23,6 +38,11 @@ class LogCategory:
     USER = "● USER"
     ERROR = "✗ ERR"
 
+    @classmethod
+    def in_line(cls, line: str) -> bool:
+        """Check whether a line already carries a category prefix."""
+        return any(prefix in line for prefix in (cls.CONTROL, cls.APT, cls.PROCESS, cls.USER, cls.ERROR))
+
 
 class AppInstallProgress(ModalScreen):
     """Screen for showing application installation/uninstallation progress."""
@@ -60,43 +80,21 @@ class AppInstallProgress(ModalScreen):
     #log-container {
         height: 1fr;
         border: round $primary;
-        padding: 0;
+        padding: 1;
         margin: 0 0 1 0;
         background: $surface;
-        overflow-y: auto;
         scrollbar-size: 1 1;
     }
 
-    #log-output {
-        height: auto;
-        min-height: 1;
-        background: $surface;
-        padding: 1;
-    }
-
-    .log-line {
-        height: auto;
-        min-height: 1;
-        color: $text;
-        background: transparent;
-    }
-
-    .log-line-success {
-        color: $success;
-        text-style: bold;
-    }
-
-    .log-line-error {
-        color: $error;
-        text-style: bold;
-    }
-
-    .log-line-warning {
-        color: $warning;
+    #install-progress {
+        height: 1;
+        margin: 0 0 0 0;
     }
 
-    .log-line-info {
-        color: $primary;
+    #progress-detail {
+        height: 1;
+        color: $text-muted;
+        margin: 0 0 1 0;
     }
 
     .section-divider {
@@ -151,6 +149,14 @@ class AppInstallProgress(ModalScreen):
 
     # Process tracking for cleanup
     _active_processes = []  # Track all active subprocesses
+    OUTPUT_TAIL_LINES = 500  # Output lines kept per command for error summaries
+    LOG_FLUSH_INTERVAL = 1 / 30  # Seconds between log view updates from worker threads
+    LOG_PENDING_LIMIT = 5000  # Queued log lines before workers wait for the UI
+    _prefetcher: Optional[PackagePrefetcher] = None  # Background package downloads
+    _log_writer: Optional[BufferedLogWriter] = None  # Session log file writer
+    _journal: Optional[InstallJournal] = None  # Write-ahead journal for --resume
+    _post_install_ready: Set[str] = set()  # Installed applications whose post-install may run
+    _pending_post_installs: Dict[int, int] = {}  # Task index -> post-install nodes not finished yet
     _is_aborting = False  # Flag to indicate user requested abort
     _is_paused = False  # Flag to indicate processes are paused
     
@@ -166,8 +172,21 @@ class AppInstallProgress(ModalScreen):
             self.sudo_manager = sudo_manager  # Optional sudo manager
             self._main_menu_ref = main_menu_ref  # Reference to main menu for refreshing
 
-            # Add log lines tracking like APT modal
-            self.log_lines = []
+            # Log lines queued by worker threads, written to the log view in batches
+            self._pending_log_lines: List[tuple] = []
+            self._pending_log_lock = threading.Lock()
+
+            # Cleared while paused; output readers wait on it instead of polling
+            self._resume_event = threading.Event()
+            self._resume_event.set()
+
+            # Latest package manager status, shown by the log flush timer
+            self._progress_detail = ""
+            self._progress_dirty = False
+
+            # Applications and packages this session operated on (reported on dismiss)
+            self.touched_applications: Set[str] = set()
+            self.touched_packages: Set[str] = set()
 
             # Initialize independent log file system
             self._init_independent_log_system()
@@ -227,8 +246,9 @@ class AppInstallProgress(ModalScreen):
         # Remove any existing emoji prefixes that might confuse categorization
         clean_message = message
 
-        # Route through our categorization system instead of directly to add_log_line_safe
-        self._append_log(None, clean_message)
+        # Route through our categorization system instead of directly to add_log_line_safe;
+        # the installer's log manager writes its own records to the session log file
+        self._append_log(None, clean_message, write_file=False)
 
     def _init_independent_log_system(self) -> None:
         """Initialize the independent log file system for app progress."""
@@ -250,6 +270,10 @@ class AppInstallProgress(ModalScreen):
             # Generate filename without app names (cleaner approach)
             log_filename = f"app_install_{package_manager}_{timestamp}.log"
             self.progress_log_file = self.progress_logs_dir / log_filename
+            self._log_writer = BufferedLogWriter(
+                self.progress_log_file,
+                is_prefixed=lambda line: LogCategory.in_line(line) or has_line_prefix(line),
+            )
 
             # Initialize log file with header
             self._write_to_log_file(f"=== App Installation Progress Log ===")
@@ -262,147 +286,124 @@ class AppInstallProgress(ModalScreen):
         except Exception as e:
             print(f"WARNING: Failed to initialize independent log system: {e}")
             self.progress_log_file = None
+            self._log_writer = None
 
-    def _write_to_log_file(self, message: str) -> None:
-        """Write a message to the independent log file.
+    def _write_to_log_file(self, message: str) -> Optional[int]:
+        """Queue a message for the independent log file.
 
         Args:
             message: Message to write to the log file
-        """
-        try:
-            if self.progress_log_file:
-                from datetime import datetime
-                import re
-
-                # Only convert \r to \n for specific apt progress patterns
-                if 'Reading database' in message and '\r' in message:
-                    # This is apt progress with carriage returns, convert to separate lines
-                    clean_message = message.replace('\r', '\n')
-                else:
-                    # For other content, just remove \r but keep content
-                    clean_message = message.replace('\r', '')
-
-                # Remove ANSI escape sequences
-                clean_message = re.sub(r'\x1b\[[0-9;]*m', '', clean_message)
-                clean_message = re.sub(r'\x1b\[[0-9;]*[A-Za-z]', '', clean_message)
-
-                timestamp = datetime.now().strftime("%H:%M:%S")
 
-                # Handle potential multiple lines
-                lines = clean_message.split('\n') if '\n' in clean_message else [clean_message]
-
-                with open(self.progress_log_file, 'a', encoding='utf-8') as f:
-                    for line in lines:
-                        # Don't strip to preserve indentation, but check if line is empty
-                        if not line.strip():  # Skip completely empty lines
-                            continue
-
-                        # Check if line already has category prefix or timestamp
-                        has_category_prefix = any(prefix in line for prefix in [
-                            LogCategory.CONTROL, LogCategory.APT, LogCategory.PROCESS,
-                            LogCategory.USER, LogCategory.ERROR
-                        ])
-
-                        # Don't add timestamp if line already has category prefix, timestamp, or is separator
-                        if has_category_prefix or line.strip().startswith("[") or line.strip().startswith("="):
-                            log_entry = line
-                        else:
-                            log_entry = f"[{timestamp}] {line}"
-                        f.write(log_entry + "\n")
-                    f.flush()  # Ensure immediate writing
-        except Exception as e:
-            print(f"Failed to write to log file: {e}")
+        Returns:
+            File line number of the message's first line, or None if it is not written
+        """
+        if self._log_writer is not None:
+            return self._log_writer.write(message)
+        return None
 
-    def add_log_line(self, message: str, log_type: str = "normal") -> None:
-        """Add a line to the log display using Static components.
+    def add_log_line(self, message: str, log_type: str = "normal", file_line: Optional[int] = None) -> None:
+        """Add a line to the log view.
 
         Args:
             message: The message to display
             log_type: Type of log line (normal, success, error, warning, info)
+            file_line: Line number of the message in the session log file, if it was written there
         """
         try:
-            from datetime import datetime
+            log_view = self.query_one("#log-container", RingLogView)
+            log_view.write_lines(self._format_log_lines(message, log_type, file_line))
+        except Exception as e:
+            # Fallback: print to console if UI update fails
+            print(f"Failed to add log line: {e}")
+            # Try to continue without crashing
 
-            # Preserve original message format (don't strip indentation/prefixes)
-            original_message = message
+    def _format_log_lines(self, message: str, log_type: str, file_line: Optional[int] = None) -> List[tuple]:
+        """Split a message into timestamped (line, log type, file line number) triples for the log view."""
+        # Only split by newlines for Reading database progress
+        if 'Reading database' in message and '\n' in message:
+            message_lines = message.split('\n')
+        else:
+            message_lines = [message]
 
-            # Only split by newlines for Reading database progress
-            if 'Reading database' in original_message and '\n' in original_message:
-                message_lines = original_message.split('\n')
-            else:
-                message_lines = [original_message]
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        formatted = []
+        for line in message_lines:
+            if not line:  # Skip empty lines
+                continue
+
+            # Add timestamp only if line doesn't have category prefix, timestamp, or special formatting
+            if not LogCategory.in_line(line) and not line.startswith('[') and not line.startswith('='):
+                line = f"[{timestamp}] {line}"
+            formatted.append((line, log_type, file_line))
+        return formatted
+
+    def _flush_log_lines(self) -> None:
+        """Write the lines queued by worker threads to the log view (main thread)."""
+        self._render_progress()
+        with self._pending_log_lock:
+            pending, self._pending_log_lines = self._pending_log_lines, []
+        if not pending:
+            return
+        try:
+            log_view = self.query_one("#log-container", RingLogView)
+            log_view.write_lines(line for item in pending for line in self._format_log_lines(*item))
+        except Exception as e:
+            print(f"Failed to add log lines: {e}")
 
-            for line in message_lines:
-                if not line:  # Skip empty lines
-                    continue
+    def _render_progress(self) -> None:
+        """Show the overall task progress and the latest package manager status (main thread)."""
+        try:
+            overall = sum(task["progress"] for task in self.tasks) / len(self.tasks) if self.tasks else 100
+            progress_bar = self.query_one("#install-progress", ProgressBar)
+            if progress_bar.progress != overall:
+                progress_bar.update(progress=overall)
+            if self._progress_dirty:
+                self._progress_dirty = False
+                self.query_one("#progress-detail", Static).update(self._progress_detail)
+        except Exception as e:
+            print(f"Failed to update progress: {e}")
 
-                # Check if line already has category prefix or timestamp
-                has_category_prefix = any(prefix in line for prefix in [
-                    LogCategory.CONTROL, LogCategory.APT, LogCategory.PROCESS,
-                    LogCategory.USER, LogCategory.ERROR
-                ])
+    def _checkpoint_log(self) -> None:
+        """Flush and fsync the session log file (task boundaries and session end)."""
+        if self._log_writer is not None:
+            self._log_writer.checkpoint()
 
-                # Add timestamp only if line doesn't have category prefix, timestamp, or special formatting
-                if not has_category_prefix and not line.startswith('[') and not line.startswith('='):
-                    timestamp = datetime.now().strftime("%H:%M:%S")
-                    log_line = f"[{timestamp}] {line}"
-                else:
-                    log_line = line
-
-                # Track log lines for memory management
-                self.log_lines.append(log_line)
-
-                # Determine CSS class based on log type
-                css_class = "log-line"
-                if log_type == "success":
-                    css_class = "log-line-success"
-                elif log_type == "error":
-                    css_class = "log-line-error"
-                elif log_type == "warning":
-                    css_class = "log-line-warning"
-                elif log_type == "info":
-                    css_class = "log-line-info"
-
-                # Add to log output container
-                log_container = self.query_one("#log-output", Vertical)
-                log_container.mount(Static(log_line, classes=css_class))
-
-            # Keep only last 100 lines to prevent memory issues
-            if len(self.log_lines) > 100:
-                self.log_lines = self.log_lines[-100:]
-                # Remove old log widgets
-                log_widgets = log_container.children
-                if len(log_widgets) > 100:
-                    log_widgets[0].remove()
-
-            # Auto-scroll to bottom
-            content_area = self.query_one("#log-container", ScrollableContainer)
-            content_area.scroll_end(animate=False)
+    def _load_log_history(self, end: int, count: int) -> List[str]:
+        """Read the session log file lines preceding file line end for the log view."""
+        if not self.progress_log_file or self._log_writer is None:
+            return []
+        self._log_writer.flush()
+        first_line = max(0, end - count)
+        return read_log_page(self.progress_log_file, first_line, end - first_line,
+                             self._log_writer.line_position(first_line))
 
-        except Exception as e:
-            # Fallback: print to console if UI update fails
-            print(f"Failed to add log line: {e}")
-            # Try to continue without crashing
+    def add_log_line_safe(self, message: str, log_type: str = "normal", write_file: bool = True) -> None:
+        """Thread-safe wrapper for add_log_line that also writes to independent log file.
 
-    def add_log_line_safe(self, message: str, log_type: str = "normal") -> None:
-        """Thread-safe wrapper for add_log_line that also writes to independent log file."""
-        try:
-            # Preserve original message format (don't strip indentation/prefixes)
-            original_message = message
+        Worker threads only queue the line; the queue is written to the log
+        view in batches once per frame. When the UI falls behind and the
+        queue fills up, the worker waits for a flush (backpressure).
 
-            # Always write original message to independent log file first (thread-safe)
-            self._write_to_log_file(original_message)
+        Args:
+            message: The message to display
+            log_type: Type of log line (normal, success, error, warning, info)
+            write_file: Also write the message to the independent log file
+        """
+        try:
+            # Write original message to independent log file first (queued, thread-safe)
+            file_line = self._write_to_log_file(message) if write_file else None
 
-            # Check if we're in the main thread for UI update
-            import threading
             if threading.current_thread() is threading.main_thread():
-                # We're in the main thread, call directly
-                self.add_log_line(original_message, log_type)
-            else:
-                # We're in a worker thread, use call_from_thread
-                def safe_add():
-                    self.add_log_line(original_message, log_type)
-                self.app.call_from_thread(safe_add)
+                # We're in the main thread; keep ordering with queued lines
+                self._flush_log_lines()
+                self.add_log_line(message, log_type, file_line)
+                return
+
+            with self._pending_log_lock:
+                self._pending_log_lines.append((message, log_type, file_line))
+                backlog = len(self._pending_log_lines)
+            if backlog >= self.LOG_PENDING_LIMIT:
+                self.app.call_from_thread(self._flush_log_lines)
         except Exception as e:
             # Fallback: print to console and try to log to file
             print(f"Failed to add log line (safe): {message} - {e}")
@@ -411,12 +412,13 @@ class AppInstallProgress(ModalScreen):
             except:
                 pass
 
-    def _append_log(self, log_widget, message: str) -> None:
+    def _append_log(self, log_widget, message: str, write_file: bool = True) -> None:
         """Auto-categorize and format log messages with appropriate prefixes.
 
         Args:
             log_widget: Unused (kept for compatibility)
             message: Message with potential Rich markup or raw content
+            write_file: Also write the message to the independent log file
         """
         import re
 
@@ -426,7 +428,7 @@ class AppInstallProgress(ModalScreen):
         # Skip empty messages to avoid creating empty prefix lines
         if not original_message.strip():
             # For empty messages, just add a blank line without prefix
-            self.add_log_line_safe("")
+            self.add_log_line_safe("", write_file=write_file)
             return
 
         # Check if message already has a category prefix (check original message directly)
@@ -435,7 +437,7 @@ class AppInstallProgress(ModalScreen):
             LogCategory.USER, LogCategory.ERROR
         ]):
             # Message already has a category prefix, use it as-is (preserve the prefix)
-            self.add_log_line_safe(original_message)
+            self.add_log_line_safe(original_message, write_file=write_file)
             return
 
         # For auto-categorization, remove Rich markup for analysis only
@@ -470,10 +472,12 @@ class AppInstallProgress(ModalScreen):
             # Default to process category for other messages
             formatted_message = f"  {LogCategory.PROCESS} {clean_for_analysis}"
 
-        self.add_log_line_safe(formatted_message)
+        self.add_log_line_safe(formatted_message, write_file=write_file)
 
     def on_mount(self) -> None:
         """Initialize the screen and start processing."""
+        self.add_log_line("Starting installation process...")
+        self.set_interval(self.LOG_FLUSH_INTERVAL, self._flush_log_lines)
         self._start_processing()
     
     def can_focus(self) -> bool:
@@ -523,13 +527,20 @@ class AppInstallProgress(ModalScreen):
 
                 yield Rule(classes="section-divider")
 
+                # Overall progress and the current package manager step
+                yield ProgressBar(total=100, show_eta=False, id="install-progress")
+                yield Static("", id="progress-detail", markup=False)
+
                 # Installation log area
                 print("DEBUG: Creating log output")
                 yield Label("📋 Installation Logs:", classes="info-key")
-                with ScrollableContainer(id="log-container"):
-                    with Vertical(id="log-output"):
-                        # Add an initial log line to ensure container works
-                        yield Static("Starting installation process...", classes="log-line")
+                log_view_config = self.app_installer.app_config.get("log_view", {})
+                yield RingLogView(
+                    capacity=log_view_config.get("retention_lines", 2000),
+                    history_loader=self._load_log_history,
+                    history_page=log_view_config.get("history_page_lines", 500),
+                    id="log-container",
+                )
 
                 print("DEBUG: Log output created")
 
@@ -552,8 +563,12 @@ class AppInstallProgress(ModalScreen):
         """Process all installation/uninstallation tasks."""
         # Set up log UI callback to connect app installer logs to UI
         self.app_installer.set_log_ui_callback(self.categorized_log_callback)
+        self.app_installer.set_log_writer(self._log_writer)
+        # Machine-readable apt download/configure progress on stdout
+        self.app_installer.set_apt_status_fd(True)
 
         # Start logging session (simplified)
+        session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         try:
             session_id = self.app_installer.start_logging_session()
             self.app_installer.set_total_applications(len(self.tasks))
@@ -577,6 +592,12 @@ class AppInstallProgress(ModalScreen):
         except Exception as e:
             self._log_error(f"⚠️ Log initialization failed: {e}")
 
+        # 写前日志：记录计划与每个任务的状态变化，终端断开后可用 --resume 继续
+        self._journal = InstallJournal(self.app_installer.state_dir)
+        self._journal.begin(session_id, [
+            InstallJournal.describe_action(i, task["name"], task["action"]) for i, task in enumerate(self.tasks)
+        ])
+
         # Initial permission check for sudo commands
         has_sudo_commands = any(
             self._command_needs_sudo(task) for task in self.tasks
@@ -601,10 +622,11 @@ class AppInstallProgress(ModalScreen):
                     for task in self.tasks:
                         task["status"] = "failed"
                         task["message"] = "Sudo permissions unavailable"
-                        self._update_task_display(self.tasks.index(task))
+                        self._record_task_state(self.tasks.index(task))
 
                     self.all_completed = True
                     self._enable_close_button()
+                    self._finish_journal()
                     return
                 else:
                     self._append_log(None,"[green]✅ Sudo permissions verified[/green]")
@@ -615,17 +637,18 @@ class AppInstallProgress(ModalScreen):
                 for task in self.tasks:
                     task["status"] = "failed"
                     task["message"] = "Sudo permission manager not initialized"
-                    self._update_task_display(self.tasks.index(task))
+                    self._record_task_state(self.tasks.index(task))
 
                 self.all_completed = True
                 self._enable_close_button()
+                self._finish_journal()
                 return
 
-        # Check if APT update is needed and execute it once for the session
+        # Check if the APT package lists are stale (age, source changes) and refresh them
         if self.app_installer.needs_apt_update():
             timestamp = datetime.now().strftime("%H:%M:%S")
             self._append_log(None, f"[{timestamp}] Checking if APT update is needed...")
-            self._append_log(None, "[blue]📦 APT update required for current session[/blue]")
+            self._append_log(None, f"[blue]📦 APT update required: {self.app_installer.apt_update_decision.reason}[/blue]")
 
             apt_update_command = self.app_installer.get_apt_update_command()
             if apt_update_command:
@@ -638,7 +661,7 @@ class AppInstallProgress(ModalScreen):
                     if success:
                         self.app_installer.mark_apt_update_executed()
                         self._append_log(None, "[green]✅ APT update completed successfully[/green]")
-                        self._append_log(None, "[dim]  Package list updated for current session[/dim]")
+                        self._append_log(None, "[dim]  Package lists updated[/dim]")
                     else:
                         self._append_log(None, f"[yellow]⚠️ APT update failed: {output}[/yellow]")
                         self._append_log(None, "[yellow]  Continuing with installation, but packages may be outdated[/yellow]")
@@ -650,341 +673,435 @@ class AppInstallProgress(ModalScreen):
 
                 self._append_log(None, "")  # Add blank line for readability
         else:
-            if self.app_installer.package_manager in ["apt", "apt-get"]:
-                self._append_log(None, "[dim]📦 APT update already executed in current session, skipping[/dim]")
+            if self.app_installer.apt_update_decision is not None:
+                self._append_log(None, f"[dim]📦 APT update skipped: {self.app_installer.apt_update_decision.reason}[/dim]")
                 self._append_log(None, "")  # Add blank line for readability
 
-        for i, task in enumerate(self.tasks):
-            # Check if user requested abort before starting each task
-            if self._is_aborting:
-                # Mark all remaining tasks as aborted
-                for remaining_task in self.tasks[i:]:
-                    if remaining_task["status"] in ["pending", "running"]:
-                        remaining_task["status"] = "failed"
-                        remaining_task["message"] = "User aborted"
-                        remaining_task["progress"] = 0
-                        self._update_task_display(self.tasks.index(remaining_task))
-                break
+        # 合并事务：所有可合并的安装（及卸载）动作各执行一次包管理器调用
+        transactions = InstallTransactionPlanner(self.app_installer).plan(self.actions)
+        await self._start_prefetch(transactions)
 
-            self.current_task_index = i
+        scheduler = self._build_task_graph(transactions)
+        try:
+            await scheduler.run(should_stop=lambda: self._is_aborting)
+        except ValueError as e:
+            # 依赖声明有环：无法安全排序，全部任务标记为失败
+            self._log_error(f"❌ Cannot schedule tasks: {e}")
+            for index, task in enumerate(self.tasks):
+                if task["status"] == "pending":
+                    task["status"] = "failed"
+                    task["message"] = str(e)
+                    self._record_task_state(index)
 
-            # Update task status
-            task["status"] = "running"
-            self._update_task_display(i)
+        if self._is_aborting:
+            # Mark all remaining tasks as aborted
+            for index, remaining_task in enumerate(self.tasks):
+                if remaining_task["status"] in ["pending", "running"]:
+                    remaining_task["status"] = "failed"
+                    remaining_task["message"] = "User aborted"
+                    remaining_task["progress"] = 0
+                    self._record_task_state(index)
 
-            # Log start with categorized logging and task progress indicator
-            task_progress_marker = f"[Task {i+1}/{len(self.tasks)}]"
-            self._log_control(f"")
-            self._log_control(f"{'=' * 60}")
-            self._log_control(f"{task_progress_marker} 🚀 Starting: {task['name']}")
-            self._log_control(f"{'=' * 60}")
+        await self._finish_prefetch()
 
-            # Get the action and application
-            action = task["action"]
-            app = action["application"]
+        # All tasks completed
+        self.all_completed = True
+        self._enable_close_button()
+        self._finish_journal(aborted=self._is_aborting)
 
-            # Simulate progress updates
-            task["progress"] = 20
-            self._update_progress(i, task["progress"])
+        # Log completion
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        successful = sum(1 for t in self.tasks if t["status"] == "success")
+        failed = sum(1 for t in self.tasks if t["status"] == "failed")
 
-            try:
-                if action["action"] == "install":
-                    # 检查是否为批量安装（中文注释：批量安装是新功能，优先检查）
-                    is_batch = action.get('is_batch', False)
+        self._append_log(None,"")
+        self._log_control(f"📊 Installation completed: {successful} successful, {failed} failed")
 
-                    if is_batch:
-                        # 批量安装路径（中文注释：Suite 级别批量安装）
-                        packages = action.get('packages', [])
-                        suite = action['application']  # ApplicationSuite 对象
-                        components = action.get('components', [])
+        if failed == 0:
+            self._log_control("🎉 All tasks completed successfully!")
+        else:
+            self._log_error("⚠️ Some tasks failed, please check logs for details.")
 
-                        # 显示批量安装标题（中文注释：使用分隔线和格式化标题提升可读性）
-                        self._append_log(None, "")
-                        self._log_control(f"[bold blue]═══ Batch Installation ═══[/bold blue]")
-                        self._log_control(f"[bold]{suite.name}[/bold]")
-                        self._log_control(f"[dim]Mode: Batch (all packages in one command)[/dim]")
-                        self._log_control(f"[dim]Packages: {len(packages)} items[/dim]")
-                        self._append_log(None, "")
+        # End logging session
+        try:
+            self.app_installer.log_installation_event(
+                LogLevel.INFO,
+                f"Installation session ended - Success: {successful}, Failed: {failed}",
+                action="session_end"
+            )
 
-                        # 显示包列表（中文注释：使用编号列表便于阅读）
-                        self._log_control(f"[bold]Package list:[/bold]")
-                        for idx, pkg in enumerate(packages, 1):
-                            self._log_control(f"  {idx}. {pkg}")
-                        self._append_log(None, "")
+            # End logging session
+            self.app_installer.end_logging_session()
+            self._checkpoint_log()
 
-                        # 生成批量安装命令
-                        command = self.app_installer.get_batch_install_command(packages)
-                        if not command:
-                            task["status"] = "failed"
-                            task["message"] = "Failed to generate batch install command"
-                            self._log_error(f"❌ Failed to generate batch install command")
-                            continue
+        except Exception as e:
+            self._append_log(None,f"[yellow]⚠️ Log session end failed: {e}[/yellow]")
+    
+    def _build_task_graph(self, transactions: List[InstallTransaction]) -> TaskScheduler:
+        """Build the session's task graph.
 
-                        self._log_control(f"[dim]Command: {command}[/dim]")
-                        self._append_log(None, "")
+        Combined transactions and per-task package manager commands share
+        the package manager lock, so they keep their order and never overlap.
+        Post-install commands are separate nodes that depend on their task
+        and take the locks of the tools they run, so they can overlap with
+        later package manager runs. Applications' declared depends_on entries
+        make a task wait until the dependency's task and post-install finished.
 
-                        # 执行批量安装（中文注释：进度 40-70%）
-                        task["progress"] = 40
-                        self._update_progress(i, 40)
+        Args:
+            transactions: Planned combined transactions
 
-                        def update_batch_progress(percentage):
-                            task_progress = 40 + int((percentage / 100) * 30)
-                            task["progress"] = min(task_progress, 70)
-                            self._update_progress(i, task["progress"])
+        Returns:
+            Scheduler holding the graph
+        """
+        max_parallel = self.app_installer.app_config.get("scheduler", {}).get("max_parallel", 2)
+        scheduler = TaskScheduler(max_parallel)
+        self._post_install_ready = set()
+        self._pending_post_installs = {}
+
+        covered = {}
+        for transaction in transactions:
+            key = f"transaction:{transaction.action}"
+            scheduler.add(key, lambda t=transaction: self._run_transaction_node(t), [PACKAGE_MANAGER_LOCK])
+            for index in transaction.action_indexes:
+                covered[index] = key
+
+        # 每个应用对应的节点（任务节点及其安装后配置节点），用于解析声明的依赖
+        app_nodes: Dict[str, List[str]] = {}
+        post_installs: Dict[int, List] = {}
+        for i, task in enumerate(self.tasks):
+            applications = action_applications(task["action"])
+            post_installs[i] = [app for app in applications if app.post_install] if task["action"]["action"] == "install" else []
+            self._pending_post_installs[i] = len(post_installs[i])
+            for app in applications:
+                app_nodes.setdefault(app.name, []).append(f"task:{i}")
+            for app in post_installs[i]:
+                app_nodes[app.name].append(f"post:{i}:{app.name}")
 
-                        success, output = await self._execute_command_with_sudo_support(
-                            command, "log_widget", update_batch_progress
-                        )
+        for i, task in enumerate(self.tasks):
+            task_key = f"task:{i}"
+            own_keys = {task_key} | {f"post:{i}:{app.name}" for app in post_installs[i]}
+            depends_on = [covered[i]] if i in covered else []
+            for app in action_applications(task["action"]):
+                for dependency in app.depends_on:
+                    depends_on.extend(key for key in app_nodes.get(dependency, []) if key not in own_keys)
+
+            scheduler.add(task_key, lambda i=i: self._run_task_node(i), [PACKAGE_MANAGER_LOCK], depends_on,
+                          on_skip=lambda failed, i=i: self._on_task_skipped(i, failed))
+            for app in post_installs[i]:
+                scheduler.add(f"post:{i}:{app.name}", lambda i=i, app=app: self._run_post_install_node(i, app),
+                              classify_command_resources(app.post_install), [task_key])
+
+        return scheduler
+
+    async def _run_transaction_node(self, transaction: InstallTransaction) -> bool:
+        """Graph node for a combined transaction (a failure falls back to the task nodes)."""
+        _CURRENT_TASKS.set(tuple(transaction.action_indexes))
+        if not self._is_aborting:
+            await self._run_transaction(transaction)
+            self._checkpoint_log()
+        return True
 
-                        if success:
-                            # 批量安装成功（中文注释：更新所有组件的安装状态）
-                            task["progress"] = 70
-                            self._update_progress(i, 70)
+    async def _run_task_node(self, i: int) -> bool:
+        """Graph node for one task; succeeds when the task's package manager command did."""
+        _CURRENT_TASKS.set((i,))
+        task = self.tasks[i]
+        if self._is_aborting:
+            return False
+        # Already completed by a combined transaction
+        if task["status"] == "pending":
+            await self._process_task(i, task)
+            self._checkpoint_log()
+        return task["status"] in ("success", "running")
+
+    async def _run_post_install_node(self, i: int, app) -> bool:
+        """Graph node running an application's post-install command, then completing its task."""
+        _CURRENT_TASKS.set((i,))
+        task = self.tasks[i]
+        try:
+            if app.name in self._post_install_ready and not self._is_aborting:
+                self._log_control(f"[Task {i+1}/{len(self.tasks)}] ⚙️ Post-install configuration for {app.name}: {app.post_install}")
+
+                def update_postinstall_progress(percentage):
+                    task_progress = 70 + int((percentage / 100) * 30)
+                    task["progress"] = max(task["progress"], min(task_progress, 100))
+                    self._update_progress(i, task["progress"])
+
+                post_success, post_output = await self._execute_command_with_sudo_support(
+                    app.post_install, "log_widget", update_postinstall_progress
+                )
+                if not post_success:
+                    self._log_error(f"⚠️ Post-install configuration failed for {app.name}: {post_output}")
+        finally:
+            self._pending_post_installs[i] -= 1
+            if self._pending_post_installs[i] == 0 and task["status"] == "running":
+                task["status"] = "success"
+                task["progress"] = 100
+                self._record_task_state(i)
+                self._update_progress(i, 100)
+                self._log_control(f"[green]✅ [Task {i+1}/{len(self.tasks)}] {task['name']} completed[/green]")
+            self._checkpoint_log()
+        return True
 
-                            for component in components:
-                                if self.app_installer.save_installation_status(component.name, True):
-                                    self._log_process(f"📝 Saved installation status for {component.name}")
+    def _on_task_skipped(self, i: int, failed_key: str) -> None:
+        """Mark a task failed because a task it depends on did not complete."""
+        task = self.tasks[i]
+        if failed_key.startswith(("task:", "post:")):
+            dependency = self.tasks[int(failed_key.split(":")[1])]["name"]
+        else:
+            dependency = failed_key
+        task["status"] = "failed"
+        task["message"] = f"Dependency did not complete: {dependency}"
+        self._log_error(f"⏭️ Skipping {task['name']}: dependency did not complete ({dependency})")
+        self._record_task_state(i)
 
-                            task["status"] = "success"
-                            task["progress"] = 100
-                            self._append_log(None, "")
-                            self._log_control(f"[green]✅ [Task {i+1}/{len(self.tasks)}] Batch installation completed successfully[/green]")
-                            self._log_control(f"[dim]  All {len(packages)} packages installed for '{suite.name}'[/dim]")
-                            self._log_control(f"{'─' * 60}")
+    async def _process_task(self, i: int, task: Dict[str, Any]) -> None:
+        """Run the package manager command of one task and record its outcome.
 
-                            # 记录批量安装成功日志
-                            self.app_installer.log_installation_event(
-                                LogLevel.SUCCESS,
-                                f"Batch installed {len(packages)} packages for {suite.name}",
-                                application=suite.name,
-                                action="batch_install",
-                                command=command,
-                                output=output
-                            )
+        Post-install commands of successful standalone installs are not run
+        here; they become graph nodes of their own (see _build_task_graph).
 
-                            # 刷新主菜单
-                            self._refresh_main_menu_app_page(f"{suite.name} batch installation successful")
+        Args:
+            i: Task index
+            task: Task dict from self.tasks
+        """
+        self.current_task_index = i
 
-                        else:
-                            # 批量安装失败，启动降级策略（中文注释：逐个重试以定位失败包）
-                            self._append_log(None, "")
-                            self._log_error(f"[red]❌ Batch installation failed[/red]")
-                            self._log_control(f"[yellow]⚙️  Retrying individually to identify failed packages...[/yellow]")
-                            self._append_log(None, "")
-
-                            failed_components = []
-                            success_components = []
-
-                            for component in components:
-                                self._log_control(f"[blue]→[/blue] Retrying: {component.name}")
-
-                                # 生成单个安装命令
-                                single_cmd = self.app_installer.get_install_command(component)
-                                if not single_cmd:
-                                    failed_components.append(component.name)
-                                    self._log_error(f"  [red]❌ Failed to generate command for {component.name}[/red]")
-                                    continue
-
-                                # 执行单个安装
-                                comp_success, comp_output = await self._execute_command_with_sudo_support(
-                                    single_cmd, "log_widget"
-                                )
-
-                                if comp_success:
-                                    success_components.append(component.name)
-                                    self.app_installer.save_installation_status(component.name, True)
-                                    self._log_control(f"  [green]✅ {component.name} installed successfully[/green]")
-                                else:
-                                    failed_components.append(component.name)
-                                    self._log_error(f"  [red]❌ {component.name} installation failed[/red]")
-                                    # 显示简短的错误信息
-                                    if comp_output:
-                                        error_preview = comp_output.strip().split('\n')[-1][:100]
-                                        self._log_error(f"  [dim]Error: {error_preview}[/dim]")
+        # Update task status
+        task["status"] = "running"
+        self._record_task_state(i)
+        self._record_touched(task["action"])
 
-                            self._append_log(None, "")
+        # Log start with categorized logging and task progress indicator
+        task_progress_marker = f"[Task {i+1}/{len(self.tasks)}]"
+        self._log_control(f"")
+        self._log_control(f"{'=' * 60}")
+        self._log_control(f"{task_progress_marker} 🚀 Starting: {task['name']}")
+        self._log_control(f"{'=' * 60}")
 
-                            # 根据降级结果决定最终状态
-                            if not failed_components:
-                                task["status"] = "success"
-                                task["progress"] = 100
-                                task["message"] = f"All packages installed (after individual retry)"
-                                self._log_control(f"[green]✅ All {len(success_components)} packages successfully installed after individual retry[/green]")
+        # Get the action and application
+        action = task["action"]
+        app = action["application"]
 
-                                # 刷新主菜单
-                                self._refresh_main_menu_app_page(f"{suite.name} installation successful (after retry)")
-                            else:
-                                task["status"] = "failed"
-                                task["progress"] = 100
-                                task["message"] = f"Failed packages: {', '.join(failed_components)}"
-                                self._log_error(f"[red]❌ Installation failed for: {', '.join(failed_components)}[/red]")
-                                if success_components:
-                                    self._log_control(f"[dim]Successfully installed: {', '.join(success_components)}[/dim]")
+        # Simulate progress updates
+        task["progress"] = 20
+        self._update_progress(i, task["progress"])
 
-                    else:
-                        # 单个安装路径（中文注释：保持原有逻辑不变）
-                        # Get install command
-                        command = self.app_installer.get_install_command(app)
-                        if command:
-                            # Check if this specific command needs sudo
-                            if self._command_needs_sudo_for_task(task):
-                                self._log_user("⚠️ Administrator privileges required for installation command")
+        try:
+            if action["action"] == "install":
+                await self._publish_prefetched_packages()
+
+                # 检查是否为批量安装（中文注释：批量安装是新功能，优先检查）
+                is_batch = action.get('is_batch', False)
+
+                if is_batch:
+                    # 批量安装路径（中文注释：Suite 级别批量安装）
+                    packages = action.get('packages', [])
+                    suite = action['application']  # ApplicationSuite 对象
+                    components = action.get('components', [])
+
+                    # 显示批量安装标题（中文注释：使用分隔线和格式化标题提升可读性）
+                    self._append_log(None, "")
+                    self._log_control(f"[bold blue]═══ Batch Installation ═══[/bold blue]")
+                    self._log_control(f"[bold]{suite.name}[/bold]")
+                    self._log_control(f"[dim]Mode: Batch (all packages in one command)[/dim]")
+                    self._log_control(f"[dim]Packages: {len(packages)} items[/dim]")
+                    self._append_log(None, "")
+
+                    # 显示包列表（中文注释：使用编号列表便于阅读）
+                    self._log_control(f"[bold]Package list:[/bold]")
+                    for idx, pkg in enumerate(packages, 1):
+                        self._log_control(f"  {idx}. {pkg}")
+                    self._append_log(None, "")
+
+                    # 生成批量安装命令
+                    command = self.app_installer.get_batch_install_command(packages)
+                    if not command:
+                        task["status"] = "failed"
+                        task["message"] = "Failed to generate batch install command"
+                        self._log_error(f"❌ Failed to generate batch install command")
+                        self._record_task_state(i)
+                        return
 
-                            self._log_control(f"Executing command: {command}")
+                    self._log_control(f"[dim]Command: {command}[/dim]")
+                    self._append_log(None, "")
 
-                            # Execute installation
-                            initial_progress = 40
-                            task["progress"] = initial_progress
-                            self._update_progress(i, initial_progress)
+                    # 执行批量安装（中文注释：进度 40-70%）
+                    task["progress"] = 40
+                    self._update_progress(i, 40)
 
-                            # Create progress callback for this task
-                            def update_install_progress(percentage):
-                                # Map command progress to task progress range (40-70%)
-                                task_progress = initial_progress + int((percentage / 100) * 30)
-                                task["progress"] = min(task_progress, 70)
-                                self._update_progress(i, task["progress"])
+                    def update_batch_progress(percentage):
+                        task_progress = 40 + int((percentage / 100) * 30)
+                        task["progress"] = min(task_progress, 70)
+                        self._update_progress(i, task["progress"])
 
-                            success, output = await self._execute_command_with_sudo_support(command, "log_widget", update_install_progress)
+                    success, output = await self._execute_command_with_sudo_support(
+                        command, "log_widget", update_batch_progress
+                    )
 
-                            if success:
-                                task["progress"] = 70
-                                self._update_progress(i, task["progress"])
+                    if success:
+                        # 批量安装成功（中文注释：更新所有组件的安装状态）
+                        task["progress"] = 70
+                        self._update_progress(i, 70)
 
-                                # Execute post-install if any
-                                if app.post_install:
-                                    self._log_control(f"Executing post-install configuration: {app.post_install}")
+                        for component in components:
+                            if self.app_installer.save_installation_status(component.name, True):
+                                self._log_process(f"📝 Saved installation status for {component.name}")
 
-                                    # Create progress callback for post-install (70-100%)
-                                    def update_postinstall_progress(percentage):
-                                        task_progress = 70 + int((percentage / 100) * 30)
-                                        task["progress"] = min(task_progress, 100)
-                                        self._update_progress(i, task["progress"])
+                        task["status"] = "success"
+                        task["progress"] = 100
+                        self._append_log(None, "")
+                        self._log_control(f"[green]✅ [Task {i+1}/{len(self.tasks)}] Batch installation completed successfully[/green]")
+                        self._log_control(f"[dim]  All {len(packages)} packages installed for '{suite.name}'[/dim]")
+                        self._log_control(f"{'─' * 60}")
+
+                        # 记录批量安装成功日志
+                        self.app_installer.log_installation_event(
+                            LogLevel.SUCCESS,
+                            f"Batch installed {len(packages)} packages for {suite.name}",
+                            application=suite.name,
+                            action="batch_install",
+                            command=command,
+                            output=output
+                        )
 
-                                    post_success, post_output = await self._execute_command_with_sudo_support(app.post_install, "log_widget", update_postinstall_progress)
-                                    if not post_success:
-                                        self._log_error(f"⚠️ Post-install configuration failed: {post_output}")
+                        # 刷新主菜单
+                        self._refresh_main_menu_app_page(f"{suite.name} batch installation successful", action)
 
-                                task["status"] = "success"
-                                task["progress"] = 100
-                                self._append_log(None, "")
-                                self._log_control(f"[green]✅ [Task {i+1}/{len(self.tasks)}] {app.name} installed successfully[/green]")
-                                self._log_control(f"{'─' * 60}")
-
-                                # Log successful installation
-                                self.app_installer.log_installation_event(
-                                    LogLevel.SUCCESS,
-                                    f"{app.name} installed successfully",
-                                    application=app.name,
-                                    action="install",
-                                    command=command,
-                                    output=output
-                                )
-
-                                # Save installation status to persist state
-                                if self.app_installer.save_installation_status(app.name, True):
-                                    self._log_process(f"📝 Saved installation status for {app.name}")
-                                else:
-                                    self._log_error(f"⚠️ Failed to save installation status for {app.name}")
+                    else:
+                        # 批量安装失败，启动降级策略（中文注释：逐个重试以定位失败包）
+                        self._append_log(None, "")
+                        self._log_error(f"[red]❌ Batch installation failed[/red]")
+                        self._log_control(f"[yellow]⚙️  Retrying individually to identify failed packages...[/yellow]")
+                        self._append_log(None, "")
+
+                        failed_components = []
+                        success_components = []
+
+                        for component in components:
+                            self._log_control(f"[blue]→[/blue] Retrying: {component.name}")
+
+                            # 生成单个安装命令
+                            single_cmd = self.app_installer.get_install_command(component)
+                            if not single_cmd:
+                                failed_components.append(component.name)
+                                self._log_error(f"  [red]❌ Failed to generate command for {component.name}[/red]")
+                                continue
+
+                            # 执行单个安装
+                            comp_success, comp_output = await self._execute_command_with_sudo_support(
+                                single_cmd, "log_widget"
+                            )
 
-                                # Immediately refresh main menu app page after successful installation
-                                self._refresh_main_menu_app_page(f"{app.name} installed successfully")
+                            if comp_success:
+                                success_components.append(component.name)
+                                self.app_installer.save_installation_status(component.name, True)
+                                self._log_control(f"  [green]✅ {component.name} installed successfully[/green]")
                             else:
-                                task["status"] = "failed"
-                                task["message"] = output
-
-                                # Log failed installation
-                                self.app_installer.log_installation_event(
-                                    LogLevel.ERROR,
-                                    f"{app.name} installation failed",
-                                    application=app.name,
-                                    action="install",
-                                    command=command,
-                                    error=output
-                                )
-
-                                # Generate user-friendly error analysis
-                                friendly_error = self.app_installer.analyze_error_and_suggest_solution(
-                                    output, command, app.name
-                                )
-
-                                self._log_error(f"❌ {app.name} installation failed")
-                                self._append_log(None,"")
+                                failed_components.append(component.name)
+                                self._log_error(f"  [red]❌ {component.name} installation failed[/red]")
+                                # 显示简短的错误信息
+                                if comp_output:
+                                    error_preview = comp_output.strip().split('\n')[-1][:100]
+                                    self._log_error(f"  [dim]Error: {error_preview}[/dim]")
 
-                                # Show raw error output first for debugging
-                                if output and len(output.strip()) > 0:
-                                    self._append_log(None,"[red]🔍 Raw error output:[/red]")
-                                    for line in output.split('\n')[-5:]:  # Last 5 lines of raw output
-                                        if line.strip():
-                                            self._append_log(None,f"[dim]  {line}[/dim]")
-                                    self._append_log(None,"")
+                        self._append_log(None, "")
 
-                                # Display friendly error with proper formatting
-                                for line in friendly_error.split('\n'):
-                                    if line.strip():
-                                        if line.startswith('❌'):
-                                            self._append_log(None,f"[red]{line}[/red]")
-                                        elif line.startswith('📋'):
-                                            self._append_log(None,f"[blue]{line}[/blue]")
-                                        elif line.startswith('🔍'):
-                                            self._append_log(None,f"[dim]{line}[/dim]")
-                                        elif line.startswith('  •'):
-                                            self._append_log(None,f"[yellow]{line}[/yellow]")
-                                        else:
-                                            self._append_log(None,line)
+                        # 根据降级结果决定最终状态
+                        if not failed_components:
+                            task["status"] = "success"
+                            task["progress"] = 100
+                            task["message"] = f"All packages installed (after individual retry)"
+                            self._log_control(f"[green]✅ All {len(success_components)} packages successfully installed after individual retry[/green]")
+
+                            # 刷新主菜单
+                            self._refresh_main_menu_app_page(f"{suite.name} installation successful (after retry)", action)
                         else:
                             task["status"] = "failed"
-                            task["message"] = "Cannot get installation command"
-                            self._append_log(None,f"[red]Error: Cannot get installation command for {app.name}[/red]")
-                
-                else:  # uninstall
-                    # Get uninstall command
-                    command = self.app_installer.get_uninstall_command(app)
+                            task["progress"] = 100
+                            task["message"] = f"Failed packages: {', '.join(failed_components)}"
+                            self._log_error(f"[red]❌ Installation failed for: {', '.join(failed_components)}[/red]")
+                            if success_components:
+                                self._log_control(f"[dim]Successfully installed: {', '.join(success_components)}[/dim]")
+
+                else:
+                    # 单个安装路径（中文注释：保持原有逻辑不变）
+                    # Get install command
+                    command = self.app_installer.get_install_command(app)
                     if command:
                         # Check if this specific command needs sudo
                         if self._command_needs_sudo_for_task(task):
-                            self._log_user("⚠️ Administrator privileges required for uninstallation command")
+                            self._log_user("⚠️ Administrator privileges required for installation command")
 
                         self._log_control(f"Executing command: {command}")
 
-                        # Execute uninstallation
-                        initial_progress = 50
+                        # Execute installation
+                        initial_progress = 40
                         task["progress"] = initial_progress
                         self._update_progress(i, initial_progress)
 
                         # Create progress callback for this task
-                        def update_uninstall_progress(percentage):
-                            # Map command progress to task progress range (50-100%)
-                            task_progress = initial_progress + int((percentage / 100) * 50)
-                            task["progress"] = min(task_progress, 100)
+                        def update_install_progress(percentage):
+                            # Map command progress to task progress range (40-70%)
+                            task_progress = initial_progress + int((percentage / 100) * 30)
+                            task["progress"] = min(task_progress, 70)
                             self._update_progress(i, task["progress"])
 
-                        success, output = await self._execute_command_with_sudo_support(command, "log_widget", update_uninstall_progress)
+                        success, output = await self._execute_command_with_sudo_support(command, "log_widget", update_install_progress)
 
                         if success:
-                            task["status"] = "success"
-                            task["progress"] = 100
-                            self._append_log(None, "")
-                            self._log_control(f"[green]✅ [Task {i+1}/{len(self.tasks)}] {app.name} uninstalled successfully[/green]")
+                            task["progress"] = 70
+                            self._update_progress(i, task["progress"])
+
+                            if app.post_install:
+                                # 安装后配置作为独立的任务图节点运行，可与后续包管理器命令并行
+                                self._post_install_ready.add(app.name)
+                                self._append_log(None, "")
+                                self._log_control(f"[green]✅ [Task {i+1}/{len(self.tasks)}] {app.name} installed, post-install configuration queued[/green]")
+                            else:
+                                task["status"] = "success"
+                                task["progress"] = 100
+                                self._append_log(None, "")
+                                self._log_control(f"[green]✅ [Task {i+1}/{len(self.tasks)}] {app.name} installed successfully[/green]")
                             self._log_control(f"{'─' * 60}")
 
-                            # Save uninstallation status to persist state
-                            if self.app_installer.save_installation_status(app.name, False):
-                                self._log_process(f"📝 Saved uninstall status for {app.name}")
+                            # Log successful installation
+                            self.app_installer.log_installation_event(
+                                LogLevel.SUCCESS,
+                                f"{app.name} installed successfully",
+                                application=app.name,
+                                action="install",
+                                command=command,
+                                output=output
+                            )
+
+                            # Save installation status to persist state
+                            if self.app_installer.save_installation_status(app.name, True):
+                                self._log_process(f"📝 Saved installation status for {app.name}")
                             else:
-                                self._log_error(f"⚠️ Failed to save uninstall status for {app.name}")
+                                self._log_error(f"⚠️ Failed to save installation status for {app.name}")
 
-                            # Immediately refresh main menu app page after successful uninstallation
-                            self._refresh_main_menu_app_page(f"{app.name} uninstalled successfully")
+                            # Immediately refresh main menu app page after successful installation
+                            self._refresh_main_menu_app_page(f"{app.name} installed successfully", action)
                         else:
                             task["status"] = "failed"
                             task["message"] = output
 
+                            # Log failed installation
+                            self.app_installer.log_installation_event(
+                                LogLevel.ERROR,
+                                f"{app.name} installation failed",
+                                application=app.name,
+                                action="install",
+                                command=command,
+                                error=output
+                            )
+
                             # Generate user-friendly error analysis
                             friendly_error = self.app_installer.analyze_error_and_suggest_solution(
                                 output, command, app.name
                             )
 
-                            self._log_error(f"❌ {app.name} uninstallation failed")
+                            self._log_error(f"❌ {app.name} installation failed")
                             self._append_log(None,"")
 
                             # Show raw error output first for debugging
@@ -1010,48 +1127,273 @@ class AppInstallProgress(ModalScreen):
                                         self._append_log(None,line)
                     else:
                         task["status"] = "failed"
-                        task["message"] = "Cannot get uninstall command"
-                        self._append_log(None,f"[red]Error: Cannot get uninstall command for {app.name}[/red]")
-            
-            except Exception as e:
-                task["status"] = "failed"
-                task["message"] = str(e)
-                self._append_log(None,f"[red]Error: {str(e)}[/red]")
-            
-            self._update_task_display(i)
-            self._update_progress(i, task["progress"])
-        
-        # All tasks completed
-        self.all_completed = True
-        self._enable_close_button()
+                        task["message"] = "Cannot get installation command"
+                        self._append_log(None,f"[red]Error: Cannot get installation command for {app.name}[/red]")
 
-        # Log completion
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        successful = sum(1 for t in self.tasks if t["status"] == "success")
-        failed = sum(1 for t in self.tasks if t["status"] == "failed")
+            else:  # uninstall
+                # Get uninstall command
+                command = self.app_installer.get_uninstall_command(app)
+                if command:
+                    # Check if this specific command needs sudo
+                    if self._command_needs_sudo_for_task(task):
+                        self._log_user("⚠️ Administrator privileges required for uninstallation command")
 
-        self._append_log(None,"")
-        self._log_control(f"📊 Installation completed: {successful} successful, {failed} failed")
+                    self._log_control(f"Executing command: {command}")
 
-        if failed == 0:
-            self._log_control("🎉 All tasks completed successfully!")
+                    # Execute uninstallation
+                    initial_progress = 50
+                    task["progress"] = initial_progress
+                    self._update_progress(i, initial_progress)
+
+                    # Create progress callback for this task
+                    def update_uninstall_progress(percentage):
+                        # Map command progress to task progress range (50-100%)
+                        task_progress = initial_progress + int((percentage / 100) * 50)
+                        task["progress"] = min(task_progress, 100)
+                        self._update_progress(i, task["progress"])
+
+                    success, output = await self._execute_command_with_sudo_support(command, "log_widget", update_uninstall_progress)
+
+                    if success:
+                        task["status"] = "success"
+                        task["progress"] = 100
+                        self._append_log(None, "")
+                        self._log_control(f"[green]✅ [Task {i+1}/{len(self.tasks)}] {app.name} uninstalled successfully[/green]")
+                        self._log_control(f"{'─' * 60}")
+
+                        # Save uninstallation status to persist state
+                        if self.app_installer.save_installation_status(app.name, False):
+                            self._log_process(f"📝 Saved uninstall status for {app.name}")
+                        else:
+                            self._log_error(f"⚠️ Failed to save uninstall status for {app.name}")
+
+                        # Immediately refresh main menu app page after successful uninstallation
+                        self._refresh_main_menu_app_page(f"{app.name} uninstalled successfully", action)
+                    else:
+                        task["status"] = "failed"
+                        task["message"] = output
+
+                        # Generate user-friendly error analysis
+                        friendly_error = self.app_installer.analyze_error_and_suggest_solution(
+                            output, command, app.name
+                        )
+
+                        self._log_error(f"❌ {app.name} uninstallation failed")
+                        self._append_log(None,"")
+
+                        # Show raw error output first for debugging
+                        if output and len(output.strip()) > 0:
+                            self._append_log(None,"[red]🔍 Raw error output:[/red]")
+                            for line in output.split('\n')[-5:]:  # Last 5 lines of raw output
+                                if line.strip():
+                                    self._append_log(None,f"[dim]  {line}[/dim]")
+                            self._append_log(None,"")
+
+                        # Display friendly error with proper formatting
+                        for line in friendly_error.split('\n'):
+                            if line.strip():
+                                if line.startswith('❌'):
+                                    self._append_log(None,f"[red]{line}[/red]")
+                                elif line.startswith('📋'):
+                                    self._append_log(None,f"[blue]{line}[/blue]")
+                                elif line.startswith('🔍'):
+                                    self._append_log(None,f"[dim]{line}[/dim]")
+                                elif line.startswith('  •'):
+                                    self._append_log(None,f"[yellow]{line}[/yellow]")
+                                else:
+                                    self._append_log(None,line)
+                else:
+                    task["status"] = "failed"
+                    task["message"] = "Cannot get uninstall command"
+                    self._append_log(None,f"[red]Error: Cannot get uninstall command for {app.name}[/red]")
+
+        except Exception as e:
+            task["status"] = "failed"
+            task["message"] = str(e)
+            self._append_log(None,f"[red]Error: {str(e)}[/red]")
+
+        self._record_task_state(i)
+        self._update_progress(i, task["progress"])
+
+    async def _start_prefetch(self, transactions: List[InstallTransaction]) -> None:
+        """Download the packages of later install commands before they run.
+
+        The first command of the session downloads its own packages, so a
+        concurrent prefetch skips those to avoid fetching them twice.
+
+        Args:
+            transactions: Planned combined transactions (they run before the per-task loop)
+        """
+        if not self.app_installer.app_config.get("prefetch", {}).get("enabled", True):
+            return
+
+        # 按执行顺序列出每条命令涉及的包：先合并事务，再逐个任务
+        commands = [(transaction.action, transaction.packages) for transaction in transactions]
+        covered = {index for transaction in transactions for index in transaction.action_indexes}
+        for index, action in enumerate(self.actions):
+            if index not in covered:
+                applications = action_applications(action)
+                commands.append((action["action"], [p for app in applications for p in app.get_package_list()]))
+
+        install_groups = [packages for kind, packages in commands if kind == "install"]
+        if len(install_groups) < 2:
+            return
+
+        prefetcher = PackagePrefetcher(self.app_installer)
+        skip = set(commands[0][1]) if prefetcher.runs_concurrently and commands[0][0] == "install" else set()
+        packages = list(dict.fromkeys(p for group in install_groups for p in group if p not in skip))
+        if not packages:
+            return
+
+        try:
+            if prefetcher.runs_concurrently:
+                if await prefetcher.start(packages):
+                    self._prefetcher = prefetcher
+                    self._active_processes.append(prefetcher.process)
+                    self._log_control(f"[dim]📦 Prefetching {len(packages)} packages in background while installing[/dim]")
+                return
+
+            command = prefetcher.get_command(packages)
+            if not command:
+                return
+            # 该包管理器下载期间持有数据库锁，因此先集中下载整个计划
+            self._log_control(f"[blue]📦 Downloading {len(packages)} packages for the whole plan[/blue]")
+            self._log_control(f"[dim]Command: {command}[/dim]")
+            success, output = await self._execute_command_with_sudo_support(command, "log_widget")
+            if not success:
+                self._log_control(f"[yellow]⚠️ Prefetch failed, packages will be downloaded during install: {output}[/yellow]")
+        except Exception as e:
+            self._log_control(f"[yellow]⚠️ Prefetch unavailable: {str(e)}[/yellow]")
+
+    async def _publish_prefetched_packages(self) -> None:
+        """Hand downloaded packages to the package manager before an install command."""
+        if self._prefetcher is None:
+            return
+
+        command = self._prefetcher.get_publish_command()
+        if not command:
+            return
+
+        success, output = await self._execute_command_with_sudo_support(command)
+        if success:
+            self._log_process(f"📦 Using prefetched packages{'' if self._prefetcher.is_running else ' (prefetch complete)'}")
         else:
-            self._log_error("⚠️ Some tasks failed, please check logs for details.")
+            self._log_control(f"[yellow]⚠️ Could not use prefetched packages: {output}[/yellow]")
+
+    async def _finish_prefetch(self) -> None:
+        """Stop the background download and remove its staging files."""
+        prefetcher, self._prefetcher = self._prefetcher, None
+        if prefetcher is None:
+            return
+
+        prefetcher.cancel()
+        try:
+            await asyncio.wait_for(prefetcher.wait(), timeout=5.0)
+        except Exception:
+            pass
+        prefetcher.cleanup()
+        if prefetcher.process in self._active_processes:
+            self._active_processes.remove(prefetcher.process)
+
+    async def _run_transaction(self, transaction: InstallTransaction) -> bool:
+        """Run several confirmed actions as one package manager transaction.
+
+        On success every covered task is completed. On failure the tasks are
+        put back to pending so the per-task loop installs them one by one and
+        can report a status for each application.
+
+        Args:
+            transaction: Planned transaction
+
+        Returns:
+            True if the combined transaction succeeded
+        """
+        task_indexes = transaction.action_indexes
+        verb = "Installation" if transaction.action == "install" else "Removal"
+
+        for index in task_indexes:
+            task = self.tasks[index]
+            task["status"] = "running"
+            task["progress"] = 20
+            self._record_task_state(index)
+            self._record_touched(task["action"])
+
+        self._log_control(f"")
+        self._log_control(f"{'=' * 60}")
+        self._log_control(f"[bold blue]═══ Combined {verb} Transaction ═══[/bold blue]")
+        self._log_control(f"[dim]Tasks: {len(task_indexes)}, packages: {len(transaction.packages)}[/dim]")
+        self._log_control(f"[dim]Packages: {' '.join(transaction.packages)}[/dim]")
+        self._log_control(f"[dim]Command: {transaction.command}[/dim]")
+        self._log_control(f"{'=' * 60}")
+
+        if transaction.action == "install":
+            await self._publish_prefetched_packages()
+
+        def update_transaction_progress(percentage):
+            task_progress = min(40 + int((percentage / 100) * 50), 90)
+            for index in task_indexes:
+                self.tasks[index]["progress"] = task_progress
+                self._update_progress(index, task_progress)
 
-        # End logging session
         try:
+            success, output = await self._execute_command_with_sudo_support(
+                transaction.command, "log_widget", update_transaction_progress
+            )
+        except Exception as e:
+            success, output = False, str(e)
+
+        if not success:
             self.app_installer.log_installation_event(
-                LogLevel.INFO,
-                f"Installation session ended - Success: {successful}, Failed: {failed}",
-                action="session_end"
+                LogLevel.WARNING,
+                f"Combined {transaction.action} transaction failed, falling back to per-application runs",
+                action=f"transaction_{transaction.action}",
+                command=transaction.command,
+                error=output
             )
+            self._log_error(f"❌ Combined {verb.lower()} transaction failed")
+            self._log_control(f"[yellow]⚙️  Falling back to one {transaction.action} per application...[/yellow]")
+            for index in task_indexes:
+                self.tasks[index]["status"] = "pending"
+                self.tasks[index]["progress"] = 0
+                self._record_task_state(index)
+            return False
+
+        installed = transaction.action == "install"
+        for index in task_indexes:
+            task = self.tasks[index]
+            action = task["action"]
+            applications = action.get("components") if action.get("is_batch") else None
 
-            # End logging session
-            self.app_installer.end_logging_session()
+            for app in applications or [action["application"]]:
+                if installed and app.post_install:
+                    # Runs later as a post-install graph node
+                    self._post_install_ready.add(app.name)
+
+                if self.app_installer.save_installation_status(app.name, installed):
+                    self._log_process(f"📝 Saved {'installation' if installed else 'uninstall'} status for {app.name}")
+
+            task["message"] = "Completed in combined transaction"
+            if self._pending_post_installs.get(index):
+                task["progress"] = 70
+            else:
+                task["status"] = "success"
+                task["progress"] = 100
+            self._record_task_state(index)
+            self._update_progress(index, task["progress"])
+
+        self.app_installer.log_installation_event(
+            LogLevel.SUCCESS,
+            f"Combined {transaction.action} transaction completed for {len(transaction.applications)} applications",
+            action=f"transaction_{transaction.action}",
+            command=transaction.command,
+            output=output
+        )
+        self._append_log(None, "")
+        self._log_control(f"[green]✅ Combined {verb.lower()} completed for {len(task_indexes)} tasks[/green]")
+        self._log_control(f"{'─' * 60}")
+        self._refresh_main_menu_app_page(f"Combined {transaction.action} transaction successful", transaction.as_action())
+        return True
 
-        except Exception as e:
-            self._append_log(None,f"[yellow]⚠️ Log session end failed: {e}[/yellow]")
-    
     def _command_needs_sudo(self, task: Dict) -> bool:
         """Check if task needs sudo permissions.
 
@@ -1158,115 +1500,44 @@ class AppInstallProgress(ModalScreen):
                 else:
                     return await self._execute_command_async(command, None, progress_callback)
 
-            # Non-root user, need to use sudo password
-            password = self.sudo_manager._decrypt_password(self.sudo_manager._password)
-            if not password:
-                error_msg = "Failed to decrypt sudo password"
-                if log_widget:
-                    self._append_log(None,f"[red]❌ {error_msg}[/red]")
-                return False, error_msg
-
             if log_widget:
                 self._append_log(None,f"[dim]🔐 Executing with sudo: {command}[/dim]")
 
-            # Create subprocess with password input
-            process = await asyncio.create_subprocess_shell(
-                command,
-                stdin=asyncio.subprocess.PIPE,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.STDOUT,  # Redirect stderr to stdout for unified output
-                text=False,  # Use binary mode to avoid "text must be False" error
-                shell=True
-            )
+            # Non-root user: run through the session's privileged helper when it is up and
+            # the command is sudo only, otherwise start it locally and feed it the sudo password
+            helper = self.sudo_manager.get_helper()
+            helper_cmd = helper_command(command) if helper is not None else None
+            if helper_cmd is not None:
+                process = await helper.spawn(helper_cmd)
+            else:
+                password = self.sudo_manager._decrypt_password(self.sudo_manager._password)
+                if not password:
+                    error_msg = "Failed to decrypt sudo password"
+                    if log_widget:
+                        self._append_log(None,f"[red]❌ {error_msg}[/red]")
+                    return False, error_msg
 
-            output_lines = []
-            error_occurred = False
-            progress_percentage = 0
+                # Create subprocess with password input
+                process = await asyncio.create_subprocess_shell(
+                    command,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,  # Redirect stderr to stdout for unified output
+                )
 
-            # Send password first
-            if password:
+                # Send password first
                 process.stdin.write(f"{password}\n".encode('utf-8'))
                 await process.stdin.drain()
 
-            # Read output lines for real-time display
-            try:
-                line_count = 0
-                while True:
-                    # Check if user requested abort
-                    if self._is_aborting:
-                        break
-
-                    # Check if process is paused - wait for resume
-                    if self._is_paused:
-                        await asyncio.sleep(0.1)  # Wait 100ms before checking again
-                        continue
-
-                    try:
-                        line_bytes = await asyncio.wait_for(
-                            process.stdout.readline(),
-                            timeout=0.1  # Short timeout to check pause/abort frequently
-                        )
-
-                        if not line_bytes:  # EOF reached
-                            break
-                    except asyncio.TimeoutError:
-                        # No data available, check pause/abort status again
-                        continue
-
-                    # Decode bytes to string and clean control characters
-                    try:
-                        line = line_bytes.decode('utf-8').strip()
-                        # Only convert \r to \n for specific apt progress patterns
-                        if 'Reading database' in line and '\r' in line:
-                            # This is apt progress with carriage returns, convert to separate lines
-                            line = line.replace('\r', '\n')
-                        else:
-                            # For other content, just remove \r but keep content
-                            line = line.replace('\r', '')
-
-                        # Remove ANSI escape sequences
-                        import re
-                        line = re.sub(r'\x1b\[[0-9;]*m', '', line)
-                        line = re.sub(r'\x1b\[[0-9;]*[A-Za-z]', '', line)
-                        line = line.strip()
-                    except UnicodeDecodeError:
-                        line = line_bytes.decode('utf-8', errors='ignore').strip()
-                        # Apply same logic for error case
-                        if 'Reading database' in line and '\r' in line:
-                            line = line.replace('\r', '\n')
-                        else:
-                            line = line.replace('\r', '')
-
-                    if line:
-                        # Split line by newlines if any were created from \r conversion
-                        line_parts = line.split('\n')
-                        for part in line_parts:
-                            part = part.strip()
-                            if part:  # Only add non-empty parts
-                                output_lines.append(part)
-
-                                # Process each part through auto-categorization system
-                                if log_widget:
-                                    # Use _append_log for consistent categorization
-                                    self._append_log(None, part)
-                                    # Check for errors to set error_occurred flag
-                                    if any(keyword in part.lower() for keyword in ['error', 'failed', 'permission denied', 'access denied']):
-                                        error_occurred = True
-                                else:
-                                    # No log widget, still use auto-categorization
-                                    self._append_log(None, part)
-                                    # Check for errors to set error_occurred flag
-                                    if any(keyword in part.lower() for keyword in ['error', 'failed', 'permission denied', 'access denied']):
-                                        error_occurred = True
-
-                        line_count += 1
+            # Track process so abort can terminate it
+            self._active_processes.append(process)
 
-                        # Small delay to prevent UI flooding
-                        await asyncio.sleep(0.1)
+            output_lines = []
 
-            except asyncio.TimeoutError:
-                # If readline times out, continue to check process status
-                pass
+            # Read output as it arrives (event-driven, no polling)
+            error_occurred = await self._stream_process_output(
+                process, command, output_lines, progress_callback, estimate_progress=False
+            )
 
             # Close stdin and wait for process completion
             if process.stdin:
@@ -1288,6 +1559,7 @@ class AppInstallProgress(ModalScreen):
                 # Remove process from active list when done
                 if process in self._active_processes:
                     self._active_processes.remove(process)
+                self._record_exit_code(process.returncode)
 
             # Command completed - set progress to 100%
             if progress_callback:
@@ -1334,6 +1606,75 @@ class AppInstallProgress(ModalScreen):
                 self._append_log(None,f"[red]❌ {error_msg}[/red]")
             return False, error_msg
 
+    async def _stream_process_output(self, process, command: str, output_lines: List[str],
+                                     progress_callback=None, estimate_progress: bool = True) -> bool:
+        """Stream a subprocess's output into the log until it closes its output.
+
+        Output is read in chunks as soon as it arrives and split on both
+        newlines and carriage returns; progress lines overwritten within the
+        same chunk are dropped. While the session is paused no output is read,
+        so the pipe fills up and the process blocks until it is resumed.
+
+        Package manager status output (apt's status records, dnf/pacman/brew
+        step counters) drives the progress; apt's status records are not
+        logged. The pattern-based estimate is only used for output without
+        such status.
+
+        Args:
+            process: asyncio subprocess with stdout piped
+            command: Command line (for progress estimation)
+            output_lines: List receiving the cleaned lines (keeps the most recent ones)
+            progress_callback: Function to call for progress updates (percentage: int)
+            estimate_progress: Estimate progress from the output patterns
+
+        Returns:
+            True if an error keyword was seen in the output
+        """
+        error_occurred = False
+        progress_percentage = 0
+        line_count = 0
+        parser = InstallProgressParser(self.app_installer.package_manager)
+
+        async for batch in iter_stream_batches(process.stdout):
+            if not self._resume_event.is_set():
+                # 暂停期间停止读取输出（等待恢复或中止）
+                await asyncio.get_running_loop().run_in_executor(None, self._resume_event.wait)
+            if self._is_aborting:
+                break
+
+            for stream_line in batch:
+                line, update = parser.feed(strip_ansi(stream_line.text).strip())
+                if update is not None:
+                    self._progress_detail = update.detail
+                    self._progress_dirty = True
+                    if progress_callback and int(update.percent) > progress_percentage:
+                        progress_percentage = int(update.percent)
+                        progress_callback(progress_percentage)
+                if not line:
+                    continue
+
+                output_lines.append(line)
+                line_count += 1
+
+                # Smart progress estimation based on output patterns
+                if estimate_progress and not parser.has_progress:
+                    new_progress = self._estimate_progress_from_output(line, line_count, command)
+                    if new_progress > progress_percentage:
+                        progress_percentage = min(new_progress, 95)  # Cap at 95% until completion
+                        if progress_callback:
+                            progress_callback(progress_percentage)
+
+                # Real-time log display using auto-categorization
+                self._append_log(None, line)
+                if any(keyword in line.lower() for keyword in ['error', 'failed', 'permission denied', 'access denied', 'cannot', 'unable']):
+                    error_occurred = True
+
+            # Only the recent output is needed for the result summary
+            if len(output_lines) > 2 * self.OUTPUT_TAIL_LINES:
+                del output_lines[:-self.OUTPUT_TAIL_LINES]
+
+        return error_occurred
+
     async def _execute_command_async(self, command: str, log_widget=None, progress_callback=None) -> tuple:
         """Execute a command asynchronously with real-time output streaming and progress tracking.
 
@@ -1360,95 +1701,11 @@ class AppInstallProgress(ModalScreen):
             self._active_processes.append(process)
 
             output_lines = []
-            error_occurred = False
-            progress_percentage = 0
-
-            # Read output line by line for real-time display
-            try:
-                line_count = 0
-                while True:
-                    # Check if user requested abort
-                    if self._is_aborting:
-                        # Process was aborted by user
-                        break
-
-                    # Check if process is paused - wait for resume
-                    if self._is_paused:
-                        await asyncio.sleep(0.1)  # Wait 100ms before checking again
-                        continue
-
-                    try:
-                        line_bytes = await asyncio.wait_for(
-                            process.stdout.readline(),
-                            timeout=0.1  # Short timeout to check pause/abort frequently
-                        )
 
-                        if not line_bytes:  # EOF reached
-                            break
-                    except asyncio.TimeoutError:
-                        # No data available, check pause/abort status again
-                        continue
-
-                    # Decode bytes to string and clean control characters
-                    try:
-                        line = line_bytes.decode('utf-8').strip()
-                        # Only convert \r to \n for specific apt progress patterns
-                        if 'Reading database' in line and '\r' in line:
-                            # This is apt progress with carriage returns, convert to separate lines
-                            line = line.replace('\r', '\n')
-                        else:
-                            # For other content, just remove \r but keep content
-                            line = line.replace('\r', '')
-
-                        # Remove ANSI escape sequences
-                        import re
-                        line = re.sub(r'\x1b\[[0-9;]*m', '', line)
-                        line = re.sub(r'\x1b\[[0-9;]*[A-Za-z]', '', line)
-                        line = line.strip()
-                    except UnicodeDecodeError:
-                        line = line_bytes.decode('utf-8', errors='ignore').strip()
-                        # Apply same logic for error case
-                        if 'Reading database' in line and '\r' in line:
-                            line = line.replace('\r', '\n')
-                        else:
-                            line = line.replace('\r', '')
-
-                    if line:
-                        # Split line by newlines if any were created from \r conversion
-                        line_parts = line.split('\n')
-                        for part in line_parts:
-                            part = part.strip()
-                            if part:  # Only add non-empty parts
-                                output_lines.append(part)
-                        line_count += 1
-
-                        # Smart progress estimation based on output patterns
-                        new_progress = self._estimate_progress_from_output(line, line_count, command)
-                        if new_progress > progress_percentage:
-                            progress_percentage = min(new_progress, 95)  # Cap at 95% until completion
-                            if progress_callback:
-                                progress_callback(progress_percentage)
-
-                        # Real-time log display using auto-categorization
-                        if log_widget:
-                            # Use _append_log for consistent categorization
-                            self._append_log(None, line)
-                            # Check for errors to set error_occurred flag
-                            if any(keyword in line.lower() for keyword in ['error', 'failed', 'permission denied', 'access denied', 'cannot', 'unable']):
-                                error_occurred = True
-                        else:
-                            # No log widget, still use auto-categorization
-                            self._append_log(None, line)
-                            # Check for errors to set error_occurred flag
-                            if any(keyword in line.lower() for keyword in ['error', 'failed', 'permission denied', 'access denied', 'cannot', 'unable']):
-                                error_occurred = True
-
-                        # Small delay to prevent UI flooding
-                        await asyncio.sleep(0.1)
-
-            except asyncio.TimeoutError:
-                # If readline times out, continue to check process status
-                pass
+            # Read output as it arrives (event-driven, no polling)
+            error_occurred = await self._stream_process_output(
+                process, command, output_lines, progress_callback, estimate_progress=True
+            )
 
             # Wait for process completion with overall timeout
             try:
@@ -1465,6 +1722,7 @@ class AppInstallProgress(ModalScreen):
                 # Remove process from active list when done
                 if process in self._active_processes:
                     self._active_processes.remove(process)
+                self._record_exit_code(process.returncode)
 
             # Command completed - set progress to 100%
             if progress_callback:
@@ -1601,14 +1859,27 @@ class AppInstallProgress(ModalScreen):
 
         return int(base_progress)
     
-    def _update_task_display(self, index: int) -> None:
-        """Update task display - simplified without task list UI."""
-        # No UI task displays to update anymore
-        pass
+    def _record_task_state(self, index: int) -> None:
+        """Record the task's current state in the session journal (fsynced for --resume)."""
+        if self._journal is not None:
+            task = self.tasks[index]
+            self._journal.record(index, task["status"], task.get("exit_code"), task.get("message", ""))
+
+    def _record_exit_code(self, returncode: Optional[int]) -> None:
+        """Remember a command's exit code on the tasks the current node runs."""
+        for index in _CURRENT_TASKS.get():
+            self.tasks[index]["exit_code"] = returncode
+
+    def _finish_journal(self, aborted: bool = False) -> None:
+        """Record every task's final state and mark the session as ended in the journal."""
+        if self._journal is None:
+            return
+        for index in range(len(self.tasks)):
+            self._record_task_state(index)
+        self._journal.finish(aborted)
     
     def _update_progress(self, task_index: int, progress: int) -> None:
-        """Update progress - simplified without progress bars."""
-        # No UI progress bars to update anymore
+        """Update progress - the progress bar is redrawn by the log flush timer."""
         pass
     
     def _enable_close_button(self) -> None:
@@ -1659,10 +1930,12 @@ class AppInstallProgress(ModalScreen):
         for task in retry_tasks:
             task_index = self.tasks.index(task)
             self.current_task_index = task_index
+            _CURRENT_TASKS.set((task_index,))
 
             # Update task status
             task["status"] = "running"
-            self._update_task_display(task_index)
+            self._record_task_state(task_index)
+            self._record_touched(task["action"])
 
             # Log start
             timestamp = datetime.now().strftime("%H:%M:%S")
@@ -1722,7 +1995,7 @@ class AppInstallProgress(ModalScreen):
                                 self._log_error(f"⚠️ Failed to save installation status for {app.name}")
 
                             # Immediately refresh main menu app page after successful re-installation
-                            self._refresh_main_menu_app_page(f"{app.name} re-installed successfully")
+                            self._refresh_main_menu_app_page(f"{app.name} re-installed successfully", action)
                         else:
                             task["status"] = "failed"
                             task["message"] = output
@@ -1789,7 +2062,7 @@ class AppInstallProgress(ModalScreen):
                                 self._append_log(None,f"[yellow]  ⚠️ Failed to save uninstall status for {app.name}[/yellow]")
 
                             # Immediately refresh main menu app page after successful re-uninstallation
-                            self._refresh_main_menu_app_page(f"{app.name} re-uninstalled successfully")
+                            self._refresh_main_menu_app_page(f"{app.name} re-uninstalled successfully", action)
                         else:
                             task["status"] = "failed"
                             task["message"] = output
@@ -1833,12 +2106,13 @@ class AppInstallProgress(ModalScreen):
                 task["message"] = str(e)
                 self._append_log(None,f"[red]Error: {str(e)}[/red]")
 
-            self._update_task_display(task_index)
+            self._record_task_state(task_index)
             self._update_progress(task_index, task["progress"])
 
         # Retry completed
         self.all_completed = True
         self._enable_close_button()
+        self._finish_journal()
 
         # Log completion
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -1858,7 +2132,7 @@ class AppInstallProgress(ModalScreen):
         if self.all_completed:
             # Write session summary to log file before dismissing
             self._write_session_summary()
-            self.dismiss()
+            self.dismiss(self.get_touched_report())
 
     def action_close(self) -> None:
         """Handle close action (Esc key) - same as dismiss."""
@@ -1891,7 +2165,7 @@ class AppInstallProgress(ModalScreen):
     def action_scroll_down(self) -> None:
         """Scroll the log output down."""
         try:
-            content_area = self.query_one("#log-container", ScrollableContainer)
+            content_area = self.query_one("#log-container", RingLogView)
             content_area.scroll_down(animate=False)
         except Exception:
             # If container not available yet, ignore
@@ -1900,26 +2174,58 @@ class AppInstallProgress(ModalScreen):
     def action_scroll_up(self) -> None:
         """Scroll the log output up."""
         try:
-            content_area = self.query_one("#log-container", ScrollableContainer)
+            content_area = self.query_one("#log-container", RingLogView)
             content_area.scroll_up(animate=False)
         except Exception:
             # If container not available yet, ignore
             pass
 
-    def _refresh_main_menu_app_page(self, operation_message: str) -> None:
-        """Refresh main menu app install page to show latest status.
+    def _record_touched(self, action: Dict[str, Any]) -> None:
+        """Remember the applications and packages an action operates on."""
+        components = action.get("components") if action.get("is_batch") else None
+        applications = components or [action["application"]]
+        for app in applications:
+            self.touched_applications.add(app.name)
+            self.touched_packages.update(app.get_package_list())
+        self.touched_packages.update(action.get("packages", []))
+
+    def get_touched_report(self) -> Dict[str, List[str]]:
+        """Get the applications and packages this session operated on.
+
+        Returns:
+            Dictionary with sorted "applications" and "packages" name lists
+        """
+        return {
+            "applications": sorted(self.touched_applications),
+            "packages": sorted(self.touched_packages),
+        }
+
+    def _refresh_main_menu_app_page(self, operation_message: str, action: Optional[Dict[str, Any]] = None) -> None:
+        """Refresh main menu app install rows affected by an operation.
 
         Args:
             operation_message: Operation completion message for logging
+            action: The completed action; only its applications are re-checked
         """
         try:
             if hasattr(self, '_main_menu_ref') and self._main_menu_ref:
-                self._append_log(None, f"[dim]  🔄 Refreshing main menu app page after operation[/dim]")
+                self._append_log(None, f"[dim]  🔄 Refreshing main menu app status after operation[/dim]")
+
+                if action is not None:
+                    components = action.get("components") if action.get("is_batch") else None
+                    applications = components or [action["application"]]
+                    app_names = [app.name for app in applications]
+                    packages = sorted({package for app in applications for package in app.get_package_list()})
+                else:
+                    app_names, packages = None, []
 
                 # Use call_from_thread to ensure UI updates execute in main thread
                 def safe_refresh():
                     try:
-                        self._main_menu_ref.refresh_and_reset_app_page()
+                        if app_names is not None:
+                            self._main_menu_ref.refresh_app_statuses(app_names, packages)
+                        else:
+                            self._main_menu_ref.refresh_and_reset_app_page()
                         # Success logging should go through main menu's log system to avoid thread issues
                     except Exception as e:
                         # If refresh fails, log error but don't affect main flow
@@ -1945,6 +2251,7 @@ class AppInstallProgress(ModalScreen):
 
             if len(self._active_processes) > 0:
                 self._is_paused = True
+                self._resume_event.clear()
                 self._log_control("⏸️ Installation paused - waiting for user decision")
                 self._log_control("Processes will wait before continuing output processing")
             else:
@@ -1962,6 +2269,7 @@ class AppInstallProgress(ModalScreen):
             timestamp = datetime.now().strftime("%H:%M:%S")
 
             self._is_paused = False
+            self._resume_event.set()
             self._log_control("▶️ Installation resumed - continuing process")
 
         except Exception as e:
@@ -1991,6 +2299,7 @@ class AppInstallProgress(ModalScreen):
         try:
             self._is_aborting = True
             self._is_paused = False  # Clear pause flag when aborting
+            self._resume_event.set()
             timestamp = datetime.now().strftime("%H:%M:%S")
 
             self._append_log(None, "")
@@ -2025,6 +2334,7 @@ class AppInstallProgress(ModalScreen):
             self._enable_close_button()
 
             self._append_log(None, f"[{timestamp}] Installation aborted, you can close this window")
+            self._checkpoint_log()
 
         except Exception as e:
             self._append_log(None, f"[red]❌ Abort handling failed: {str(e)}[/red]")
@@ -2056,8 +2366,14 @@ class AppInstallProgress(ModalScreen):
             if hasattr(self, 'app_installer') and self.app_installer:
                 try:
                     self.app_installer.set_log_ui_callback(None)
+                    self.app_installer.set_log_writer(None)
+                    self.app_installer.set_apt_status_fd(False)
                 except Exception:
                     pass
 
+            # Write out the remaining log lines and close the session log file
+            if self._log_writer is not None:
+                self._log_writer.close()
+
         except Exception as e:
             print(f"Error in on_unmount cleanup: {e}")
\ No newline at end of file
@@ -97,6 +97,8 @@ class MainMenuScreen(Screen):
 
         # Initialize app install specific attributes
         self.app_expanded_suites = set()  # Track which suites are expanded
+        self.app_status_checking = set()  # Applications whose status is still being checked
+        self._app_status_generation = 0  # Bumped per load so stale workers stop updating rows
     
     def watch_selected_segment(self, old_value: str, new_value: str) -> None:
         """React to segment selection changes."""
@@ -292,6 +294,10 @@ class MainMenuScreen(Screen):
         self.call_after_refresh(self._update_help_text)
 
         logger.info("MainMenuScreen mounted successfully")
+
+    def on_unmount(self) -> None:
+        """Stop background watchers when the screen goes away."""
+        self.app_installer.stop_status_watcher()
     
     def _initial_content_load(self) -> None:
         """Load initial content for the default selected segment."""
@@ -700,25 +706,24 @@ class MainMenuScreen(Screen):
 
     @work(exclusive=True, thread=True)
     async def _load_app_install_info(self) -> None:
-        """Load App installation information in background thread."""
-        try:
-            # Get all software items (suites and standalone) with their installation status
-            software_items = self.app_installer.get_all_software_items()
+        """Load App installation information in background thread.
 
-            # Initialize selection state based on current installation status
-            selection_state = {}
-            expanded_suites = set()
+        The list is shown immediately with every row marked as checking;
+        statuses are then filled in as the two-layer checker resolves them.
+        """
+        self._app_status_generation += 1
+        generation = self._app_status_generation
 
-            # Collect all applications for selection state
-            all_applications = self.app_installer._get_all_applications_flat()
-            for app in all_applications:
-                selection_state[app.name] = app.installed
+        try:
+            # Software items are parsed at startup; no status check is needed to show them
+            software_items = self.app_installer.software_items
+            pending_names = {app.name for app in self.app_installer._get_all_applications_flat()}
 
-            # Update cache and loading state on main thread using call_from_thread
-            def update_ui():
+            def show_list():
                 self.app_install_cache = software_items
-                self.app_selection_state = selection_state
-                self.app_expanded_suites = expanded_suites  # Track expanded suites
+                self.app_status_checking = set(pending_names)
+                self.app_selection_state = {}
+                self.app_expanded_suites = set()  # Track expanded suites
                 self.app_install_loading = False
                 self.app_focused_index = 0
                 self._ensure_valid_focus_index()  # Ensure valid focus after data load
@@ -730,13 +735,33 @@ class MainMenuScreen(Screen):
                     self._update_help_text()
                     # Force refresh the UI
                     self.refresh()
-            
-            self.app.call_from_thread(update_ui)
-                
+
+            self.app.call_from_thread(show_list)
+
+            def on_results(batch):
+                if generation == self._app_status_generation:
+                    self.app.call_from_thread(self.app_manager.apply_streamed_statuses, batch)
+
+            # Results arriving while the UI applies a batch are coalesced into the next one
+            self.app_installer.stream_all_status(on_results)
+
+            def finish():
+                if generation != self._app_status_generation:
+                    return
+                if self.app_status_checking:
+                    # Anything the stream did not report is treated as not installed
+                    self.app_manager.apply_streamed_statuses(
+                        {name: False for name in self.app_status_checking}
+                    )
+                self._start_app_status_watcher()
+
+            self.app.call_from_thread(finish)
+
         except Exception as e:
             # Handle errors on main thread
             def update_error():
                 self.app_install_loading = False
+                self.app_status_checking = set()
                 self.app_install_cache = {"error": str(e)}
                 if self.selected_segment == "app_install":
                     self.update_settings_panel()
@@ -745,11 +770,33 @@ class MainMenuScreen(Screen):
 
             self.app.call_from_thread(update_error)
 
+    def _start_app_status_watcher(self) -> None:
+        """Keep app rows in sync with installs done outside this TUI."""
+        def on_status_change(changes: dict) -> None:
+            self.app.call_from_thread(self.app_manager.apply_live_status_updates, changes)
+
+        try:
+            self.app_installer.start_status_watcher(on_status_change)
+        except Exception as e:
+            logger.warning(f"Failed to start package status watcher: {e}")
+
     def _on_install_complete(self, result=None) -> None:
-        """Callback when app installation/uninstallation completes."""
+        """Callback when app installation/uninstallation completes.
+
+        Args:
+            result: Touched-entry report from AppInstallProgress
+                ({"applications": [...], "packages": [...]}), if any
+        """
         from ...utils.logger import get_ui_logger
         logger = get_ui_logger("main_menu")
 
+        cache_loaded = bool(self.app_install_cache) and not isinstance(self.app_install_cache, dict)
+        if isinstance(result, dict) and "applications" in result and cache_loaded:
+            # Only re-verify what the session touched instead of the whole catalog
+            logger.info(f"App install/uninstall completed, re-checking {len(result['applications'])} touched application(s)")
+            self.refresh_app_statuses(result["applications"], result.get("packages", []))
+            return
+
         logger.info("App install/uninstall completed, refreshing app list")
 
         # Reload app install info to reflect new installation status
@@ -762,9 +809,25 @@ class MainMenuScreen(Screen):
             # Update the panel
             self.update_settings_panel()
 
+    @work(thread=True, group="app_status_refresh")
+    def refresh_app_statuses(self, app_names: list, packages: list = ()) -> None:
+        """Re-check only the given applications and update their rows.
 
+        Args:
+            app_names: Names of applications touched by an install/uninstall session
+            packages: Package names the session operated on
+        """
+        if not app_names and not packages:
+            return
 
+        try:
+            results = self.app_installer.refresh_application_status(app_names, packages)
+        except Exception as e:
+            logger.warning(f"Targeted status refresh failed: {e}")
+            return
 
+        if results:
+            self.app.call_from_thread(self.app_manager.apply_streamed_statuses, results, True)
 
     def _build_display_items(self):
         """Build the current display items list based on expansion state."""
@@ -239,6 +239,13 @@ class AppInstallManager:
         item_name = getattr(item, "name", str(item))
         logger.info(f"[APP_INSTALL] Toggle selection for item_type={item_type}, item={item_name}")
 
+        # 状态尚未检测完成的条目不允许切换，避免基于未知状态生成安装/卸载动作
+        checking = getattr(self.screen, "app_status_checking", None) or set()
+        members = item.components if isinstance(item, ApplicationSuite) else [item]
+        if any(member.name in checking for member in members):
+            logger.info(f"[APP_INSTALL] Status of '{item_name}' is still being checked, ignoring toggle")
+            return
+
         if item_type == "suite_or_app" and isinstance(item, ApplicationSuite):
             components = list(getattr(item, "components", []))
             if not components:
@@ -369,8 +376,16 @@ class AppInstallManager:
             logger.error(f"[APP_INSTALL] Error in incremental update: {e}", exc_info=True)
             self._refresh_app_install_view()
 
-    def _update_single_item_status(self, index: int, item, is_selected: bool) -> None:
-        """Update status text for a single item without full refresh."""
+    def _update_single_item_status(self, index: int, item, is_selected: bool,
+                                   matching_containers: Optional[list] = None) -> None:
+        """Update status text for a single item without full refresh.
+
+        Args:
+            index: Display index of the item
+            item: Suite or application shown at that index
+            is_selected: Current selection state of the item
+            matching_containers: Pre-queried row containers, to avoid a DOM query per row
+        """
         from ....utils.logger import get_ui_logger
 
         logger = get_ui_logger("app_install")
@@ -383,8 +398,8 @@ class AppInstallManager:
             suffix = self.screen._app_unique_suffix
             is_right_focused = (self.screen.current_panel_focus == "right")
 
-            containers = list(self.screen.query("Horizontal.app-item-container"))
-            matching_containers = [c for c in containers if f"-{suffix}" in str(c.id)]
+            if matching_containers is None:
+                matching_containers = self._query_row_containers()
 
             if index >= len(matching_containers):
                 logger.warning(f"[APP_INSTALL] Index {index} out of range for containers")
@@ -412,7 +427,9 @@ class AppInstallManager:
                             indent_prefix = "  "
                             break
 
-                if getattr(item, "installed", False) and not is_selected:
+                if item.name in (getattr(self.screen, "app_status_checking", None) or set()):
+                    status_text_core = AppInstallRenderer.CHECKING_STATUS_TEXT
+                elif getattr(item, "installed", False) and not is_selected:
                     status_text_core = "[red]- To Uninstall[/red]"
                 elif getattr(item, "installed", False) and is_selected:
                     status_text_core = "[green]\u2713 Installed[/green]"
@@ -431,18 +448,124 @@ class AppInstallManager:
                 new_text = f"  {status_text_with_indent}"
 
             status_widget.update(new_text)
-            logger.info(
+            logger.debug(
                 f"[APP_INSTALL] Updated status for {getattr(item, 'name', 'unknown')} at index {index}, stored text: {status_text_with_indent[:30]}"
             )
 
         except Exception as e:
             logger.error(f"[APP_INSTALL] Error updating single item: {e}", exc_info=True)
 
+    def apply_live_status_updates(self, changes: Dict[str, bool]) -> None:
+        """Apply externally detected installation status changes row by row.
+
+        Rows whose selection matched the old status follow the new status;
+        pending user selections are kept. Only affected rows are updated.
+
+        Args:
+            changes: Mapping of application name to new installed flag
+        """
+        from ....utils.logger import get_ui_logger
+        logger = get_ui_logger("app_install")
+
+        cache = getattr(self.screen, "app_install_cache", None)
+        if not changes or not cache or isinstance(cache, dict):
+            return
+
+        selection_state = self.screen.app_selection_state
+        updated = set()
+
+        for app in self._iter_cached_applications():
+            if app.name not in changes:
+                continue
+
+            new_installed = changes[app.name]
+            if app.installed == new_installed:
+                continue
+
+            if selection_state.get(app.name, app.installed) == app.installed:
+                selection_state[app.name] = new_installed
+            app.installed = new_installed
+            updated.add(app.name)
+
+        if not updated:
+            return
+
+        logger.info(f"[APP_INSTALL] Live status update for {len(updated)} application(s)")
+        self._update_application_rows(updated)
+
+    def apply_streamed_statuses(self, results: Dict[str, bool], reset_selection: bool = False) -> None:
+        """Fill in statuses arriving from a progressive or targeted status check.
+
+        Each resolved application leaves the "checking" state and its
+        selection starts out matching its installed status.
+
+        Args:
+            results: Mapping of application name to installed flag
+            reset_selection: Also reset existing selections (after the change was applied)
+        """
+        cache = getattr(self.screen, "app_install_cache", None)
+        if not results or not cache or isinstance(cache, dict):
+            return
+
+        checking = getattr(self.screen, "app_status_checking", None)
+        selection_state = self.screen.app_selection_state
+        for app in self._iter_cached_applications():
+            if app.name in results:
+                app.installed = results[app.name]
+                if reset_selection:
+                    selection_state[app.name] = app.installed
+                else:
+                    selection_state.setdefault(app.name, app.installed)
+                if checking is not None:
+                    checking.discard(app.name)
+
+        self._update_application_rows(set(results))
+
+    def _iter_cached_applications(self):
+        """Iterate over every standalone application and suite component in the cache."""
+        for software_item in self.screen.app_install_cache or []:
+            if isinstance(software_item, ApplicationSuite):
+                yield from software_item.components
+            else:
+                yield software_item
+
+    def _query_row_containers(self) -> list:
+        """Get the mounted row containers of the current render, in display order."""
+        suffix = self.screen._app_unique_suffix
+        containers = self.screen.query("Horizontal.app-item-container")
+        return [c for c in containers if f"-{suffix}" in str(c.id)]
+
+    def _update_application_rows(self, names: set) -> None:
+        """Re-render the status of the named applications and of their suites."""
+        # Rows are only mounted while the app install segment is shown
+        if self.screen.selected_segment != "app_install":
+            return
+        if getattr(self.screen, "_app_unique_suffix", None) is None:
+            return
+
+        selection_state = self.screen.app_selection_state
+        matching_containers = self._query_row_containers()
+        display_items = self._build_display_items()
+
+        for index, item_data in enumerate(display_items):
+            _, item, _, _ = self._unpack_display_item(item_data)
+            if isinstance(item, ApplicationSuite):
+                if any(component.name in names for component in item.components):
+                    self._update_single_item_status(index, item, True, matching_containers)
+            elif item.name in names:
+                self._update_single_item_status(
+                    index, item, selection_state.get(item.name, item.installed), matching_containers
+                )
+
     def _determine_suite_status_text(self, suite: ApplicationSuite) -> str:
         """根据套件内部组件的选择状态生成状态文本。"""
         selection_state = self.screen.app_selection_state or {}
         components = list(getattr(suite, "components", []) or [])
 
+        checking = getattr(self.screen, "app_status_checking", None) or set()
+        if any(component.name in checking for component in components):
+            return AppInstallRenderer.CHECKING_STATUS_TEXT
+
         install_targets = 0
         uninstall_targets = 0
         for component in components:
@@ -514,9 +637,10 @@ class AppInstallManager:
 
                 # 批量安装模式：聚合所有待安装组件为单个 action（中文注释：提升安装效率）
                 if batch_supported and install_comps:
-                    packages = []
-                    for comp in install_comps:
-                        packages.extend(comp.get_package_list())
+                    # 去重：同一套件内多个组件可能共享包
+                    packages = list(dict.fromkeys(
+                        package for comp in install_comps for package in comp.get_package_list()
+                    ))
 
                     actions.append({
                         "action": "install",
@@ -12,6 +12,9 @@ from ....modules.software_models import ApplicationSuite
 class AppInstallRenderer:
     """Renders app install UI components."""
 
+    # Shown while an application's installation status is still being checked
+    CHECKING_STATUS_TEXT = "[bright_black]\u2026 Checking[/bright_black]"
+
     @staticmethod
     def display_app_install_list(screen, container: ScrollableContainer, software_items) -> None:
         """Display hierarchical software items list in the container.
@@ -33,6 +36,8 @@ class AppInstallRenderer:
         import time
         unique_suffix = str(int(time.time() * 1000))[-6:]
         screen._app_unique_suffix = unique_suffix
+        checking = getattr(screen, "app_status_checking", None) or set()
+        catalog = getattr(getattr(screen, "app_installer", None), "catalog", None)
 
         # Build display list - always include all components (even if collapsed)
         # We'll control visibility via CSS instead of DOM insertion/removal
@@ -67,14 +72,15 @@ class AppInstallRenderer:
                     screen.app_expanded_suites,
                     arrow,
                     indent,
+                    checking,
                 )
             elif item_type == "component":
                 status_display, content_text = AppInstallRenderer._render_component(
-                    item, screen.app_selection_state, display_items, i, arrow, indent
+                    item, screen.app_selection_state, display_items, i, arrow, indent, checking, catalog
                 )
             else:
                 status_display, content_text = AppInstallRenderer._render_standalone(
-                    item, screen.app_selection_state, arrow, indent
+                    item, screen.app_selection_state, arrow, indent, checking
                 )
 
             # Create horizontal container
@@ -114,6 +120,7 @@ class AppInstallRenderer:
         expanded_suites: set,
         arrow: str,
         indent: str,
+        checking: frozenset = frozenset(),
     ) -> tuple:
         """Render a suite item, reflecting pending install/uninstall actions."""
         expansion_icon = "\u25bc" if item.name in expanded_suites else "\u25b6"
@@ -136,7 +143,9 @@ class AppInstallRenderer:
             elif not component.installed and selected:
                 install_targets += 1
 
-        if install_targets > 0 and uninstall_targets == 0:
+        if any(component.name in checking for component in components):
+            status_text = AppInstallRenderer.CHECKING_STATUS_TEXT
+        elif install_targets > 0 and uninstall_targets == 0:
             status_text = "[yellow]+ Install All[/yellow]"
         elif uninstall_targets > 0 and install_targets == 0:
             status_text = "[red]- Uninstall All[/red]"
@@ -161,29 +170,19 @@ class AppInstallRenderer:
 
     @staticmethod
     def _render_component(item, selection_state: dict, display_items: list, current_index: int,
-                         arrow: str, indent: str) -> tuple:
+                         arrow: str, indent: str, checking: frozenset = frozenset(), catalog=None) -> tuple:
         """Render a component item."""
-        # Determine tree prefix
-        tree_prefix = "├─ "
-        suite_start_index = -1
-        for j in range(current_index - 1, -1, -1):
-            if display_items[j][0] == "suite_or_app":
-                suite_start_index = j
-                break
-
-        if suite_start_index >= 0:
-            suite_components = []
-            for k in range(suite_start_index + 1, len(display_items)):
-                if display_items[k][0] == "component":
-                    suite_components.append(k)
-                elif display_items[k][0] == "suite_or_app":
-                    break
-
-            if suite_components and current_index == suite_components[-1]:
-                tree_prefix = "└─ "
+        # Determine tree prefix (constant time via the compiled catalog)
+        if catalog is not None and catalog.suite_of(item.name) is not None:
+            is_last = catalog.is_last_component(item)
+        else:
+            is_last = AppInstallRenderer._is_last_component_row(display_items, current_index)
+        tree_prefix = "└─ " if is_last else "├─ "
 
         is_selected = selection_state.get(item.name, False)
-        if item.installed and not is_selected:
+        if item.name in checking:
+            status_text = AppInstallRenderer.CHECKING_STATUS_TEXT
+        elif item.installed and not is_selected:
             status_text = "[red]- To Uninstall[/red]"
         elif item.installed and is_selected:
             status_text = "[green]✓ Installed[/green]"
@@ -200,10 +199,34 @@ class AppInstallRenderer:
         return status_display, content_text
 
     @staticmethod
-    def _render_standalone(item, selection_state: dict, arrow: str, indent: str) -> tuple:
+    def _is_last_component_row(display_items: list, current_index: int) -> bool:
+        """Check whether a component row is the last one of its suite by scanning the rows."""
+        suite_start_index = -1
+        for j in range(current_index - 1, -1, -1):
+            if display_items[j][0] == "suite_or_app":
+                suite_start_index = j
+                break
+
+        if suite_start_index < 0:
+            return False
+
+        suite_components = []
+        for k in range(suite_start_index + 1, len(display_items)):
+            if display_items[k][0] == "component":
+                suite_components.append(k)
+            elif display_items[k][0] == "suite_or_app":
+                break
+
+        return bool(suite_components) and current_index == suite_components[-1]
+
+    @staticmethod
+    def _render_standalone(item, selection_state: dict, arrow: str, indent: str,
+                           checking: frozenset = frozenset()) -> tuple:
         """Render a standalone application."""
         is_selected = selection_state.get(item.name, False)
-        if item.installed and not is_selected:
+        if item.name in checking:
+            status_text = AppInstallRenderer.CHECKING_STATUS_TEXT
+        elif item.installed and not is_selected:
             status_text = "[red]- To Uninstall[/red]"
         elif item.installed and is_selected:
             status_text = "[green]✓ Installed[/green]"
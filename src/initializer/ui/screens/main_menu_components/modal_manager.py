@@ -3,6 +3,8 @@
 This module handles all modal dialog creation and interaction.
 """
 
+from typing import List, Optional
+
 
 class ModalManager:
     """Manages modal dialogs."""
@@ -42,8 +44,51 @@ class ModalManager:
         screen.app.push_screen(modal)
 
     @staticmethod
-    def show_single_app_confirmation(screen, actions: list) -> None:
-        """Show confirmation modal for single app change."""
+    def resume_install_session(screen) -> None:
+        """Offer the incomplete tasks of an interrupted install session (initializer --resume)."""
+        from ....modules.install_journal import InstallJournal, restore_actions
+        from ....utils.logger import get_ui_logger
+        logger = get_ui_logger("main_menu")
+
+        state = InstallJournal(screen.app_installer.state_dir).load()
+        if state is None or state.finished or not state.incomplete_tasks:
+            logger.info("No interrupted install session to resume")
+            screen._show_message("No interrupted install session to resume")
+            return
+
+        def restore() -> None:
+            # 中断时正在运行的任务需要先通过包检查重新核验，放到后台线程执行
+            try:
+                actions, notes = restore_actions(state, screen.app_installer)
+            except Exception as e:
+                logger.error(f"Failed to restore install session {state.session}: {e}", exc_info=True)
+                screen.app.call_from_thread(screen._show_message, "Failed to resume install session", True)
+                return
+
+            for note in notes:
+                logger.info(f"Resuming session {state.session}: {note}")
+
+            def show() -> None:
+                if not actions:
+                    skipped = f" ({len(notes)} task(s) not run again, see the log)" if notes else ""
+                    screen._show_message(f"Interrupted install session had nothing left to do{skipped}")
+                    return
+                screen._show_message(f"Resuming install session {state.session}: {len(actions)} task(s) left")
+                ModalManager.show_single_app_confirmation(screen, actions, notes)
+
+            screen.app.call_from_thread(show)
+
+        screen.run_worker(restore, thread=True, group="resume_session")
+
+    @staticmethod
+    def show_single_app_confirmation(screen, actions: list, notes: Optional[List[str]] = None) -> None:
+        """Show confirmation modal for single app change.
+
+        Args:
+            screen: Main menu screen
+            actions: Actions to confirm
+            notes: Notes shown above the actions (tasks of a resumed session that are not run)
+        """
         if not actions:
             return
 
@@ -62,7 +107,7 @@ class ModalManager:
 
         try:
             from ..app_install_confirm import AppInstallConfirm
-            confirm_modal = AppInstallConfirm(actions, on_confirm_callback, screen.app_installer)
+            confirm_modal = AppInstallConfirm(actions, on_confirm_callback, screen.app_installer, notes)
             screen.app.push_screen(confirm_modal)
         except Exception as e:
             from ....utils.logger import get_ui_logger
@@ -9,6 +9,7 @@ import shutil
 import subprocess
 from typing import List, Tuple, Dict
 
+from ...modules.apt_update_policy import AptUpdatePolicy
 from ...utils.logger import get_ui_logger
 
 class PackageMirrorUpdater:
@@ -192,6 +193,9 @@ class PackageMirrorUpdater:
         result['modified_sources_d'] = self._update_sources_list_d_directory(backup_suffix)
 
         self.logger.info(f"Mirror change process completed. Results: {result}")
+        if result['modified_main'] or result['modified_sources_d']:
+            # 旧镜像的包列表已失效，下次安装前需重新执行 apt update
+            AptUpdatePolicy().invalidate(f"mirror changed to {self.new_mirror_url}")
         return result
         
     def _update_ubuntu_sources_deb822(self, backup_suffix: str) -> bool:
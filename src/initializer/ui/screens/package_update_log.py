@@ -7,10 +7,14 @@ from textual import on, work
 from textual.app import ComposeResult
 from textual.containers import Container, Vertical, ScrollableContainer
 from textual.screen import ModalScreen
-from textual.widgets import Static, Rule
+from textual.widgets import Static, Rule, ProgressBar
 from textual.events import Key
 from typing import Callable, Optional
 
+from ...modules.apt_update_policy import AptUpdatePolicy
+from ...modules.install_progress import InstallProgressParser
+from ...utils.stream_reader import iter_pipe_batches, strip_ansi
+
 
 class PackageUpdateLog(ModalScreen):
     """Full-screen screen for displaying package update progress and logs."""
@@ -21,6 +25,17 @@ class PackageUpdateLog(ModalScreen):
         align: center middle;
     }
 
+    #update-progress {
+        height: 1;
+        padding: 0 1;
+    }
+
+    #progress-detail {
+        height: 1;
+        padding: 0 1;
+        color: $text-muted;
+    }
+
     #log-content-area {
         height: 1fr;
         overflow-y: auto;
@@ -77,6 +92,10 @@ class PackageUpdateLog(ModalScreen):
             yield Static("APT Update Progress", id="modal-title")
             yield Rule()
 
+            # Repository download progress
+            yield ProgressBar(total=100, show_eta=False, id="update-progress")
+            yield Static("", id="progress-detail", markup=False)
+
             # Log content area - full height
             with ScrollableContainer(id="log-content-area"):
                 with Vertical(id="log-output"):
@@ -235,14 +254,16 @@ class PackageUpdateLog(ModalScreen):
             pass
     
     def update_progress(self, current: int, total: int, status: str = "") -> None:
-        """This method is kept for compatibility but does nothing."""
-        # Update internal tracking variables but don't display anything
+        """Update the progress bar and the status line below it."""
         try:
             if total > 0:
                 progress = min(int((current / total) * 100), 100)
                 self.current_progress = progress
                 self.current_package = current
                 self.total_packages = total
+                self.query_one("#update-progress", ProgressBar).update(progress=progress)
+                if status:
+                    self.query_one("#progress-detail", Static).update(status)
         except Exception:
             pass
     
@@ -298,52 +319,62 @@ class PackageUpdateLog(ModalScreen):
         self.app.call_from_thread(log_start)
         
         try:
-            # Start apt update process
+            # Start apt update process; APT::Status-Fd=1 adds machine-readable
+            # download progress (dlstatus records) to the output
             process = subprocess.Popen(
-                ["apt", "update"],
+                ["apt", "-o", "APT::Status-Fd=1", "update"],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
             )
-            
+
+            parser = InstallProgressParser("apt", download_only=True)
             line_count = 0
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                
-                if output:
-                    line = output.strip()
+            # 按块读取并整批交给 UI：call_from_thread 会阻塞到 UI 处理完，
+            # UI 繁忙时管道写满，apt 自然被阻塞（背压）
+            for batch in iter_pipe_batches(process.stdout):
+                updates = []
+                for stream_line in batch:
+                    line, status = parser.feed(strip_ansi(stream_line.text).strip())
+                    if status is not None:
+                        # Status records are shown on the progress bar, not in the log
+                        updates.append((None, int(status.percent), 100, status.detail, line_count))
                     if line and len(line) > 2:  # Skip very short lines
                         line_count += 1
-                        
-                        # Parse progress information
-                        current, total, status = self.parse_apt_progress(line)
-                        
-                        def update_ui(msg=line, curr=current, tot=total, stat=status, count=line_count):
-                            # Add log line only
+                        if parser.has_progress:
+                            updates.append((line, None, None, "", None))
+                        else:
+                            updates.append((line, *self.parse_apt_progress(line), line_count))
+                if not updates:
+                    continue
+
+                def update_ui(updates=updates):
+                    for msg, curr, tot, stat, count in updates:
+                        if msg is not None:
                             self.add_log_line(f"  {msg}")
 
-                            # Update progress silently for internal tracking
-                            if curr is not None and tot is not None:
-                                self.update_progress(curr, tot, stat)
-                            else:
-                                # Fallback: use line count for internal tracking
-                                estimated_progress = min(int((count / 80) * 90), 90)
-                                if estimated_progress > self.current_progress:
-                                    self.update_progress(estimated_progress, 100, f"Processing line {count}")
-
-                        self.app.call_from_thread(update_ui)
-            
-            return_code = process.poll()
+                        if count is None:
+                            continue  # Progress comes from the status records
+                        if curr is not None and tot is not None:
+                            self.update_progress(curr, tot, stat)
+                        else:
+                            # Fallback: estimate from the line count
+                            estimated_progress = min(int((count / 80) * 90), 90)
+                            if estimated_progress > self.current_progress:
+                                self.update_progress(estimated_progress, 100, f"Processing line {count}")
+
+                self.app.call_from_thread(update_ui)
+
+            return_code = process.wait()
+            if return_code == 0:
+                # Install sessions within the freshness window skip their own update
+                AptUpdatePolicy().mark_updated()
             
             def update_completion():
                 self.apt_is_running = False
                 self.is_completed = True
 
                 if return_code == 0:
+                    self.update_progress(100, 100, "Package lists updated")
                     self.add_log_line("✅ APT update completed successfully!", "success")
                     self.callback(True, f"APT update completed successfully ({line_count} operations)")
                 else:
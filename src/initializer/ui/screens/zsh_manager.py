@@ -17,6 +17,7 @@ from ...modules.zsh_manager import (
     TmuxInfo,
     ZshManager,
 )
+from ...utils.async_runtime import get_runtime
 from ...utils.logger import get_ui_logger
 
 logger = get_ui_logger("zsh_management")
@@ -935,22 +936,15 @@ class ZshManagementPanel(Widget):
                 logger.error(f"Failed to detect shell configs: {exc}", exc_info=True)
                 return []
 
-        # 在后台线程中执行配置检测
-        @work(exclusive=True, thread=True)
-        def detect_configs_worker():
-            """工作线程中检测配置。"""
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                result = loop.run_until_complete(detect_configs())
-                return result
-            finally:
-                loop.close()
+        # 在共享的后台事件循环中执行配置检测，完成后回到 UI 线程处理结果
+        def on_detected(future) -> None:
+            if future.cancelled():
+                return
+            configs = future.result() if future.exception() is None else []
+            self.app.call_from_thread(self._handle_config_detection_result, configs)
 
-        # 启动配置检测
-        worker = detect_configs_worker()
-        worker.add_callback(self._handle_config_detection_result)
+        future = get_runtime().submit(detect_configs(), name="detect_shell_configs")
+        future.add_done_callback(on_detected)
 
     def _handle_config_detection_result(self, configs) -> None:
         """处理配置检测结果。"""
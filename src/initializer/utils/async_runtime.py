@@ -0,0 +1,230 @@
+"""Process-wide background event loop for running coroutines from synchronous code."""
+
+import asyncio
+import concurrent.futures
+import itertools
+import os
+import threading
+from typing import Any, Awaitable, Dict, List, Optional
+
+from .logger import get_utils_logger
+
+
+class BackgroundRuntime:
+    """A persistent asyncio loop on a daemon thread plus a sized executor.
+
+    UI workers, watcher threads and other synchronous callers hand their
+    coroutines to this loop instead of creating a thread and an event loop
+    per call. Blocking helpers awaited via run_in_executor share the same
+    bounded executor, and every submitted coroutine is tracked so in-flight
+    background work can be observed and cancelled in one place.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """Initialize the runtime (the loop thread starts lazily).
+
+        Args:
+            max_workers: Size of the default executor (None = min(32, cpu + 4))
+        """
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.logger = get_utils_logger("async_runtime")
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._started = threading.Event()
+
+        self._counter = itertools.count(1)
+        self._in_flight: Dict[int, Any] = {}
+        self._in_flight_names: Dict[int, str] = {}
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0}
+
+    @property
+    def is_running(self) -> bool:
+        """Check whether the loop thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """Start the loop thread if needed.
+
+        Returns:
+            The runtime's event loop
+        """
+        with self._lock:
+            if self.is_running and self._loop is not None:
+                return self._loop
+
+            self._started.clear()
+            self._loop = asyncio.new_event_loop()
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="runtime-worker"
+            )
+            self._loop.set_default_executor(self._executor)
+            self._thread = threading.Thread(target=self._run_loop, name="background-runtime", daemon=True)
+            self._thread.start()
+            self._started.wait()
+            self.logger.debug(f"Background runtime started ({self.max_workers} executor workers)")
+            return self._loop
+
+    def _run_loop(self) -> None:
+        """Loop thread main function."""
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(self._started.set)
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    def in_runtime_thread(self) -> bool:
+        """Check whether the caller is running on the runtime's loop thread."""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Awaitable, name: Optional[str] = None) -> concurrent.futures.Future:
+        """Schedule a coroutine on the background loop.
+
+        Args:
+            coro: Coroutine to run
+            name: Label shown in in_flight() (defaults to the coroutine name)
+
+        Returns:
+            concurrent.futures.Future for the result; cancelling it cancels the task
+        """
+        loop = self.start()
+        task_id = next(self._counter)
+        label = name or getattr(coro, "__qualname__", None) or repr(coro)
+
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        with self._lock:
+            self._in_flight[task_id] = future
+            self._in_flight_names[task_id] = label
+            self.stats["submitted"] += 1
+        future.add_done_callback(lambda done: self._on_done(task_id, done))
+        return future
+
+    def run_sync(self, coro: Awaitable, timeout: Optional[float] = None, name: Optional[str] = None) -> Any:
+        """Run a coroutine on the background loop and block until it finishes.
+
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait before cancelling (None = no limit)
+            name: Label shown in in_flight()
+
+        Returns:
+            The coroutine's result
+
+        Raises:
+            RuntimeError: If called from the runtime's own loop thread (would deadlock)
+            concurrent.futures.TimeoutError: If the timeout expired (the task is cancelled)
+        """
+        if self.in_runtime_thread():
+            coro.close()
+            raise RuntimeError("run_sync() cannot be called from the background runtime thread")
+
+        future = self.submit(coro, name)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # 超时或调用方被中断时，同时取消后台任务
+            future.cancel()
+            raise
+
+    def _on_done(self, task_id: int, future: concurrent.futures.Future) -> None:
+        """Bookkeeping for finished tasks."""
+        with self._lock:
+            self._in_flight.pop(task_id, None)
+            label = self._in_flight_names.pop(task_id, "")
+            if future.cancelled():
+                self.stats["cancelled"] += 1
+            elif future.exception() is not None:
+                self.stats["failed"] += 1
+            else:
+                self.stats["completed"] += 1
+
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.debug(f"Background task '{label}' failed: {future.exception()}")
+
+    def in_flight(self) -> List[str]:
+        """Get the labels of background tasks that have not finished yet."""
+        with self._lock:
+            return list(self._in_flight_names.values())
+
+    def cancel_all(self) -> int:
+        """Cancel every in-flight background task.
+
+        Returns:
+            Number of tasks a cancellation was requested for
+        """
+        with self._lock:
+            futures = list(self._in_flight.values())
+        return sum(1 for future in futures if future.cancel())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get runtime state and task counters."""
+        with self._lock:
+            return {
+                "running": self.is_running,
+                "executor_workers": self.max_workers,
+                "in_flight": len(self._in_flight),
+                **self.stats,
+            }
+
+    def shutdown(self, timeout: float = 2.0) -> None:
+        """Cancel outstanding work, wait for it to unwind and stop the loop thread.
+
+        Args:
+            timeout: Maximum seconds to wait for cancelled tasks and the loop thread
+        """
+        with self._lock:
+            loop, thread, executor = self._loop, self._thread, self._executor
+            self._thread = None
+        if loop is None or thread is None:
+            return
+
+        async def cancel_and_stop() -> None:
+            # 在事件循环内逐个取消任务（每个任务只取消一次，避免打断其 finally 块），
+            # 并等待它们执行完清理逻辑后再停止事件循环
+            current = asyncio.current_task()
+            tasks = [task for task in asyncio.all_tasks() if task is not current]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.wait(tasks, timeout=timeout)
+            loop.stop()
+
+        try:
+            asyncio.run_coroutine_threadsafe(cancel_and_stop(), loop)
+        except RuntimeError:
+            pass  # Loop already closed
+        thread.join(timeout + 1.0)
+        if thread.is_alive():
+            # 事件循环被阻塞：至少让等待结果的调用方不再挂起
+            self.logger.warning("Background runtime did not stop in time")
+            self.cancel_all()
+            try:
+                loop.call_soon_threadsafe(loop.stop)
+            except RuntimeError:
+                pass
+        if executor is not None:
+            executor.shutdown(wait=False)
+        self.logger.debug("Background runtime stopped")
+
+
+_runtime: Optional[BackgroundRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> BackgroundRuntime:
+    """Get the process-wide background runtime."""
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = BackgroundRuntime()
+    return _runtime
+
+
+def shutdown_runtime(timeout: float = 2.0) -> None:
+    """Stop the process-wide background runtime if it was started."""
+    if _runtime is not None:
+        _runtime.shutdown(timeout)
@@ -4,6 +4,7 @@ from datetime import datetime
 from typing import Optional, Callable
 from enum import Enum
 
+from .log_writer import BufferedLogWriter
 from .logger import get_utils_logger
 
 
@@ -17,13 +18,15 @@ class LogLevel(Enum):
 
 
 class InstallationLogManager:
-    """Simplified installation log manager that only outputs to UI display."""
+    """Simplified installation log manager that outputs to UI display and the session log file."""
 
-    def __init__(self, ui_callback: Optional[Callable[[str, str], None]] = None):
+    def __init__(self, ui_callback: Optional[Callable[[str, str], None]] = None,
+                 log_writer: Optional[BufferedLogWriter] = None):
         """Initialize the simplified log manager.
 
         Args:
             ui_callback: Optional callback function to display logs in UI (message, log_type)
+            log_writer: Optional session log file writer receiving full log records
         """
         # Initialize logger for internal use
         self.logger = get_utils_logger("log_manager")
@@ -31,6 +34,9 @@ class InstallationLogManager:
         # UI callback for displaying logs in progress modal
         self.ui_callback = ui_callback
 
+        # Session log file writer (UI shows a shortened view, the file keeps full output)
+        self.log_writer = log_writer
+
         # Session tracking (simplified)
         self.session_active = False
         self.session_id = None
@@ -51,6 +57,7 @@ class InstallationLogManager:
         self.session_active = True
 
         self._log_to_ui(f"Installation session started - package manager: {package_manager}", "info")
+        self._log_to_file(f"Installation session {self.session_id} started - package manager: {package_manager}")
 
         return self.session_id
 
@@ -60,6 +67,9 @@ class InstallationLogManager:
             return
 
         self._log_to_ui("Installation session completed", "info")
+        self._log_to_file(f"Installation session {self.session_id} completed")
+        if self.log_writer:
+            self.log_writer.checkpoint()
 
         self.session_active = False
         self.session_id = None
@@ -122,6 +132,15 @@ class InstallationLogManager:
 
         self.logger.info(detailed_log)
 
+        # Full record for the session log file
+        self._log_to_file(f"{level.value}: {full_message}")
+        if command:
+            self._log_to_file(f"  Command: {command}")
+        if output and output.strip():
+            self._log_to_file("\n".join(f"  | {line}" for line in output.strip().split("\n")))
+        if error and error.strip():
+            self._log_to_file("\n".join(f"  ! {line}" for line in error.strip().split("\n")))
+
     def set_total_apps(self, count: int) -> None:
         """Set the total number of applications to be processed.
 
@@ -130,6 +149,7 @@ class InstallationLogManager:
         """
         if self.session_active:
             self._log_to_ui(f"Starting installation session - {count} tasks", "info")
+            self._log_to_file(f"Starting installation session - {count} tasks")
 
     def set_ui_callback(self, callback: Callable[[str, str], None]) -> None:
         """Set the UI callback function for displaying logs.
@@ -139,6 +159,14 @@ class InstallationLogManager:
         """
         self.ui_callback = callback
 
+    def set_log_writer(self, log_writer: Optional[BufferedLogWriter]) -> None:
+        """Set the session log file writer.
+
+        Args:
+            log_writer: Writer receiving full log records, or None to stop file logging
+        """
+        self.log_writer = log_writer
+
     def _log_to_ui(self, message: str, log_type: str) -> None:
         """Send log message to UI if callback is available.
 
@@ -152,6 +180,15 @@ class InstallationLogManager:
             except Exception as e:
                 self.logger.error(f"Failed to send log to UI: {e}")
 
+    def _log_to_file(self, message: str) -> None:
+        """Queue a log record for the session log file if a writer is set.
+
+        Args:
+            message: Record text (may span several lines)
+        """
+        if self.log_writer:
+            self.log_writer.write(message)
+
     def _convert_log_level_to_ui_type(self, level: LogLevel) -> str:
         """Convert LogLevel enum to UI log type string.
 
@@ -0,0 +1,265 @@
+"""Buffered background writer for session log files."""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+from .logger import get_utils_logger
+from .stream_reader import strip_ansi
+
+
+# The byte offset of every LINE_INDEX_STEP-th line is kept for reading lines back by number
+LINE_INDEX_STEP = 1024
+
+
+def has_line_prefix(line: str) -> bool:
+    """Check whether a log line already starts with a timestamp or separator."""
+    stripped = line.strip()
+    return stripped.startswith("[") or stripped.startswith("=")
+
+
+class _Marker:
+    """Queue item asking the writer thread to flush (and optionally fsync)."""
+
+    def __init__(self, sync: bool, close: bool = False):
+        self.sync = sync
+        self.close = close
+        self.done = threading.Event()
+
+
+class BufferedLogWriter:
+    """Append log messages to a file from a single background thread.
+
+    Callers only enqueue; the writer thread owns the one open file handle,
+    sanitizes messages (carriage returns, ANSI escapes, blank lines),
+    prefixes timestamps taken when the message was queued, and writes in
+    batches. Buffered data is flushed every flush_interval seconds, on
+    flush() and on close(); checkpoint() additionally fsyncs so everything
+    logged so far survives a crash of the machine, not just of the process.
+
+    Lines are numbered when they are queued: write() returns the file line
+    number of a message's first line, and line_position() maps line numbers
+    to byte offsets so pages of the file can be read back without scanning
+    it from the start.
+    """
+
+    def __init__(self, path: Union[str, Path], flush_interval: float = 0.5,
+                 is_prefixed: Callable[[str], bool] = has_line_prefix):
+        """Initialize the writer and open the file.
+
+        Args:
+            path: Log file (created if missing, appended to otherwise)
+            flush_interval: Maximum seconds buffered output stays in memory
+            is_prefixed: Returns True for lines that must not get a timestamp
+
+        Raises:
+            OSError: If the file cannot be opened
+        """
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.is_prefixed = is_prefixed
+        self.logger = get_utils_logger("log_writer")
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8", buffering=65536)
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._closed = False
+
+        # Line numbering: queued lines (caller side) and the byte offset index (writer thread)
+        self._lock = threading.Lock()
+        self._line_offsets: List[int] = []
+        self._written_lines = 0
+        self._size = 0
+        self._index_existing_lines()
+        self._queued_lines = self._written_lines
+
+        self._thread = threading.Thread(target=self._run, name=f"log-writer:{self.path.name}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def line_count(self) -> int:
+        """Get the number of lines in the file once everything queued is written."""
+        return self._queued_lines
+
+    def write(self, message: str) -> Optional[int]:
+        """Queue a message (may contain several lines) for writing.
+
+        Args:
+            message: Message text
+
+        Returns:
+            File line number (0-based) of the message's first line, or None when closed
+        """
+        if self._closed:
+            return None
+        lines = self._split(message)
+        with self._lock:
+            first_line = self._queued_lines
+            self._queued_lines += len(lines)
+            self._queue.put((time.time(), lines))
+        return first_line
+
+    def line_position(self, line: int) -> Tuple[int, int]:
+        """Get the nearest indexed line at or before a line.
+
+        Args:
+            line: File line number (0-based)
+
+        Returns:
+            (line number, byte offset) of an indexed line to start reading from
+        """
+        with self._lock:
+            if not self._line_offsets:
+                return 0, 0
+            slot = min(max(0, line) // LINE_INDEX_STEP, len(self._line_offsets) - 1)
+            return slot * LINE_INDEX_STEP, self._line_offsets[slot]
+
+    def flush(self, timeout: Optional[float] = 5.0) -> None:
+        """Write everything queued so far to the file (without fsync).
+
+        Args:
+            timeout: Maximum seconds to wait for the writer thread
+        """
+        self._request(_Marker(sync=False), timeout)
+
+    def checkpoint(self, wait: bool = False, timeout: Optional[float] = 5.0) -> None:
+        """Flush and fsync everything queued so far.
+
+        Args:
+            wait: Block until the data is on disk
+            timeout: Maximum seconds to wait when blocking
+        """
+        self._request(_Marker(sync=True), timeout if wait else 0)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Write and fsync the remaining messages, then close the file.
+
+        Args:
+            timeout: Maximum seconds to wait for the writer thread
+        """
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._queue.put(_Marker(sync=True, close=True))
+        self._thread.join(timeout)
+
+    def _request(self, marker: _Marker, timeout: Optional[float]) -> None:
+        """Queue a flush marker and optionally wait for it to be handled."""
+        if self._closed:
+            return
+        self._queue.put(marker)
+        if timeout != 0 and threading.current_thread() is not self._thread:
+            marker.done.wait(timeout)
+
+    def _run(self) -> None:
+        """Writer thread: drain the queue in batches until closed."""
+        dirty_since: Optional[float] = None
+        while True:
+            timeout = None if dirty_since is None else max(0.0, dirty_since + self.flush_interval - time.monotonic())
+            try:
+                items = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                self._flush_file(sync=False)
+                dirty_since = None
+                continue
+
+            # 取出当前队列中的全部内容，合并为一次写入
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            chunks: List[str] = []
+            for item in items:
+                if isinstance(item, _Marker):
+                    self._write_chunks(chunks)
+                    chunks = []
+                    self._flush_file(sync=item.sync)
+                    dirty_since = None
+                    item.done.set()
+                    if item.close:
+                        self._close_file()
+                        return
+                else:
+                    chunks.extend(self._format(*item))
+
+            if chunks:
+                self._write_chunks(chunks)
+                if dirty_since is None:
+                    dirty_since = time.monotonic()
+
+    @staticmethod
+    def _split(message: str) -> List[str]:
+        """Sanitize a message and split it into the lines written to the file."""
+        # Only apt's "Reading database" progress uses \r as a line separator
+        if "Reading database" in message and "\r" in message:
+            message = message.replace("\r", "\n")
+        else:
+            message = message.replace("\r", "")
+        message = strip_ansi(message)
+
+        # Don't strip to preserve indentation, but skip completely empty lines
+        return [line for line in message.split("\n") if line.strip()]
+
+    def _format(self, created: float, lines: List[str]) -> List[str]:
+        """Prefix the lines of a message with the time it was queued."""
+        timestamp = datetime.fromtimestamp(created).strftime("%H:%M:%S")
+        return [f"{line}\n" if self.is_prefixed(line) else f"[{timestamp}] {line}\n" for line in lines]
+
+    def _index_existing_lines(self) -> None:
+        """Index the lines already in the file (when appending to an existing log)."""
+        raw = b""
+        try:
+            with open(self.path, "rb") as f:
+                for raw in f:
+                    self._index_line(len(raw))
+        except OSError as e:
+            self.logger.warning(f"Failed to index log file {self.path}: {e}")
+        if raw and not raw.endswith(b"\n"):
+            # Terminate a cut-off last line so the next message starts a line of its own
+            self._file.write("\n")
+            self._size += 1
+
+    def _index_line(self, size: int) -> None:
+        """Account for one line of size bytes written at the end of the file."""
+        if self._written_lines % LINE_INDEX_STEP == 0:
+            self._line_offsets.append(self._size)
+        self._written_lines += 1
+        self._size += size
+
+    def _write_chunks(self, chunks: List[str]) -> None:
+        """Write formatted lines to the file."""
+        if not chunks:
+            return
+        try:
+            self._file.write("".join(chunks))
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Failed to write log file {self.path}: {e}")
+            return
+        with self._lock:
+            for chunk in chunks:
+                self._index_line(len(chunk.encode("utf-8")))
+
+    def _flush_file(self, sync: bool) -> None:
+        """Flush the file buffer, optionally forcing it to disk."""
+        try:
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Failed to flush log file {self.path}: {e}")
+
+    def _close_file(self) -> None:
+        """Close the file handle."""
+        try:
+            self._file.close()
+        except OSError as e:
+            self.logger.warning(f"Failed to close log file {self.path}: {e}")
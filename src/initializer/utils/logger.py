@@ -29,20 +29,24 @@ class LoggerManager:
             self.config_dir: Optional[Path] = None
             self.debug_mode: bool = False
             self.console: Optional[Console] = None
+            self.console_level: Optional[str] = None
             self._loggers: Dict[str, logging.Logger] = {}
             LoggerManager._initialized = True
 
-    def initialize(self, config_dir: Path, debug: bool = False, console: Optional[Console] = None) -> None:
+    def initialize(self, config_dir: Path, debug: bool = False, console: Optional[Console] = None,
+                   console_level: Optional[str] = None) -> None:
         """Initialize the logging system.
 
         Args:
             config_dir: Configuration directory path
             debug: Enable debug mode
             console: Rich console instance for consistent output
+            console_level: Console handler level overriding the configuration (e.g. "WARNING")
         """
         self.config_dir = config_dir
         self.debug_mode = debug
         self.console = console or Console()
+        self.console_level = console_level
 
         # Create logs directory in project root
         logs_dir = Path("logs")
@@ -125,7 +129,7 @@ class LoggerManager:
             show_time=False,  # Rich console handles time display
             enable_link_path=True
         )
-        console_handler.setLevel(getattr(logging, config['console_level']))
+        console_handler.setLevel(getattr(logging, self.console_level or config['console_level']))
         console_formatter = logging.Formatter(config['format']['console'])
         console_handler.setFormatter(console_formatter)
         root_logger.addHandler(console_handler)
@@ -189,15 +193,17 @@ class LoggerManager:
 logger_manager = LoggerManager()
 
 
-def init_logging(config_dir: Path, debug: bool = False, console: Optional[Console] = None) -> None:
+def init_logging(config_dir: Path, debug: bool = False, console: Optional[Console] = None,
+                 console_level: Optional[str] = None) -> None:
     """Initialize the logging system.
 
     Args:
         config_dir: Configuration directory path
         debug: Enable debug mode
         console: Rich console instance
+        console_level: Console handler level overriding the configuration
     """
-    logger_manager.initialize(config_dir, debug, console)
+    logger_manager.initialize(config_dir, debug, console, console_level)
 
 
 def get_logger(name: str) -> logging.Logger:
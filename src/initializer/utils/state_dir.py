@@ -0,0 +1,20 @@
+"""Location of the state kept between runs (caches, journals, update records)."""
+
+import os
+from pathlib import Path
+
+
+def get_state_dir() -> Path:
+    """Get the directory for state that later runs must find again.
+
+    Uses $XDG_STATE_HOME/initializer, or ~/.local/state/initializer, so the
+    location does not depend on the directory the tool is started from.
+
+    Returns:
+        State directory (not created)
+    """
+    xdg_state_home = os.environ.get("XDG_STATE_HOME")
+    # XDG 规范要求忽略相对路径
+    if xdg_state_home and os.path.isabs(xdg_state_home):
+        return Path(xdg_state_home) / "initializer"
+    return Path.home() / ".local" / "state" / "initializer"
@@ -0,0 +1,143 @@
+"""Chunked subprocess output reading with \\n/\\r line splitting."""
+
+import asyncio
+import codecs
+import os
+import re
+from typing import AsyncIterator, BinaryIO, Iterator, List, NamedTuple
+
+
+ANSI_ESCAPE_PATTERN = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+LINE_BREAK_PATTERN = re.compile(r"\r\n|\r|\n")
+
+
+class StreamLine(NamedTuple):
+    """One line of process output.
+
+    Attributes:
+        text: Line content without its terminator
+        transient: True if the line ended with a bare carriage return, i.e.
+            the program will overwrite it (progress bars and counters)
+    """
+    text: str
+    transient: bool = False
+
+
+def strip_ansi(text: str) -> str:
+    """Remove ANSI escape sequences (colors, cursor movement) from text."""
+    return ANSI_ESCAPE_PATTERN.sub("", text)
+
+
+class LineSplitter:
+    """Incrementally split a byte stream into lines on \\n, \\r\\n and bare \\r.
+
+    Bytes are decoded incrementally, so multi-byte characters split across
+    chunks are handled. A line longer than max_line_length is emitted in
+    pieces, so a program writing without newlines cannot grow the buffer
+    without bound.
+    """
+
+    def __init__(self, max_line_length: int = 4096, encoding: str = "utf-8"):
+        """Initialize the splitter.
+
+        Args:
+            max_line_length: Maximum characters buffered for one line
+            encoding: Output encoding (undecodable bytes are replaced)
+        """
+        self.max_line_length = max_line_length
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._buffer = ""
+
+    def feed(self, data: bytes) -> List[StreamLine]:
+        """Add a chunk of output and return the lines it completed."""
+        text = self._buffer + self._decoder.decode(data)
+        lines = []
+        position = 0
+        for match in LINE_BREAK_PATTERN.finditer(text):
+            if match.group() == "\r" and match.end() == len(text):
+                # A trailing \r may be the first half of \r\n in the next chunk
+                break
+            lines.append(StreamLine(text[position:match.start()], match.group() == "\r"))
+            position = match.end()
+
+        rest = text[position:]
+        while len(rest) > self.max_line_length:
+            lines.append(StreamLine(rest[:self.max_line_length]))
+            rest = rest[self.max_line_length:]
+        self._buffer = rest
+        return lines
+
+    def flush(self) -> List[StreamLine]:
+        """Return the final unterminated line, if any, at end of stream."""
+        text = self._buffer + self._decoder.decode(b"", final=True)
+        self._buffer = ""
+        if text.endswith("\r"):
+            return [StreamLine(text[:-1], True)]
+        return [StreamLine(text)] if text else []
+
+
+def collapse_transient(lines: List[StreamLine]) -> List[StreamLine]:
+    """Drop transient lines that a later line in the same batch overwrote.
+
+    Only the newest state of a progress counter is worth rendering; this is
+    what keeps fast \\r progress output from flooding the UI.
+    """
+    return [line for index, line in enumerate(lines) if not line.transient or index == len(lines) - 1]
+
+
+async def iter_stream_batches(stream: asyncio.StreamReader, chunk_size: int = 65536,
+                              max_line_length: int = 4096) -> AsyncIterator[List[StreamLine]]:
+    """Yield the lines completed by each chunk read from an asyncio stream.
+
+    Reading waits for data instead of polling. The consumer handles one
+    batch before the next read, so a slow consumer lets the pipe fill and
+    the producing process blocks (backpressure).
+
+    Args:
+        stream: Subprocess stdout/stderr stream
+        chunk_size: Maximum bytes read at once
+        max_line_length: Maximum characters buffered for one line
+
+    Yields:
+        Non-empty lists of lines with overwritten transient lines removed
+    """
+    splitter = LineSplitter(max_line_length)
+    while True:
+        chunk = await stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = collapse_transient(splitter.feed(chunk))
+        if lines:
+            yield lines
+
+    tail = splitter.flush()
+    if tail:
+        yield tail
+
+
+def iter_pipe_batches(pipe: BinaryIO, chunk_size: int = 65536,
+                      max_line_length: int = 4096) -> Iterator[List[StreamLine]]:
+    """Blocking counterpart of iter_stream_batches for subprocess.Popen pipes.
+
+    Args:
+        pipe: Binary pipe (Popen created without text=True)
+        chunk_size: Maximum bytes read at once
+        max_line_length: Maximum characters buffered for one line
+
+    Yields:
+        Non-empty lists of lines with overwritten transient lines removed
+    """
+    splitter = LineSplitter(max_line_length)
+    fd = pipe.fileno()
+    while True:
+        # os.read returns as soon as any data is available
+        chunk = os.read(fd, chunk_size)
+        if not chunk:
+            break
+        lines = collapse_transient(splitter.feed(chunk))
+        if lines:
+            yield lines
+
+    tail = splitter.flush()
+    if tail:
+        yield tail
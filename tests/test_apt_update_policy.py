@@ -0,0 +1,121 @@
+"""Tests for the apt package list freshness policy."""
+
+import os
+import time
+
+import pytest
+
+from initializer.modules.apt_update_policy import AptUpdatePolicy
+
+
+def set_age(path, seconds):
+    """Set a path's mtime to the given number of seconds ago."""
+    timestamp = time.time() - seconds
+    os.utime(path, (timestamp, timestamp))
+
+
+@pytest.fixture
+def apt_root(tmp_path):
+    """Fake /var/lib/apt/lists and /etc/apt sources, all two hours old."""
+    lists = tmp_path / "lists"
+    (lists / "partial").mkdir(parents=True)
+    (lists / "lock").write_text("")
+    for name in ("deb.debian.org_debian_dists_bookworm_InRelease",
+                 "deb.debian.org_debian_dists_bookworm_main_binary-amd64_Packages"):
+        (lists / name).write_text("data")
+        set_age(lists / name, 2 * 3600)
+
+    sources_d = tmp_path / "sources.list.d"
+    sources_d.mkdir()
+    sources = tmp_path / "sources.list"
+    sources.write_text("deb http://deb.debian.org/debian bookworm main\n")
+    for path in (sources, sources_d):
+        set_age(path, 3 * 3600)
+    return tmp_path
+
+
+def make_policy(apt_root, max_age_minutes=60):
+    policy = AptUpdatePolicy(max_age_minutes, state_dir=apt_root / "state")
+    policy.LISTS_DIR = apt_root / "lists"
+    policy.SOURCES_PATHS = [apt_root / "sources.list", apt_root / "sources.list.d"]
+    return policy
+
+
+def test_no_package_lists(apt_root):
+    for entry in (apt_root / "lists").iterdir():
+        if entry.is_file():
+            entry.unlink()
+    decision = make_policy(apt_root).check()
+    assert decision.needed
+    assert decision.reason == "no package lists found"
+
+
+def test_stale_lists_need_update(apt_root):
+    decision = make_policy(apt_root, max_age_minutes=60).check()
+    assert decision.needed
+    assert "old" in decision.reason
+    assert decision.age_seconds == pytest.approx(2 * 3600, abs=60)
+
+
+def test_fresh_lists_skip_update(apt_root):
+    decision = make_policy(apt_root, max_age_minutes=180).check()
+    assert not decision.needed
+    assert "refreshed" in decision.reason
+
+
+def test_max_age_zero_always_updates(apt_root):
+    set_age(apt_root / "lists" / "deb.debian.org_debian_dists_bookworm_InRelease", 0)
+    decision = make_policy(apt_root, max_age_minutes=0).check()
+    assert decision.needed
+    assert "disabled" in decision.reason
+
+
+def test_recorded_update_counts_as_refresh(apt_root):
+    # apt keeps the server's Last-Modified time on the lists, so only the record shows the update
+    policy = make_policy(apt_root, max_age_minutes=60)
+    policy.mark_updated()
+
+    decision = make_policy(apt_root, max_age_minutes=60).check()
+    assert not decision.needed
+    assert decision.age_seconds < 60
+
+
+def test_sources_newer_than_lists(apt_root):
+    set_age(apt_root / "sources.list", 60)
+    decision = make_policy(apt_root, max_age_minutes=600).check()
+    assert decision.needed
+    assert decision.reason == "package sources are newer than the package lists"
+
+
+def test_sources_changed_since_recorded_update(apt_root):
+    make_policy(apt_root).mark_updated()
+    new_source = apt_root / "sources.list.d" / "docker.list"
+    new_source.write_text("deb https://download.docker.com/linux/debian bookworm stable\n")
+    set_age(new_source, 3 * 3600)
+
+    decision = make_policy(apt_root).check()
+    assert decision.needed
+    assert decision.reason == "package sources changed since the last update"
+
+
+def test_invalidate_forces_update(apt_root):
+    policy = make_policy(apt_root, max_age_minutes=600)
+    policy.mark_updated()
+    policy.invalidate("mirror switched")
+
+    decision = make_policy(apt_root, max_age_minutes=600).check()
+    assert decision.needed
+    assert "mirror switched" in decision.reason
+
+    # A later update clears the invalidation
+    time.sleep(0.01)
+    policy.mark_updated()
+    assert not make_policy(apt_root, max_age_minutes=600).check().needed
+
+
+def test_unreadable_state_is_ignored(apt_root):
+    state_dir = apt_root / "state"
+    state_dir.mkdir()
+    (state_dir / "apt_update.json").write_text("{not json")
+    decision = make_policy(apt_root, max_age_minutes=180).check()
+    assert not decision.needed
@@ -0,0 +1,163 @@
+"""Tests for the install session journal and resume planning."""
+
+import json
+
+import pytest
+
+from initializer.modules.app_catalog import AppCatalog
+from initializer.modules.install_journal import InstallJournal, JournalTask, restore_actions
+from initializer.modules.software_models import Application, ApplicationSuite
+
+
+class FakeInstaller:
+    """The parts of AppInstaller that restore_actions uses."""
+
+    def __init__(self, software_items, installed=()):
+        self.software_items = software_items
+        self.catalog = AppCatalog("apt", software_items)
+        self.installed = set(installed)
+        self.refreshed = []
+
+    def refresh_application_status(self, app_names, packages=()):
+        self.refreshed.extend(app_names)
+        return {name: name in self.installed for name in app_names}
+
+
+@pytest.fixture
+def catalog_items():
+    python = ApplicationSuite("Python", "Python tools", "dev", components=[
+        Application("Python 3", "python3", type="component"),
+        Application("Pip", "python3-pip", type="component"),
+    ])
+    return [
+        Application("Git", "git"),
+        Application("Vim", "vim", post_install="vim +PlugInstall +qall"),
+        Application("Curl", "curl"),
+        python,
+    ]
+
+
+def plan(journal):
+    tasks = [
+        JournalTask(0, "Installing Git", "install", "Git"),
+        JournalTask(1, "Installing Vim", "install", "Vim"),
+        JournalTask(2, "Installing Curl", "install", "Curl"),
+        JournalTask(3, "Installing Python", "install", "Python", is_batch=True,
+                    components=["Python 3", "Pip"], packages=["python3", "python3-pip"]),
+    ]
+    journal.begin("20261016_120000", tasks)
+
+
+def test_missing_journal(tmp_path):
+    assert InstallJournal(tmp_path).load() is None
+
+
+def test_state_follows_task_records(tmp_path):
+    journal = InstallJournal(tmp_path)
+    plan(journal)
+    journal.record(0, "running")
+    journal.record(0, "success", exit_code=0)
+    journal.record(1, "running")
+    journal.record(2, "failed", exit_code=100, message="E: Unable to locate package")
+
+    state = InstallJournal(tmp_path).load()
+
+    assert state.session == "20261016_120000"
+    assert not state.finished
+    assert [task.status for task in state.tasks] == ["done", "running", "failed", "pending"]
+    assert state.tasks[2].exit_code == 100
+    assert [task.index for task in state.incomplete_tasks] == [1, 3]
+
+
+def test_unchanged_state_is_not_written_again(tmp_path):
+    journal = InstallJournal(tmp_path)
+    plan(journal)
+    journal.record(0, "running")
+    journal.record(0, "running")
+    assert len(journal.path.read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    journal = InstallJournal(tmp_path)
+    plan(journal)
+    journal.record(0, "running")
+    # Crash while appending the next record
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"type": "task", "index": 0, "status": "do')
+
+    state = InstallJournal(tmp_path).load()
+
+    assert state is not None
+    assert state.tasks[0].status == "running"
+    assert not state.finished
+
+
+def test_end_record_and_reopening_retry(tmp_path):
+    journal = InstallJournal(tmp_path)
+    plan(journal)
+    journal.finish(aborted=True)
+    assert journal.load().finished
+
+    # A retry after the session ended reopens it
+    journal.record(2, "running")
+    assert not journal.load().finished
+
+
+def test_other_journal_version_is_ignored(tmp_path):
+    journal = InstallJournal(tmp_path)
+    journal.path.write_text(json.dumps({"type": "plan", "version": 99, "tasks": []}) + "\n", encoding="utf-8")
+    assert journal.load() is None
+
+
+def test_begin_replaces_previous_session(tmp_path):
+    journal = InstallJournal(tmp_path)
+    plan(journal)
+    journal.record(0, "failed", exit_code=1)
+    journal.begin("20261016_130000", [JournalTask(0, "Installing Git", "install", "Git")])
+
+    state = journal.load()
+    assert state.session == "20261016_130000"
+    assert [task.status for task in state.tasks] == ["pending"]
+
+
+def test_restore_actions(tmp_path, catalog_items):
+    journal = InstallJournal(tmp_path)
+    plan(journal)
+    journal.record(0, "running")  # Git: installed by the time the session stopped
+    journal.record(1, "running")  # Vim: installed, but its post-install step may not have run
+    journal.record(2, "failed", exit_code=100)
+    installer = FakeInstaller(catalog_items, installed={"Git", "Vim"})
+
+    actions, notes = restore_actions(journal.load(), installer)
+
+    assert sorted(installer.refreshed) == ["Git", "Vim"]
+    assert [action["application"].name for action in actions] == ["Vim", "Python"]
+    batch = actions[1]
+    assert batch["is_batch"]
+    assert [app.name for app in batch["components"]] == ["Python 3", "Pip"]
+    assert batch["packages"] == ["python3", "python3-pip"]
+    assert notes == [
+        "Installing Curl: failed in the interrupted session, exit code 100, not retried",
+        "Installing Git: verified as completed, skipped",
+    ]
+
+
+def test_restore_skips_applications_removed_from_catalog(tmp_path, catalog_items):
+    journal = InstallJournal(tmp_path)
+    journal.begin("s", [JournalTask(0, "Installing Emacs", "install", "Emacs")])
+
+    actions, notes = restore_actions(journal.load(), FakeInstaller(catalog_items))
+
+    assert actions == []
+    assert notes == ["Installing Emacs: no longer in the application catalog, skipped"]
+
+
+def test_restore_running_uninstall_already_done(tmp_path, catalog_items):
+    journal = InstallJournal(tmp_path)
+    journal.begin("s", [JournalTask(0, "Uninstalling Curl", "uninstall", "Curl")])
+    journal.record(0, "running")
+
+    actions, notes = restore_actions(journal.load(), FakeInstaller(catalog_items, installed=()))
+
+    assert actions == []
+    assert notes == ["Uninstalling Curl: verified as completed, skipped"]
@@ -0,0 +1,130 @@
+"""Tests for package manager progress parsing."""
+
+import pytest
+
+from initializer.modules.install_progress import DOWNLOAD_SHARE, InstallProgressParser, format_size, parse_size
+
+
+@pytest.mark.parametrize("text, binary, expected", [
+    ("12.3 MB", False, 12_300_000),
+    ("456 kB", False, 456_000),
+    ("2,000 kB", False, 2_000_000),
+    ("1,2 MB", False, 1_200_000),
+    ("3.5 MiB", False, int(3.5 * 1024 ** 2)),
+    ("512 B", False, 512),
+    ("10 M", True, 10 * 1024 ** 2),
+    ("10 M", False, 10_000_000),
+    ("not a size", False, None),
+])
+def test_parse_size(text, binary, expected):
+    assert parse_size(text, binary=binary) == expected
+
+
+def test_format_size():
+    assert format_size(12_300_000) == "12.3 MB"
+    assert format_size(999) == "999 B"
+
+
+def test_apt_status_records():
+    parser = InstallProgressParser("apt")
+    assert parser.feed("Need to get 10.0 MB of archives.") == ("Need to get 10.0 MB of archives.", None)
+    parser.feed("0 upgraded, 2 newly installed, 0 to remove and 3 not upgraded.")
+
+    line, update = parser.feed("dlstatus:1:50.0:Retrieving file 1 of 2")
+    assert line is None
+    assert update.phase == "download"
+    assert update.percent == pytest.approx(DOWNLOAD_SHARE / 2)
+    assert (update.bytes_done, update.bytes_total) == (5_000_000, 10_000_000)
+
+    line, update = parser.feed("pmstatus:git:50.0:Installed git")
+    assert line is None
+    assert update.phase == "install"
+    assert update.percent == pytest.approx(DOWNLOAD_SHARE + (100 - DOWNLOAD_SHARE) / 2)
+    assert update.detail == "Installed git (1/2 packages)"
+    assert parser.has_progress
+
+
+def test_apt_status_record_after_output_prefix():
+    # Status records share the output pipe and may follow unterminated output
+    parser = InstallProgressParser("apt")
+    line, update = parser.feed("Unpacking git ...pmstatus:git:20.0:Unpacking git")
+    assert line == "Unpacking git ..."
+    assert update.percent == pytest.approx(20.0)
+
+
+def test_apt_percentage_never_goes_backwards():
+    parser = InstallProgressParser("apt")
+    parser.feed("pmstatus:git:60.0:Configuring git")
+    _, update = parser.feed("pmstatus:git:30.0:Unpacking git")
+    assert update.percent == pytest.approx(60.0)
+
+
+def test_apt_error_records_are_hidden_without_progress():
+    parser = InstallProgressParser("apt")
+    assert parser.feed("pmerror:foo.deb:40.0:trying to overwrite") == (None, None)
+
+
+def test_apt_download_only_uses_whole_bar():
+    parser = InstallProgressParser("apt", download_only=True)
+    _, update = parser.feed("dlstatus:1:50.0:Retrieving file 1 of 2")
+    assert update.percent == pytest.approx(50.0)
+
+
+def test_plain_apt_output_is_passed_through():
+    parser = InstallProgressParser("apt")
+    assert parser.feed("Setting up git (1:2.39.2-1) ...") == ("Setting up git (1:2.39.2-1) ...", None)
+    assert not parser.has_progress
+
+
+def test_dnf_download_and_steps():
+    parser = InstallProgressParser("dnf")
+    assert parser.feed("Total download size: 2.0 M")[1] is None
+    assert parser.bytes_total == 2 * 1024 ** 2
+
+    _, update = parser.feed("(1/2): git-2.43.0-1.fc39.x86_64.rpm        1.5 MB/s | 1.0 MB     00:00")
+    assert update.phase == "download"
+    assert update.percent == pytest.approx(DOWNLOAD_SHARE / 2)
+    assert update.detail.startswith("Downloaded 1/2 packages")
+
+    _, update = parser.feed("  Installing       : git-2.43.0-1.fc39.x86_64        2/2 ")
+    assert update.phase == "install"
+    assert update.percent == pytest.approx(DOWNLOAD_SHARE + (100 - DOWNLOAD_SHARE) * 0.9)
+    assert update.detail == "Installing git-2.43.0-1.fc39.x86_64 (2/2)"
+
+    _, update = parser.feed("  Verifying        : git-2.43.0-1.fc39.x86_64        2/2 ")
+    assert update.percent == pytest.approx(100.0)
+
+
+def test_pacman_steps():
+    parser = InstallProgressParser("pacman")
+    parser.feed("Total Download Size:   3.50 MiB")
+    assert parser.bytes_total == int(3.5 * 1024 ** 2)
+
+    _, update = parser.feed(":: Retrieving packages...")
+    assert update.phase == "download"
+
+    _, update = parser.feed("(2/4) installing vim")
+    assert update.phase == "install"
+    assert update.detail == "Installing vim (2/4)"
+    assert update.percent == pytest.approx(DOWNLOAD_SHARE + (100 - DOWNLOAD_SHARE) / 4)
+
+
+def test_pacman_without_download_starts_install_at_zero():
+    parser = InstallProgressParser("pacman")
+    _, update = parser.feed("(1/2) removing vim")
+    assert update.percent == pytest.approx(0.0)
+    _, update = parser.feed("(2/2) removing nano")
+    assert update.percent == pytest.approx(50.0)
+
+
+def test_brew_steps():
+    parser = InstallProgressParser("brew")
+    assert parser.feed("==> Installing dependencies for wget: libidn2 and openssl@3")[1] is None
+    assert parser.package_total == 3
+
+    _, update = parser.feed("==> Fetching wget")
+    assert update.phase == "download"
+
+    _, update = parser.feed("==> Pouring libidn2--2.3.4.arm64_sonoma.bottle.tar.gz")
+    assert update.phase == "install"
+    assert update.detail.endswith("(1/3 packages)")
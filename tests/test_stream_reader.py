@@ -0,0 +1,88 @@
+"""Tests for chunked subprocess output splitting."""
+
+import asyncio
+
+from initializer.utils.stream_reader import (
+    LineSplitter,
+    StreamLine,
+    collapse_transient,
+    iter_stream_batches,
+    strip_ansi,
+)
+
+
+def feed_all(chunks, **kwargs):
+    """Feed chunks one by one and return every line including the flushed tail."""
+    splitter = LineSplitter(**kwargs)
+    lines = []
+    for chunk in chunks:
+        lines.extend(splitter.feed(chunk))
+    return lines + splitter.flush()
+
+
+def test_newline_terminated_lines():
+    assert feed_all([b"one\ntwo\n"]) == [StreamLine("one"), StreamLine("two")]
+
+
+def test_crlf_is_a_single_line_break():
+    assert feed_all([b"one\r\ntwo\r\n"]) == [StreamLine("one"), StreamLine("two")]
+
+
+def test_bare_carriage_return_marks_transient_line():
+    assert feed_all([b"10%\r20%\rdone\n"]) == [
+        StreamLine("10%", True), StreamLine("20%", True), StreamLine("done"),
+    ]
+
+
+def test_crlf_split_across_chunks():
+    splitter = LineSplitter()
+    # The trailing \r is held back until the next chunk shows whether \n follows
+    assert splitter.feed(b"one\r") == []
+    assert splitter.feed(b"\ntwo\n") == [StreamLine("one"), StreamLine("two")]
+
+
+def test_trailing_carriage_return_at_end_of_stream():
+    assert feed_all([b"50%\r"]) == [StreamLine("50%", True)]
+
+
+def test_multibyte_character_split_across_chunks():
+    data = "下载完成\n".encode("utf-8")
+    # Split inside the three-byte encoding of the first character
+    assert feed_all([data[:1], data[1:2], data[2:]]) == [StreamLine("下载完成")]
+    assert feed_all([bytes([b]) for b in data]) == [StreamLine("下载完成")]
+
+
+def test_invalid_bytes_are_replaced():
+    assert feed_all([b"bad \xff byte\n"]) == [StreamLine("bad � byte")]
+
+
+def test_unterminated_tail_is_flushed():
+    assert feed_all([b"no newline"]) == [StreamLine("no newline")]
+
+
+def test_unterminated_long_line_is_emitted_in_pieces():
+    splitter = LineSplitter(max_line_length=4)
+    assert [line.text for line in splitter.feed(b"x" * 10)] == ["xxxx", "xxxx"]
+    assert [line.text for line in splitter.feed(b"y\n")] == ["xxy"]
+
+
+def test_collapse_transient_keeps_latest_state():
+    lines = [StreamLine("1%", True), StreamLine("log line"), StreamLine("2%", True), StreamLine("3%", True)]
+    assert collapse_transient(lines) == [StreamLine("log line"), StreamLine("3%", True)]
+
+
+def test_strip_ansi():
+    assert strip_ansi("\x1b[32mok\x1b[0m \x1b[?25l") == "ok "
+
+
+def test_iter_stream_batches():
+    async def collect():
+        stream = asyncio.StreamReader()
+        stream.feed_data(b"a\r\nb\r")
+        stream.feed_data("c\xe4".encode("utf-8")[:-1])
+        stream.feed_data("c\xe4".encode("utf-8")[-1:] + b"\nend")
+        stream.feed_eof()
+        return [batch async for batch in iter_stream_batches(stream, chunk_size=3)]
+
+    lines = [line for batch in asyncio.run(collect()) for line in batch]
+    assert [line.text for line in lines if not line.transient] == ["a", "c\xe4", "end"]
@@ -0,0 +1,163 @@
+"""Tests for the dependency-aware install task scheduler."""
+
+import asyncio
+
+import pytest
+
+from initializer.modules.task_scheduler import (
+    PACKAGE_MANAGER_LOCK,
+    USER_DOTFILES_LOCK,
+    TaskScheduler,
+    classify_command_resources,
+)
+
+
+def make_task(events, key, result=True, delay=0.01):
+    """Build a coroutine factory that records when it starts and ends."""
+    async def run():
+        events.append(("start", key))
+        await asyncio.sleep(delay)
+        events.append(("end", key))
+        return result
+    return run
+
+
+def test_shared_resource_never_runs_concurrently():
+    events = []
+    scheduler = TaskScheduler(max_parallel=4)
+    for key in ("a", "b", "c"):
+        scheduler.add(key, make_task(events, key), resources=[PACKAGE_MANAGER_LOCK])
+
+    states = asyncio.run(scheduler.run())
+
+    assert states == {"a": "success", "b": "success", "c": "success"}
+    # Each node ends before the next one holding the same lock starts, in insertion order
+    assert events == [("start", "a"), ("end", "a"), ("start", "b"), ("end", "b"), ("start", "c"), ("end", "c")]
+
+
+def test_disjoint_resources_run_in_parallel():
+    events = []
+    scheduler = TaskScheduler(max_parallel=2)
+    scheduler.add("apt", make_task(events, "apt"), resources=[PACKAGE_MANAGER_LOCK])
+    scheduler.add("dotfiles", make_task(events, "dotfiles"), resources=[USER_DOTFILES_LOCK])
+
+    asyncio.run(scheduler.run())
+
+    assert events[:2] == [("start", "apt"), ("start", "dotfiles")]
+
+
+def test_max_parallel_limits_running_nodes():
+    running = []
+    peak = []
+
+    def task():
+        async def run():
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+            return True
+        return run
+
+    scheduler = TaskScheduler(max_parallel=2)
+    for key in "abcde":
+        scheduler.add(key, task())
+
+    asyncio.run(scheduler.run())
+
+    assert max(peak) == 2
+
+
+def test_failure_skips_dependents_transitively():
+    events = []
+    skipped = []
+    scheduler = TaskScheduler()
+    scheduler.add("install", make_task(events, "install", result=False))
+    scheduler.add("configure", make_task(events, "configure"), depends_on=["install"],
+                  on_skip=lambda failed: skipped.append(("configure", failed)))
+    scheduler.add("plugins", make_task(events, "plugins"), depends_on=["configure"],
+                  on_skip=lambda failed: skipped.append(("plugins", failed)))
+    scheduler.add("other", make_task(events, "other"))
+
+    states = asyncio.run(scheduler.run())
+
+    assert states == {"install": "failed", "configure": "skipped", "plugins": "skipped", "other": "success"}
+    assert skipped == [("configure", "install"), ("plugins", "configure")]
+    assert ("start", "configure") not in events and ("start", "plugins") not in events
+
+
+def test_exception_counts_as_failure():
+    async def broken():
+        raise RuntimeError("boom")
+
+    events = []
+    scheduler = TaskScheduler()
+    scheduler.add("broken", broken)
+    scheduler.add("after", make_task(events, "after"), depends_on=["broken"])
+
+    assert asyncio.run(scheduler.run()) == {"broken": "failed", "after": "skipped"}
+
+
+def test_dependency_runs_first():
+    events = []
+    scheduler = TaskScheduler(max_parallel=4)
+    scheduler.add("second", make_task(events, "second"), depends_on=["first"])
+    scheduler.add("first", make_task(events, "first"))
+
+    asyncio.run(scheduler.run())
+
+    assert events.index(("end", "first")) < events.index(("start", "second"))
+
+
+def test_cycle_is_rejected():
+    scheduler = TaskScheduler()
+    scheduler.add("a", make_task([], "a"), depends_on=["c"])
+    scheduler.add("b", make_task([], "b"), depends_on=["a"])
+    scheduler.add("c", make_task([], "c"), depends_on=["b"])
+    scheduler.add("free", make_task([], "free"))
+
+    with pytest.raises(ValueError, match="cycle.*a, b, c"):
+        scheduler.validate()
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.run())
+
+
+def test_unknown_dependency_is_rejected():
+    scheduler = TaskScheduler()
+    scheduler.add("a", make_task([], "a"), depends_on=["missing"])
+
+    with pytest.raises(ValueError, match="unknown node 'missing'"):
+        scheduler.validate()
+
+
+def test_duplicate_key_is_rejected():
+    scheduler = TaskScheduler()
+    scheduler.add("a", make_task([], "a"))
+
+    with pytest.raises(ValueError, match="Duplicate"):
+        scheduler.add("a", make_task([], "a"))
+
+
+def test_should_stop_prevents_new_nodes():
+    events = []
+    scheduler = TaskScheduler(max_parallel=1)
+    scheduler.add("a", make_task(events, "a"))
+    scheduler.add("b", make_task(events, "b"))
+
+    states = asyncio.run(scheduler.run(should_stop=lambda: ("end", "a") in events))
+
+    assert states == {"a": "success", "b": "pending"}
+
+
+@pytest.mark.parametrize("command, expected", [
+    ("sudo apt-get install -y git", {PACKAGE_MANAGER_LOCK}),
+    ("sudo -u root dpkg -i pkg.deb", {PACKAGE_MANAGER_LOCK}),
+    ("git clone https://example.com/repo ~/.repo", {USER_DOTFILES_LOCK}),
+    ("pip3 install --user black", {"pip"}),
+    ("python3 -m pip install black", {"pip"}),
+    ("bash -c 'mkdir -p ~/.vim && git clone x ~/.vim/y'", {USER_DOTFILES_LOCK}),
+    ("curl -fsSL https://example.com/install.sh | sh", {USER_DOTFILES_LOCK, PACKAGE_MANAGER_LOCK}),
+    ("some-unknown-tool --setup", {PACKAGE_MANAGER_LOCK}),
+])
+def test_classify_command_resources(command, expected):
+    assert classify_command_resources(command) == frozenset(expected)